@@ -0,0 +1,58 @@
+"""Benchmarks for the geo core at several input sizes.
+
+Scalar functions are timed over ``n`` calls per round so their numbers line
+up with the vectorised variants, which process the same ``n`` inputs at once.
+"""
+
+import pytest
+
+from digipin_agent import geo
+
+SIZES = [1, 100, 10000]
+BULK_SIZES = [1000, 100000]
+CANDIDATES = [10, 1000, 100000]
+
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_encode_coordinates(benchmark, points, n):
+    lats, lons = points(n)
+    pairs = list(zip(lats.tolist(), lons.tolist()))
+    benchmark(lambda: [geo.encode_coordinates(lat, lon) for lat, lon in pairs])
+
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_decode_digipin(benchmark, pins, n):
+    values = pins(n)
+    benchmark(lambda: [geo.decode_digipin(pin) for pin in values])
+
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_get_distance_meters(benchmark, pins, n):
+    starts, ends = pins(n, 1), pins(n, 2)
+    pairs = list(zip(starts, ends))
+    benchmark(lambda: [geo.get_distance_meters(start, end) for start, end in pairs])
+
+
+@pytest.mark.parametrize("n", CANDIDATES)
+def bench_nearest_pin(benchmark, pins, n):
+    reference = pins(1, 3)[0]
+    candidates = pins(n)
+    benchmark(geo.nearest_pin, reference, candidates)
+
+
+@pytest.mark.parametrize("n", BULK_SIZES)
+def bench_encode_many(benchmark, points, n):
+    lats, lons = points(n)
+    benchmark(geo.encode_many, lats, lons)
+
+
+@pytest.mark.parametrize("n", BULK_SIZES)
+def bench_decode_many(benchmark, pins, n):
+    values = pins(n)
+    benchmark(geo.decode_many, values)
+
+
+@pytest.mark.parametrize("n", [100, 1000])
+def bench_pairwise_distances(benchmark, pins, n):
+    values = pins(n)
+    benchmark(geo.pairwise_distances, values)
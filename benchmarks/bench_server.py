@@ -0,0 +1,124 @@
+"""Throughput and latency percentiles of ``digipin_server`` endpoints.
+
+Requests go through an in-process ASGI client, so the numbers cover routing,
+validation, serialisation and the geo work but no sockets. The Gemini agent is
+replaced by a stub that answers immediately, which isolates server overhead
+from model latency. Each round sends ``REQUESTS`` requests with
+``CONCURRENCY`` in flight; per-request latency percentiles and requests per
+second are stored in the benchmark's ``extra_info``.
+"""
+
+import asyncio
+import statistics
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+main = pytest.importorskip("main")
+
+REQUESTS = 200
+CONCURRENCY = 16
+
+
+class StubAgent:
+    async def respond(self, message, context=None):
+        return {"message": message, "response": "stubbed"}
+
+    async def respond_stream(self, message, context=None):
+        yield {"type": "text", "delta": "stubbed"}
+        yield {"type": "done", "message": message, "response": "stubbed"}
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def client(loop):
+    transport = httpx.ASGITransport(app=main.app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    yield client
+    loop.run_until_complete(client.aclose())
+
+
+@pytest.fixture(autouse=True)
+def stub_agent(monkeypatch):
+    monkeypatch.setattr(main, "agent_instance", StubAgent())
+    monkeypatch.setattr(main, "agent_status", "ready")
+
+
+def _percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _run_load(benchmark, loop, client, method, url, make_body):
+    latencies = []
+    walls = []
+
+    async def one(index, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=make_body(index))
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    async def round_():
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(index, semaphore) for index in range(REQUESTS)))
+        walls.append(time.perf_counter() - start)
+
+    benchmark.pedantic(lambda: loop.run_until_complete(round_()), rounds=5, warmup_rounds=1)
+
+    ordered = sorted(latencies)
+    benchmark.extra_info.update(
+        {
+            "requests_per_round": REQUESTS,
+            "concurrency": CONCURRENCY,
+            "requests_per_second": REQUESTS / statistics.median(walls),
+            "latency_p50_ms": _percentile(ordered, 0.50) * 1000,
+            "latency_p90_ms": _percentile(ordered, 0.90) * 1000,
+            "latency_p99_ms": _percentile(ordered, 0.99) * 1000,
+        }
+    )
+
+
+def bench_health(benchmark, loop, client):
+    _run_load(benchmark, loop, client, "GET", "/health", lambda index: None)
+
+
+def bench_encode(benchmark, loop, client, points):
+    lats, lons = points(REQUESTS)
+    body = [{"latitude": lat, "longitude": lon} for lat, lon in zip(lats.tolist(), lons.tolist())]
+    _run_load(benchmark, loop, client, "POST", "/api/digipin/encode", body.__getitem__)
+
+
+def bench_decode(benchmark, loop, client, pins):
+    body = [{"pin": pin} for pin in pins(REQUESTS)]
+    _run_load(benchmark, loop, client, "POST", "/api/digipin/decode", body.__getitem__)
+
+
+def bench_batch_decode_1000(benchmark, loop, client, pins):
+    body = {"pins": pins(1000)}
+    _run_load(benchmark, loop, client, "POST", "/api/digipin/batch/decode", lambda index: body)
+
+
+def bench_agent_fast_path(benchmark, loop, client, pins):
+    body = [{"message": f"decode {pin}"} for pin in pins(REQUESTS)]
+    _run_load(benchmark, loop, client, "POST", "/api/agent/respond", body.__getitem__)
+
+
+def bench_agent_stubbed_model(benchmark, loop, client):
+    _run_load(
+        benchmark,
+        loop,
+        client,
+        "POST",
+        "/api/agent/respond",
+        lambda index: {"message": f"Tell me something about DIGIPIN #{index}"},
+    )
@@ -0,0 +1,115 @@
+"""Import-time and cold-start benchmark for the DIGIPIN package and server.
+
+Every sample runs in a fresh interpreter so nothing is served from an already
+populated ``sys.modules``. Three numbers are reported (best and median of
+``--runs`` samples, in milliseconds):
+
+* ``import_package`` – ``import digipin_agent``
+* ``import_server`` – ``import main`` from ``digipin_server``
+* ``first_request`` – server import plus the first ``/api/digipin/encode``
+  request through an in-process client, i.e. what a new worker pays before
+  it can answer traffic
+
+Pass ``--max-import-ms`` / ``--max-cold-start-ms`` to fail (exit status 1)
+when the median exceeds a budget, e.g. in CI::
+
+    python benchmarks/cold_start.py --runs 7 --max-cold-start-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+AGENT_SRC = ROOT / "digipin_agent" / "src"
+SERVER_DIR = ROOT / "digipin_server"
+
+_SCRIPTS = {
+    "import_package": """
+import time
+start = time.perf_counter()
+import digipin_agent
+print(time.perf_counter() - start)
+""",
+    "import_server": """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+""",
+    "first_request": """
+import time
+start = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+response = TestClient(main.app).post("/api/digipin/encode", json={"latitude": 28.6139, "longitude": 77.209})
+assert response.status_code == 200, response.text
+print(time.perf_counter() - start)
+""",
+}
+
+
+def _sample(script: str) -> float:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(AGENT_SRC), str(SERVER_DIR)]),
+        "LOG_LEVEL": "ERROR",
+        # Cold start must not depend on the model being reachable.
+        "DIGIPIN_AGENT_WARMUP": "false",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=SERVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]) * 1000.0
+
+
+def run(runs: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, script in _SCRIPTS.items():
+        samples: List[float] = [_sample(script) for _ in range(runs)]
+        results[name] = {
+            "best_ms": round(min(samples), 2),
+            "median_ms": round(statistics.median(samples), 2),
+            "runs": runs,
+        }
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--max-import-ms", type=float, help="budget for the median package import")
+    parser.add_argument("--max-cold-start-ms", type=float, help="budget for the median first request")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text + "\n")
+
+    failures = []
+    if args.max_import_ms is not None and results["import_package"]["median_ms"] > args.max_import_ms:
+        failures.append(f"import_package median above {args.max_import_ms} ms")
+    if args.max_cold_start_ms is not None and results["first_request"]["median_ms"] > args.max_cold_start_ms:
+        failures.append(f"first_request median above {args.max_cold_start_ms} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
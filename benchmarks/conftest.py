@@ -0,0 +1,40 @@
+"""Shared fixtures for the benchmark suite (see README.md in this directory)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "digipin_agent" / "src", ROOT / "digipin_server"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+pytest.importorskip("pytest_benchmark")
+
+from digipin_agent.geo import DIGIPIN_BOUNDS, encode_many  # noqa: E402
+
+SEED = 20240101
+
+
+def random_points(count: int, seed: int = SEED):
+    """Uniform points over the DIGIPIN grid; fixed seed so runs are comparable."""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(DIGIPIN_BOUNDS["min_lat"], DIGIPIN_BOUNDS["max_lat"], count)
+    lons = rng.uniform(DIGIPIN_BOUNDS["min_lon"], DIGIPIN_BOUNDS["max_lon"], count)
+    return lats, lons
+
+
+def random_pins(count: int, seed: int = SEED):
+    return encode_many(*random_points(count, seed)).tolist()
+
+
+@pytest.fixture(scope="session")
+def points():
+    return random_points
+
+
+@pytest.fixture(scope="session")
+def pins():
+    return random_pins
@@ -1,25 +1,111 @@
 """DIGIPIN Agent package."""
 
 from .agent import GeminiDigipinAgent
+from .aggregate import LevelTable, PrefixAggregate, level_for_zoom
+from .cache import BoundedCache, GeoCache
+from .cover import CoverageCache, CoverageRaster, cover_bbox, cover_polygon
 from .geo import (
     DIGIPIN_BOUNDS,
+    INVALID_PIN,
+    REASON_MESSAGES,
+    DecodedDigipinArray,
     DigiPinValidationError,
     decode_digipin,
+    decode_many,
+    decode_prefix,
+    distance_matrix,
     encode_coordinates,
+    encode_many,
     get_distance_meters,
     get_distance_summary,
     is_valid_digipin,
     nearest_pin,
+    pairwise_distances,
+    validate_many,
 )
+from .grid import (
+    children,
+    children_packed,
+    k_ring,
+    k_ring_packed,
+    neighbours,
+    neighbours_packed,
+    parent,
+    parent_packed,
+)
+from .index import DigipinIndex
+from .metrics import REGISTRY, Counter, Gauge, Histogram, Registry
+from .packed import (
+    INVALID_PACKED,
+    PinArray,
+    decode_packed,
+    encode_packed,
+    format_prefixes,
+    pack_many,
+    pack_pin,
+    pack_prefix,
+    unpack_many,
+    unpack_pin,
+)
+from .response_cache import MemoryResponseBackend, RedisResponseBackend, ResponseCache
+from .router import FastPathRouter
+from .store import CollectionStore
 
 __all__ = [
     "GeminiDigipinAgent",
+    "BoundedCache",
+    "GeoCache",
+    "CoverageCache",
+    "CoverageRaster",
+    "cover_bbox",
+    "cover_polygon",
     "DIGIPIN_BOUNDS",
+    "INVALID_PIN",
+    "REASON_MESSAGES",
+    "DecodedDigipinArray",
     "DigiPinValidationError",
     "decode_digipin",
+    "decode_many",
+    "decode_prefix",
+    "distance_matrix",
     "encode_coordinates",
+    "encode_many",
     "get_distance_meters",
     "get_distance_summary",
     "is_valid_digipin",
     "nearest_pin",
+    "pairwise_distances",
+    "validate_many",
+    "DigipinIndex",
+    "children",
+    "children_packed",
+    "k_ring",
+    "k_ring_packed",
+    "neighbours",
+    "neighbours_packed",
+    "parent",
+    "parent_packed",
+    "LevelTable",
+    "PrefixAggregate",
+    "level_for_zoom",
+    "CollectionStore",
+    "FastPathRouter",
+    "MemoryResponseBackend",
+    "RedisResponseBackend",
+    "ResponseCache",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "INVALID_PACKED",
+    "PinArray",
+    "decode_packed",
+    "encode_packed",
+    "format_prefixes",
+    "pack_many",
+    "pack_pin",
+    "pack_prefix",
+    "unpack_many",
+    "unpack_pin",
 ]
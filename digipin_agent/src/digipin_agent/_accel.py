@@ -0,0 +1,177 @@
+"""Numba-compiled versions of the bulk geo kernels.
+
+Imported lazily by :mod:`digipin_agent.geo` when the ``numba`` backend is
+selected; importing this module requires numba. The encode and decode
+kernels perform exactly the floating point operations of the NumPy kernels
+in :mod:`.geo`, in the same order, so pins and decoded centres are bit
+identical. Kernels release the GIL so thread pools scale across cores.
+
+Encoding works on blocks of points that stay in L1 cache, level by level, so
+the per-level arithmetic vectorises across points instead of waiting on one
+point's ten dependent divisions at a time. The ``*_packed`` variants go
+straight between coordinates and 40-bit packed pins without materialising the
+``(n, 10)`` symbol array. Encoders take the number of levels to compute, so
+coarse prefixes skip the finer subdivisions entirely.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numba
+import numpy as np
+
+# error_model="numpy" drops the ZeroDivisionError checks (steps are never
+# zero), which would otherwise stop the inner loops from vectorising.
+_JIT = dict(nopython=True, nogil=True, cache=True, error_model="numpy")
+
+_BLOCK = 512
+_INVALID_PACKED = np.uint64(np.iinfo(np.uint64).max)
+
+
+@numba.jit(**_JIT)
+def _encode_block(lat, lon, start, count, bounds, levels, valid, rows, cols, state):
+    """Fill the first ``levels`` ``rows``/``cols`` (level-major) for ``count`` points from ``start``."""
+    min_lat0, max_lat0, min_lon0, max_lon0 = bounds[0], bounds[1], bounds[2], bounds[3]
+    point_lat, point_lon = state[0], state[1]
+    min_lat, max_lat, min_lon, max_lon = state[2], state[3], state[4], state[5]
+    for j in range(count):
+        a = lat[start + j]
+        b = lon[start + j]
+        ok = (a >= min_lat0) & (a <= max_lat0) & (b >= min_lon0) & (b <= max_lon0)
+        valid[start + j] = ok
+        point_lat[j] = a if ok else min_lat0
+        point_lon[j] = b if ok else min_lon0
+        min_lat[j] = min_lat0
+        max_lat[j] = max_lat0
+        min_lon[j] = min_lon0
+        max_lon[j] = max_lon0
+
+    for level in range(levels):
+        level_rows = rows[level]
+        for j in range(count):
+            lat_step = (max_lat[j] - min_lat[j]) / 4.0
+            row = min(max(3.0 - math.floor((point_lat[j] - min_lat[j]) / lat_step), 0.0), 3.0)
+            level_rows[j] = row
+            low = min_lat[j]
+            max_lat[j] = low + lat_step * (4.0 - row)
+            min_lat[j] = low + lat_step * (3.0 - row)
+        level_cols = cols[level]
+        for j in range(count):
+            lon_step = (max_lon[j] - min_lon[j]) / 4.0
+            col = min(max(math.floor((point_lon[j] - min_lon[j]) / lon_step), 0.0), 3.0)
+            level_cols[j] = col
+            low = min_lon[j] + lon_step * col
+            min_lon[j] = low
+            max_lon[j] = low + lon_step
+
+
+@numba.jit(**_JIT)
+def encode_indices(lat, lon, bounds, levels):
+    size = lat.size
+    indices = np.zeros((size, levels), dtype=np.intp)
+    valid = np.zeros(size, dtype=np.bool_)
+    rows = np.empty((10, _BLOCK))
+    cols = np.empty((10, _BLOCK))
+    state = np.empty((6, _BLOCK))
+    for start in range(0, size, _BLOCK):
+        count = min(_BLOCK, size - start)
+        _encode_block(lat, lon, start, count, bounds, levels, valid, rows, cols, state)
+        for j in range(count):
+            if valid[start + j]:
+                for level in range(levels):
+                    indices[start + j, level] = int(rows[level, j] * 4.0 + cols[level, j])
+    return indices, valid
+
+
+@numba.jit(**_JIT)
+def encode_packed(lat, lon, bounds, levels):
+    size = lat.size
+    codes = np.empty(size, dtype=np.uint64)
+    valid = np.zeros(size, dtype=np.bool_)
+    rows = np.empty((10, _BLOCK))
+    cols = np.empty((10, _BLOCK))
+    state = np.empty((6, _BLOCK))
+    for start in range(0, size, _BLOCK):
+        count = min(_BLOCK, size - start)
+        _encode_block(lat, lon, start, count, bounds, levels, valid, rows, cols, state)
+        for j in range(count):
+            code = np.uint64(0)
+            for level in range(levels):
+                code = (code << np.uint64(4)) | np.uint64(rows[level, j] * 4.0 + cols[level, j])
+            codes[start + j] = code if valid[start + j] else _INVALID_PACKED
+    return codes
+
+
+@numba.jit(**_JIT)
+def _decode_symbol(symbol, cell):
+    """Narrow ``cell`` (min_lat, max_lat, min_lon, max_lon) to child ``symbol``."""
+    row = float(symbol // 4)
+    col = float(symbol % 4)
+    lat_step = (cell[1] - cell[0]) / 4.0
+    lon_step = (cell[3] - cell[2]) / 4.0
+    cell[1] = cell[0] + lat_step * (4.0 - row)
+    cell[0] = cell[0] + lat_step * (3.0 - row)
+    cell[2] = cell[2] + lon_step * col
+    cell[3] = cell[2] + lon_step
+
+
+@numba.jit(**_JIT)
+def _store_cell(out, i, cell):
+    out[0, i] = (cell[0] + cell[1]) / 2.0
+    out[1, i] = (cell[2] + cell[3]) / 2.0
+    out[2, i] = cell[0]
+    out[3, i] = cell[2]
+    out[4, i] = cell[1]
+    out[5, i] = cell[3]
+
+
+@numba.jit(**_JIT)
+def decode_indices(indices, valid, bounds):
+    """Rows of the result: latitude, longitude, min_lat, min_lon, max_lat, max_lon."""
+    size = valid.size
+    out = np.empty((6, size))
+    cell = np.empty(4)
+    for i in range(size):
+        if not valid[i]:
+            out[:, i] = np.nan
+            continue
+        cell[:] = bounds
+        for level in range(indices.shape[1]):
+            _decode_symbol(indices[i, level], cell)
+        _store_cell(out, i, cell)
+    return out
+
+
+@numba.jit(**_JIT)
+def decode_packed(codes, bounds):
+    """Like :func:`decode_indices`, reading symbols straight from packed pins."""
+    size = codes.size
+    out = np.empty((6, size))
+    valid = np.empty(size, dtype=np.bool_)
+    cell = np.empty(4)
+    limit = np.uint64(1) << np.uint64(40)
+    for i in range(size):
+        code = codes[i]
+        valid[i] = code < limit
+        if not valid[i]:
+            out[:, i] = np.nan
+            continue
+        cell[:] = bounds
+        for level in range(10):
+            shift = np.uint64(4 * (9 - level))
+            _decode_symbol(np.intp((code >> shift) & np.uint64(0xF)), cell)
+        _store_cell(out, i, cell)
+    return out, valid
+
+
+@numba.vectorize(["float64(float64, float64, float64, float64, float64)"], nopython=True, cache=True)
+def haversine(lat1, lon1, lat2, lon2, radius):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_phi / 2.0) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2.0) ** 2
+    c = 2.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+    return radius * c
@@ -2,31 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, Iterable, Optional
-
-try:
-    import google.generativeai as genai
-    from google.generativeai.types import HarmBlockThreshold, HarmCategory
-except ImportError as exc:  # pragma: no cover - optional dependency
-    genai = None  # type: ignore
-    _import_error = exc  # type: ignore
-else:
-    _import_error = None
-
-from .geo import (
-    DigiPinValidationError,
-    decode_digipin,
-    encode_coordinates,
-    get_distance_summary,
-    is_valid_digipin,
-    nearest_pin,
-)
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional
+
+from . import geo
+from .cache import GeoCache
+from .geo import DigiPinValidationError
+from .metrics import REGISTRY
+from .response_cache import ResponseCache, prompt_key
+from .router import FastPathRouter
 
 logger = logging.getLogger(__name__)
 
+TOOL_NAMES = ("validate_digipin", "decode_digipin", "encode_coordinates", "distance_between", "nearest_digipin")
+
+MODEL_CALLS = REGISTRY.counter(
+    "digipin_agent_model_calls_total", "Gemini round trips, by respond or stream mode", ("mode",)
+)
+MODEL_CALL_SECONDS = REGISTRY.histogram(
+    "digipin_agent_model_call_seconds", "Time until Gemini answers a round trip", ("mode",)
+)
+TOOL_CALLS = REGISTRY.counter("digipin_agent_tool_calls_total", "Tool executions by outcome", ("tool", "outcome"))
+TOOL_SECONDS = REGISTRY.histogram("digipin_agent_tool_seconds", "Tool execution time", ("tool",))
+
 SYSTEM_INTRO = (
     "You are DigiPin Navigator, an assistant that specialises in India's DIGIPIN grid system. "
     "You can explain how to encode and decode DIGIPINs, validate codes, compare multiple pins, "
@@ -43,20 +44,81 @@ def _normalise_model_name(name: str) -> str:
     return f"models/{name}"
 
 
+# The Gemini SDK takes on the order of a second to import, so it is loaded by
+# _require_genai() when the first agent is built rather than with this module.
+genai = None  # type: ignore
+HarmBlockThreshold = HarmCategory = None  # type: ignore
+
+
+def _require_genai():
+    """Import google-generativeai on first use and return the module."""
+    global genai, HarmBlockThreshold, HarmCategory
+    if genai is None:
+        try:
+            import google.generativeai as sdk
+            from google.generativeai.types import HarmBlockThreshold as threshold, HarmCategory as category
+        except ImportError as exc:
+            raise ImportError(
+                f"google-generativeai is required for GeminiDigipinAgent. Original import error: {exc}"
+            ) from exc
+        genai, HarmBlockThreshold, HarmCategory = sdk, threshold, category
+    return genai
+
+
+def _env_number(name: str, default, cast):
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, raw)
+        return default
+
+
 class GeminiDigipinAgent:
     """Thin wrapper around Gemini with function calling for DIGIPIN workflows."""
 
-    def __init__(self, api_key: Optional[str] = None, model_name: str = "models/gemini-1.5-flash"):
-        if genai is None:
-            raise ImportError(
-                "google-generativeai is required for GeminiDigipinAgent. "
-                f"Original import error: {_import_error}"
-            )
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "models/gemini-1.5-flash",
+        geo_cache: Optional[GeoCache] = None,
+        request_timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_tool_rounds: Optional[int] = None,
+        router: Optional[FastPathRouter] = None,
+        fast_path: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        _require_genai()
 
         self.api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
 
+        # Tools run through the shared cache when one is supplied.
+        self.geo = geo_cache if geo_cache is not None else geo
+        # Simple prompts are answered without a model round trip.
+        self.router = (router or FastPathRouter(self.geo)) if fast_path else None
+        # Repeated prompts are served from here and concurrent repeats share one call.
+        self.response_cache = response_cache
+
+        # Bounds for a whole respond() call, including time spent queueing for
+        # a concurrency slot, so a slow model cannot pile up open requests.
+        if request_timeout is None:
+            request_timeout = _env_number("GEMINI_REQUEST_TIMEOUT", 30.0, float)
+        if max_concurrency is None:
+            max_concurrency = _env_number("GEMINI_MAX_CONCURRENCY", 16, int)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.request_timeout = request_timeout if request_timeout and request_timeout > 0 else None
+        self.max_concurrency = max_concurrency
+        if max_tool_rounds is None:
+            max_tool_rounds = _env_number("GEMINI_MAX_TOOL_ROUNDS", 8, int)
+        self.max_tool_rounds = max(max_tool_rounds, 0)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
         configured_model = os.getenv("GEMINI_MODEL") or model_name
         normalised_model = _normalise_model_name(configured_model)
 
@@ -145,41 +207,174 @@ class GeminiDigipinAgent:
             ),
         ]
 
+    def _limiter(self) -> asyncio.Semaphore:
+        # Created lazily so the semaphore binds to the serving event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
     async def respond(self, message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Handle a natural language prompt and return structured response."""
-        chat = self.model.start_chat()
+        """Handle a natural language prompt and return structured response.
+
+        Raises ``asyncio.TimeoutError`` when the call does not finish within
+        ``request_timeout`` seconds.
+        """
+        if self.router is not None and context is None:
+            routed = self.router.route(message)
+            if routed is not None:
+                return routed
 
         payload = message if context is None else json.dumps({"message": message, "context": context})
-        response = await self._send_message_with_functions(chat, payload)
+        if self.response_cache is None:
+            text_response = await self._ask_model(payload)
+        else:
+            text_response = await asyncio.wait_for(
+                self.response_cache.get_or_call(prompt_key(message, context), lambda: self._ask_model(payload)),
+                timeout=self.request_timeout,
+            )
 
-        text_response = self._extract_text(response) or "I'm sorry, I could not generate a response."
         return {
             "message": message,
-            "response": text_response,
+            "response": text_response or "I'm sorry, I could not generate a response.",
         }
 
+    async def _ask_model(self, payload: str) -> Optional[str]:
+        """One model conversation for ``payload``; ``None`` when it produced no text."""
+        response = await asyncio.wait_for(self._respond_limited(payload), timeout=self.request_timeout)
+        return self._extract_text(response) or None
+
+    async def _respond_limited(self, payload: str):
+        async with self._limiter():
+            chat = self.model.start_chat()
+            return await self._send_message_with_functions(chat, payload)
+
     async def _send_message_with_functions(self, chat, prompt: str):
-        response = chat.send_message(prompt)
-        while True:
-            parts = getattr(response, "parts", None)
-            if not parts:
-                break
-            function_call = next(
-                (getattr(part, "function_call", None) for part in parts if getattr(part, "function_call", None)),
-                None,
-            )
-            if not function_call:
-                break
+        response = await self._call_model(chat, prompt)
+        for _ in range(self.max_tool_rounds):
+            function_calls = [
+                part.function_call
+                for part in getattr(response, "parts", None) or []
+                if getattr(part, "function_call", None)
+            ]
+            if not function_calls:
+                return response
+
+            # Every call requested in a turn runs concurrently and all results
+            # go back to the model in a single message.
+            results = await asyncio.gather(*(self._execute_function_call(call) for call in function_calls))
+            function_responses = self._function_responses(function_calls, results)
+            response = await self._call_model(chat, function_responses)
+
+        logger.warning("Stopping tool loop after %d rounds", self.max_tool_rounds)
+        return response
+
+    @staticmethod
+    async def _call_model(chat, content: Any, **kwargs: Any):
+        mode = "stream" if kwargs.get("stream") else "respond"
+        MODEL_CALLS.inc(mode=mode)
+        with MODEL_CALL_SECONDS.time(mode=mode):
+            return await chat.send_message_async(content, **kwargs)
 
-            result = await self._execute_function_call(function_call)
-            function_response = genai.protos.Part(
+    @staticmethod
+    def _function_responses(function_calls, results) -> List[Any]:
+        return [
+            genai.protos.Part(
                 function_response=genai.protos.FunctionResponse(
-                    name=function_call.name,
+                    name=call.name,
                     response={"result": result},
                 )
             )
-            response = chat.send_message([function_response])
-        return response
+            for call, result in zip(function_calls, results)
+        ]
+
+    async def respond_stream(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming counterpart of :meth:`respond`.
+
+        Yields ``{"type": "tool_call", "name", "args"}`` and
+        ``{"type": "tool_result", "name", "result"}`` events around each tool
+        round, ``{"type": "text", "delta"}`` events as model text arrives, and
+        finally ``{"type": "done", "message", "response"}`` carrying the same
+        payload :meth:`respond` would return. ``request_timeout`` bounds the
+        whole stream and raises ``asyncio.TimeoutError`` when exceeded.
+        """
+        if self.router is not None and context is None:
+            routed = self.router.route(message)
+            if routed is not None:
+                yield {"type": "text", "delta": routed["response"]}
+                yield {"type": "done", **routed}
+                return
+
+        key = prompt_key(message, context)
+        if self.response_cache is not None:
+            cached = await self.response_cache.lookup(key)
+            if cached is not None:
+                yield {"type": "text", "delta": cached}
+                yield {"type": "done", "message": message, "response": cached}
+                return
+
+        loop = asyncio.get_running_loop()
+        deadline = None if self.request_timeout is None else loop.time() + self.request_timeout
+        payload = message if context is None else json.dumps({"message": message, "context": context})
+        texts: List[str] = []
+
+        limiter = self._limiter()
+        await self._before(deadline, limiter.acquire())
+        try:
+            chat = self.model.start_chat()
+            content: Any = payload
+            for round_number in range(self.max_tool_rounds + 1):
+                stream = await self._before(deadline, self._call_model(chat, content, stream=True))
+                function_calls = []
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await self._before(deadline, chunks.__anext__())
+                    except StopAsyncIteration:
+                        break
+                    for part in getattr(chunk, "parts", None) or []:
+                        function_call = getattr(part, "function_call", None)
+                        if function_call:
+                            function_calls.append(function_call)
+                            continue
+                        text = getattr(part, "text", None)
+                        if text:
+                            texts.append(text)
+                            yield {"type": "text", "delta": text}
+
+                if not function_calls:
+                    break
+                if round_number == self.max_tool_rounds:
+                    logger.warning("Stopping tool loop after %d rounds", self.max_tool_rounds)
+                    break
+                for function_call in function_calls:
+                    yield {"type": "tool_call", "name": function_call.name, "args": dict(function_call.args)}
+                results = await self._before(
+                    deadline, asyncio.gather(*(self._execute_function_call(call) for call in function_calls))
+                )
+                for function_call, result in zip(function_calls, results):
+                    yield {"type": "tool_result", "name": function_call.name, "result": result}
+                content = self._function_responses(function_calls, results)
+        finally:
+            limiter.release()
+
+        text_response = "".join(texts).strip()
+        if text_response and self.response_cache is not None:
+            await self.response_cache.store(key, text_response)
+        yield {
+            "type": "done",
+            "message": message,
+            "response": text_response or "I'm sorry, I could not generate a response.",
+        }
+
+    @staticmethod
+    async def _before(deadline: Optional[float], awaitable: Awaitable[Any]) -> Any:
+        """Await ``awaitable``, failing with ``asyncio.TimeoutError`` past ``deadline``."""
+        if deadline is None:
+            return await awaitable
+        remaining = deadline - asyncio.get_running_loop().time()
+        return await asyncio.wait_for(awaitable, timeout=max(remaining, 0.0))
 
     @staticmethod
     def _extract_text(response) -> str:
@@ -209,13 +404,22 @@ class GeminiDigipinAgent:
         return (text_attr or "").strip()
 
     async def _execute_function_call(self, function_call) -> Dict[str, Any]:
-        name = function_call.name
-        args = dict(function_call.args)
-
+        # Tools are CPU bound (large candidate lists in particular), so they
+        # run in a worker thread rather than on the event loop.
+        return await asyncio.to_thread(self._run_tool, function_call.name, dict(function_call.args))
+
+    def _run_tool(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        label = name if name in TOOL_NAMES else "unknown"
+        with TOOL_SECONDS.time(tool=label):
+            result = self._dispatch_tool(name, args)
+        TOOL_CALLS.inc(tool=label, outcome="error" if "error" in result else "ok")
+        return result
+
+    def _dispatch_tool(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
         try:
             if name == "validate_digipin":
                 pin = args.get("pin", "")
-                valid = is_valid_digipin(pin)
+                valid = self.geo.is_valid_digipin(pin)
                 return {
                     "pin": pin,
                     "is_valid": valid,
@@ -223,15 +427,15 @@ class GeminiDigipinAgent:
                 }
 
             if name == "decode_digipin":
-                decoded = decode_digipin(args["pin"])
+                decoded = self.geo.decode_digipin(args["pin"])
                 return decoded.model_dump()
 
             if name == "encode_coordinates":
-                pin = encode_coordinates(float(args["latitude"]), float(args["longitude"]))
+                pin = self.geo.encode_coordinates(float(args["latitude"]), float(args["longitude"]))
                 return {"pin": pin}
 
             if name == "distance_between":
-                summary = get_distance_summary(args["start_pin"], args["end_pin"])
+                summary = self.geo.get_distance_summary(args["start_pin"], args["end_pin"])
                 return summary
 
             if name == "nearest_digipin":
@@ -241,7 +445,7 @@ class GeminiDigipinAgent:
                     candidate_list = list(candidates)
                 else:
                     candidate_list = [c.strip() for c in str(candidates).split(",") if c.strip()]
-                closest = nearest_pin(reference, candidate_list)
+                closest = self.geo.nearest_pin(reference, candidate_list)
                 return {"nearest": closest}
 
         except DigiPinValidationError as exc:
@@ -0,0 +1,199 @@
+"""Per-cell counts and weight sums at every DIGIPIN level.
+
+A level ``L`` cell is the set of pins sharing ``L`` leading symbols, which in
+packed form is ``code >> 4 * (10 - L)``. Sorted pins therefore group into
+contiguous runs at every level at once: :class:`PrefixAggregate` sorts (or
+reuses sorted) packed pins, reduces the runs into a level 10 table and then
+derives each coarser level from the finer table above it, so points are only
+touched once however many levels are kept.
+
+Every level is a sparse :class:`LevelTable` holding only occupied cells. Each
+table works out its cells' global grid row/column once, on its first viewport
+query, after which queries reduce to a vectorised range check.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import DIGIPIN_BOUNDS, DigiPinValidationError
+from .packed import (
+    PIN_LEVELS,
+    _cell_size,
+    _check_level,
+    _grid_bounds,
+    _prefix_grid,
+    format_prefixes,
+)
+
+BBox = Tuple[float, float, float, float]  # (min_lat, min_lon, max_lat, max_lon)
+
+MAX_ZOOM = 22
+
+
+def level_for_zoom(zoom: float) -> int:
+    """DIGIPIN level whose cells render at roughly 16 px on a web map at ``zoom``.
+
+    A 256 px tile spans ``360 / 2**zoom`` degrees; a level ``L`` cell spans
+    ``36 / 4**L``. Equating the cell with 1/16 of a tile gives
+    ``L = (zoom + log2(1.6)) / 2``.
+    """
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise DigiPinValidationError(f"zoom must be between 0 and {MAX_ZOOM}")
+    return min(max(int(round((zoom + math.log2(1.6)) / 2)), 1), PIN_LEVELS)
+
+
+@dataclass(frozen=True)
+class LevelTable:
+    """Occupied cells of one level, sorted by packed prefix."""
+
+    level: int
+    prefixes: np.ndarray
+    counts: np.ndarray
+    weights: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.prefixes.size)
+
+    @cached_property
+    def _grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _prefix_grid(self.prefixes, self.level)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Global grid row of every cell, counted from the northern edge."""
+        return self._grid[0]
+
+    @property
+    def cols(self) -> np.ndarray:
+        """Global grid column of every cell, counted from the western edge."""
+        return self._grid[1]
+
+    def take(self, selector) -> "LevelTable":
+        return LevelTable(self.level, self.prefixes[selector], self.counts[selector], self.weights[selector])
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """``(min_lat, min_lon, max_lat, max_lon)`` of every cell."""
+        return _grid_bounds(self.rows, self.cols, self.level)
+
+    def labels(self) -> np.ndarray:
+        """Dashed prefix strings of every cell."""
+        return format_prefixes(self.prefixes, self.level)
+
+
+def _runs(keys: np.ndarray) -> np.ndarray:
+    """Start offsets of the runs of equal values in sorted ``keys``."""
+    if not keys.size:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def _reduce(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if not starts.size:
+        return np.empty(0, dtype=values.dtype)
+    return np.add.reduceat(values, starts)
+
+
+class PrefixAggregate:
+    """Counts and weight sums of packed pins, rolled up through levels 1-10.
+
+    ``codes`` are packed pins (``INVALID_PACKED`` entries are skipped) and
+    ``weights`` an optional parallel array; without it every pin weighs 1.
+    Pass ``assume_sorted=True`` when ``codes`` are already in ascending order,
+    e.g. the codes of a :class:`~digipin_agent.index.DigipinIndex`, to skip the
+    sort. Jobs that only need coarse cells can pass level-``level`` prefixes,
+    e.g. from ``encode_packed(lats, lons, level)``; only levels 1 to ``level``
+    are then kept.
+    """
+
+    def __init__(
+        self,
+        codes,
+        weights: Optional[Sequence[float]] = None,
+        assume_sorted: bool = False,
+        level: int = PIN_LEVELS,
+    ):
+        self.level = _check_level(level)
+        codes = np.asarray(codes, dtype=np.uint64).ravel()
+        if weights is None:
+            if not assume_sorted:
+                codes = np.sort(codes)
+            weights = np.ones(codes.size, dtype=np.float64)
+        else:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            if weights.size != codes.size:
+                raise DigiPinValidationError("weights must have one value per pin")
+            if not assume_sorted:
+                order = np.argsort(codes)
+                codes, weights = codes[order], weights[order]
+        # Values wider than 4 * level bits, INVALID_PACKED included, are not cells and sort last.
+        valid = int(np.searchsorted(codes, np.uint64(1 << 4 * level)))
+        codes, weights = codes[:valid], weights[:valid]
+
+        starts = _runs(codes)
+        prefixes = codes[starts]
+        counts = np.diff(np.append(starts, codes.size)).astype(np.int64)
+        sums = _reduce(weights, starts)
+
+        self._tables: Dict[int, LevelTable] = {}
+        for table_level in range(level, 0, -1):
+            if table_level < level:
+                prefixes = prefixes >> np.uint64(4)
+                starts = _runs(prefixes)
+                prefixes = prefixes[starts]
+                counts = _reduce(counts, starts)
+                sums = _reduce(sums, starts)
+            self._tables[table_level] = LevelTable(table_level, prefixes, counts, sums)
+
+    @classmethod
+    def from_index(cls, index, weights: Optional[Sequence[float]] = None) -> "PrefixAggregate":
+        """Aggregate the pins of a :class:`~digipin_agent.index.DigipinIndex`.
+
+        ``weights`` follow the order the pins were given to the index.
+        """
+        codes = np.asarray(index._codes)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[np.asarray(index._positions)]
+        return cls(codes, weights, assume_sorted=True)
+
+    @property
+    def total_count(self) -> int:
+        return int(self._tables[1].counts.sum())
+
+    @property
+    def total_weight(self) -> float:
+        return float(self._tables[1].weights.sum())
+
+    def table(self, level: int) -> LevelTable:
+        if _check_level(level) > self.level:
+            raise DigiPinValidationError(f"This aggregate only has levels 1 to {self.level}")
+        return self._tables[level]
+
+    def query(self, level: int, bbox: Optional[BBox] = None) -> LevelTable:
+        """Occupied level-``level`` cells, limited to those intersecting ``bbox``."""
+        table = self.table(level)
+        if bbox is None:
+            return table
+        min_lat, min_lon, max_lat, max_lon = bbox
+        if min_lat > max_lat or min_lon > max_lon:
+            raise DigiPinValidationError("bbox must be (min_lat, min_lon, max_lat, max_lon)")
+        if (
+            max_lat < DIGIPIN_BOUNDS["min_lat"]
+            or min_lat > DIGIPIN_BOUNDS["max_lat"]
+            or max_lon < DIGIPIN_BOUNDS["min_lon"]
+            or min_lon > DIGIPIN_BOUNDS["max_lon"]
+        ):
+            return table.take(slice(0, 0))
+        lat_step, lon_step = _cell_size(level)
+        last = 4**level - 1
+        top = int(np.clip(math.floor((DIGIPIN_BOUNDS["max_lat"] - max_lat) / lat_step), 0, last))
+        bottom = int(np.clip(math.floor((DIGIPIN_BOUNDS["max_lat"] - min_lat) / lat_step), 0, last))
+        left = int(np.clip(math.floor((min_lon - DIGIPIN_BOUNDS["min_lon"]) / lon_step), 0, last))
+        right = int(np.clip(math.floor((max_lon - DIGIPIN_BOUNDS["min_lon"]) / lon_step), 0, last))
+        mask = (table.rows >= top) & (table.rows <= bottom) & (table.cols >= left) & (table.cols <= right)
+        return table.take(mask)
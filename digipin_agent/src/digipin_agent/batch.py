@@ -0,0 +1,230 @@
+"""Multi-process batch geocoding over memory-mapped ``.npy`` files.
+
+Offline jobs run into the hundreds of millions of rows, far more than one core
+gets through in a nightly window. :func:`run_batch` splits the rows of an
+input file into chunks and hands them to a process pool. Workers open the
+input and a preallocated output file as memory maps and write their results in
+place, so only ``(start, stop)`` offsets are pickled and the output keeps the
+input order whichever worker finishes first.
+
+Supported operations and file layouts:
+
+* ``encode`` – ``(n, 2)`` float latitude/longitude rows to ``(n,)`` packed
+  ``uint64`` pins (``INVALID_PACKED`` for out-of-range points), or ``S12``
+  dashed strings with ``pins=True``
+* ``decode`` – ``(n,)`` packed pins or fixed-width pin strings to ``(n, 2)``
+  ``float64`` cell centres (NaN for invalid pins)
+* ``validate`` – ``(n,)`` fixed-width pin strings to ``(n,)`` ``uint8``
+  ``REASON_*`` codes
+
+With ``level`` below 10, every operation works on level-``level`` cells
+instead: encode writes packed prefixes (or dashed prefixes such as ``39J-4``)
+and computes only that many subdivisions, decode and validate expect such
+prefixes and decode returns the centres of their cells.
+
+The same engine is available from the command line::
+
+    digipin-batch encode points.npy pins.npy --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from . import geo
+from .geo import PIN_LEVELS, DigiPinValidationError, _check_level, _pin_width, decode_many, encode_many, validate_many
+from .packed import INVALID_PACKED, decode_packed, encode_packed
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("encode", "decode", "validate")
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Summary of a :func:`run_batch` job."""
+
+    operation: str
+    rows: int
+    invalid: int
+    workers: int
+    chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second, 1)}
+
+
+def _output_layout(
+    operation: str, source: np.ndarray, pins: bool, level: int = PIN_LEVELS
+) -> Tuple[np.dtype, Tuple[int, ...]]:
+    """Check ``source`` for ``operation`` and return the output dtype and shape."""
+    if operation not in OPERATIONS:
+        raise DigiPinValidationError(f"Unsupported operation: {operation}")
+    kind = source.dtype.kind
+    if operation == "encode":
+        if source.ndim != 2 or source.shape[1] != 2 or kind != "f":
+            raise DigiPinValidationError("encode expects an (n, 2) float array of latitude/longitude rows")
+        return (np.dtype(f"S{_pin_width(level)}") if pins else np.dtype(np.uint64)), (source.shape[0],)
+    if source.ndim != 1:
+        raise DigiPinValidationError(f"{operation} expects a one-dimensional array of pins")
+    if operation == "decode":
+        if kind not in "uSU":
+            raise DigiPinValidationError("decode expects packed uint64 pins or fixed-width pin strings")
+        return np.dtype(np.float64), (source.shape[0], 2)
+    if kind not in "SU":
+        raise DigiPinValidationError("validate expects fixed-width pin strings")
+    return np.dtype(np.uint8), source.shape
+
+
+def _as_text(pins: np.ndarray) -> np.ndarray:
+    return pins.astype(str) if pins.dtype.kind == "S" else pins
+
+
+def _process_chunk(operation: str, source: np.ndarray, target: np.ndarray, level: int = PIN_LEVELS) -> int:
+    """Fill ``target`` from ``source`` in place and return the invalid row count."""
+    if operation == "encode":
+        lats = np.ascontiguousarray(source[:, 0], dtype=np.float64)
+        lons = np.ascontiguousarray(source[:, 1], dtype=np.float64)
+        if target.dtype.kind == "S":
+            pins = encode_many(lats, lons, level)
+            target[:] = pins.astype(target.dtype)
+            return int((pins == geo.INVALID_PIN).sum())
+        codes = encode_packed(lats, lons, level)
+        target[:] = codes
+        return int((codes == INVALID_PACKED).sum())
+
+    if operation == "decode":
+        if source.dtype.kind == "u":
+            decoded = decode_packed(np.asarray(source, dtype=np.uint64), level)
+        else:
+            decoded = decode_many(_as_text(np.asarray(source)), level)
+        target[:, 0] = decoded.latitude
+        target[:, 1] = decoded.longitude
+        return int((~decoded.valid).sum())
+
+    valid, reasons = validate_many(_as_text(np.asarray(source)), level)
+    target[:] = reasons
+    return int((~valid).sum())
+
+
+def _init_worker(backend: str) -> None:
+    geo.set_backend(backend)
+
+
+def _run_chunk(
+    operation: str, input_path: str, output_path: str, start: int, stop: int, level: int = PIN_LEVELS
+) -> int:
+    """Worker entry point: map both files, process rows ``[start, stop)`` in place."""
+    source = np.load(input_path, mmap_mode="r")
+    target = np.load(output_path, mmap_mode="r+")
+    invalid = _process_chunk(operation, source[start:stop], target[start:stop], level)
+    target.flush()
+    return invalid
+
+
+def _chunk_bounds(rows: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size, rows)) for start in range(0, rows, chunk_size)]
+
+
+def run_batch(
+    operation: str,
+    input_path: PathLike,
+    output_path: PathLike,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pins: bool = False,
+    level: int = PIN_LEVELS,
+) -> BatchResult:
+    """Run ``operation`` over the ``.npy`` file at ``input_path`` into ``output_path``.
+
+    ``workers`` defaults to the number of usable CPUs; with one worker (or a
+    single chunk) the job runs in the calling process. ``pins=True`` makes
+    ``encode`` write dashed ``S12`` strings instead of packed integers.
+    ``level`` selects the cell resolution (see the module docstring).
+    """
+    _check_level(level)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    if workers is None:
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be positive")
+
+    input_path, output_path = str(input_path), str(output_path)
+    started = time.perf_counter()
+    source = np.load(input_path, mmap_mode="r")
+    dtype, shape = _output_layout(operation, source, pins, level)
+    rows = int(source.shape[0])
+    # Preallocate the output so every worker can write its slice in place.
+    np.lib.format.open_memmap(output_path, mode="w+", dtype=dtype, shape=shape).flush()
+
+    chunks = _chunk_bounds(rows, chunk_size)
+    workers = min(workers, len(chunks)) or 1
+    if workers == 1:
+        invalid = sum(_run_chunk(operation, input_path, output_path, start, stop, level) for start, stop in chunks)
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(geo.get_backend(),)) as pool:
+            futures = [
+                pool.submit(_run_chunk, operation, input_path, output_path, start, stop, level) for start, stop in chunks
+            ]
+            invalid = sum(future.result() for future in futures)
+
+    result = BatchResult(operation, rows, invalid, workers, len(chunks), time.perf_counter() - started)
+    logger.info(
+        "%s: %d rows (%d invalid) in %.2fs with %d workers, %.0f rows/s",
+        operation,
+        rows,
+        invalid,
+        result.seconds,
+        workers,
+        result.rows_per_second,
+    )
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="digipin-batch", description=__doc__.splitlines()[0])
+    parser.add_argument("operation", choices=OPERATIONS)
+    parser.add_argument("input", type=Path, help="input .npy file")
+    parser.add_argument("output", type=Path, help="output .npy file (overwritten)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: usable CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per task")
+    parser.add_argument("--pins", action="store_true", help="encode to dashed strings instead of packed uint64")
+    parser.add_argument("--level", type=int, default=PIN_LEVELS, help="cell level 1-10 (default: 10, full pins)")
+    parser.add_argument("--backend", choices=geo.GEO_BACKENDS, help="geo kernel backend")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        geo.set_backend(args.backend)
+    try:
+        result = run_batch(
+            args.operation, args.input, args.output, args.workers, args.chunk_size, args.pins, args.level
+        )
+    except (ValueError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    print(json.dumps(result.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
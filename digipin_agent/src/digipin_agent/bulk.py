@@ -0,0 +1,184 @@
+"""Chunked CSV / NDJSON geocoding built on the vectorised geo helpers.
+
+The iterators here consume text lines lazily and yield one serialised output
+block per chunk, so memory use is bounded by ``chunk_size`` regardless of the
+input size and a consumer that stops pulling also stops the work.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import math
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import DIGIPIN_BOUNDS, DigiPinValidationError, decode_many, encode_many, validation_messages
+
+OPERATIONS = ("encode", "decode")
+DEFAULT_CHUNK_SIZE = 10000
+
+LATITUDE_KEYS = ("latitude", "lat")
+LONGITUDE_KEYS = ("longitude", "lon", "lng")
+PIN_KEYS = ("digipin", "pin")
+
+
+def _check_operation(operation: str) -> None:
+    if operation not in OPERATIONS:
+        raise DigiPinValidationError(f"Unsupported operation: {operation}")
+
+
+def _find_key(names: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    lowered = {name.strip().lower(): name for name in names}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def _parse_float(value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number
+
+
+def _encode_chunk(lat_values: List[Any], lon_values: List[Any]) -> Tuple[List[str], List[str]]:
+    """Encode raw (possibly unparsable) values, returning ``(pins, errors)``."""
+    lats = np.array([_parse_float(value) for value in lat_values], dtype=np.float64)
+    lons = np.array([_parse_float(value) for value in lon_values], dtype=np.float64)
+    pins = encode_many(lats, lons).tolist()
+
+    errors = [""] * len(pins)
+    for index, pin in enumerate(pins):
+        if pin:
+            continue
+        if math.isnan(lats[index]) or math.isnan(lons[index]):
+            errors[index] = "Latitude and longitude must be numbers"
+        elif not DIGIPIN_BOUNDS["min_lat"] <= lats[index] <= DIGIPIN_BOUNDS["max_lat"]:
+            errors[index] = "Latitude out of range for DIGIPIN grid"
+        else:
+            errors[index] = "Longitude out of range for DIGIPIN grid"
+    return pins, errors
+
+
+def _decode_chunk(pin_values: List[Any]) -> Tuple[List[Optional[float]], List[Optional[float]], List[str]]:
+    """Decode raw pin values, returning ``(latitudes, longitudes, errors)``."""
+    decoded = decode_many(np.array([value if isinstance(value, str) else None for value in pin_values], dtype=object))
+    valid = decoded.valid.tolist()
+    latitudes = [lat if ok else None for lat, ok in zip(decoded.latitude.tolist(), valid)]
+    longitudes = [lon if ok else None for lon, ok in zip(decoded.longitude.tolist(), valid)]
+
+    errors = [message or "" for message in validation_messages(pin_values, ~decoded.valid)]
+    return latitudes, longitudes, errors
+
+
+def iter_csv(lines: Iterable[str], operation: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Stream CSV results for ``operation`` over CSV ``lines``.
+
+    The input needs a header naming the latitude/longitude columns (encode) or
+    the DIGIPIN column (decode). Each input row is echoed back with the result
+    columns appended. The first yielded block is the output header, which lets
+    callers surface header errors before they start streaming.
+    """
+    _check_operation(operation)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        raise DigiPinValidationError("CSV input is empty")
+
+    if operation == "encode":
+        lat_key = _find_key(header, LATITUDE_KEYS)
+        lon_key = _find_key(header, LONGITUDE_KEYS)
+        if lat_key is None or lon_key is None:
+            raise DigiPinValidationError("CSV header must include latitude and longitude columns")
+        columns = (header.index(lat_key), header.index(lon_key))
+        extra = ["digipin", "error"]
+    else:
+        pin_key = _find_key(header, PIN_KEYS)
+        if pin_key is None:
+            raise DigiPinValidationError("CSV header must include a digipin column")
+        columns = (header.index(pin_key),)
+        extra = ["latitude", "longitude", "error"]
+
+    yield _write_csv([header + extra])
+
+    width = max(columns) + 1
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        padded = [row if len(row) >= width else row + [""] * (width - len(row)) for row in rows]
+        if operation == "encode":
+            pins, errors = _encode_chunk([row[columns[0]] for row in padded], [row[columns[1]] for row in padded])
+            results = zip(pins, errors)
+        else:
+            latitudes, longitudes, errors = _decode_chunk([row[columns[0]] for row in padded])
+            results = zip(
+                ("" if value is None else repr(value) for value in latitudes),
+                ("" if value is None else repr(value) for value in longitudes),
+                errors,
+            )
+        yield _write_csv(row + list(result) for row, result in zip(padded, results))
+
+
+def _write_csv(rows: Iterable[List[str]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_ndjson(lines: Iterable[str], operation: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Stream NDJSON results for ``operation`` over NDJSON ``lines``.
+
+    Every non-blank input line produces exactly one output object: the input
+    object with result fields added, or ``{"line": n, "error": ...}`` when the
+    line is not a JSON object.
+    """
+    _check_operation(operation)
+    numbered = ((number, line) for number, line in enumerate(lines, start=1) if line.strip())
+    while True:
+        batch = list(islice(numbered, chunk_size))
+        if not batch:
+            return
+
+        records: List[Optional[Dict[str, Any]]] = []
+        for number, line in batch:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            records.append(record if isinstance(record, dict) else None)
+
+        objects = [record or {} for record in records]
+        if operation == "encode":
+            lat_values = [_lookup(record, LATITUDE_KEYS) for record in objects]
+            lon_values = [_lookup(record, LONGITUDE_KEYS) for record in objects]
+            pins, errors = _encode_chunk(lat_values, lon_values)
+            for record, pin, error in zip(objects, pins, errors):
+                record["digipin"] = pin or None
+                record["error"] = error or None
+        else:
+            latitudes, longitudes, errors = _decode_chunk([_lookup(record, PIN_KEYS) for record in objects])
+            for record, lat, lon, error in zip(objects, latitudes, longitudes, errors):
+                record["latitude"] = lat
+                record["longitude"] = lon
+                record["error"] = error or None
+
+        out = []
+        for (number, _), record, result in zip(batch, records, objects):
+            if record is None:
+                result = {"line": number, "error": "Line is not a JSON object"}
+            out.append(json.dumps(result))
+        yield "\n".join(out) + "\n"
+
+
+def _lookup(record: Dict[str, Any], keys: Sequence[str]) -> Any:
+    for key in keys:
+        if key in record:
+            return record[key]
+    return None
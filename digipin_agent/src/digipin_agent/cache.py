@@ -0,0 +1,164 @@
+"""Optional bounded caches in front of the scalar geo helpers.
+
+Production traffic is heavily skewed towards a few thousand hot pins, so a
+small cache in front of :func:`~digipin_agent.geo.decode_digipin` and
+:func:`~digipin_agent.geo.encode_coordinates` avoids most of the per-request
+work. :class:`GeoCache` exposes the same function names as :mod:`.geo` so it
+can be swapped in wherever the module is used.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from . import geo
+from .geo import DecodedDigipin, DigiPinValidationError, _haversine
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class BoundedCache:
+    """Thread-safe mapping with a size bound and hit/miss/eviction counters.
+
+    ``policy="lru"`` refreshes an entry on every hit; ``"fifo"`` evicts in
+    insertion order regardless of use. A ``maxsize`` of 0 disables caching
+    while still counting misses.
+    """
+
+    def __init__(self, maxsize: int = 10000, policy: str = "lru"):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss.
+
+        Exceptions from ``compute`` propagate and nothing is cached.
+        """
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                if self.policy == "lru":
+                    self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+        if self.maxsize:
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class GeoCache:
+    """Cached drop-in for the scalar functions of :mod:`digipin_agent.geo`.
+
+    Decodes are keyed by the normalised pin and encodes by the exact
+    coordinates, so results always match the uncached functions. Passing
+    ``encode_precision`` rounds encode keys to that many decimal places for a
+    higher hit rate: the rounded point is what gets encoded, so results stay
+    deterministic per key but may differ from the exact encode for points
+    close to a cell edge (7 places is about 1 cm). Out-of-range input is
+    rejected before rounding either way.
+    """
+
+    # Candidate lists longer than this go through the vectorised nearest_pin,
+    # which beats per-candidate cache lookups on large inputs.
+    nearest_scan_limit = 256
+
+    def __init__(
+        self,
+        decode_size: int = 10000,
+        encode_size: int = 10000,
+        policy: str = "lru",
+        encode_precision: Optional[int] = None,
+    ):
+        self.decodes = BoundedCache(decode_size, policy)
+        self.encodes = BoundedCache(encode_size, policy)
+        self.encode_precision = encode_precision
+
+    def decode_digipin(self, pin: str) -> DecodedDigipin:
+        clean = geo._normalise_pin(pin)
+        return self.decodes.get_or_compute(clean, lambda: geo.decode_digipin(clean))
+
+    def encode_coordinates(self, lat: float, lon: float) -> str:
+        geo._check_coordinates(lat, lon)
+        key = self._encode_key(lat, lon)
+        return self.encodes.get_or_compute(key, lambda: geo.encode_coordinates(*key))
+
+    def _encode_key(self, lat: float, lon: float) -> Tuple[float, float]:
+        if self.encode_precision is None:
+            return float(lat), float(lon)
+        return round(float(lat), self.encode_precision), round(float(lon), self.encode_precision)
+
+    def is_valid_digipin(self, pin: str) -> bool:
+        return geo.is_valid_digipin(pin)
+
+    def get_distance_meters(self, pin_a: str, pin_b: str) -> float:
+        start = self.decode_digipin(pin_a)
+        end = self.decode_digipin(pin_b)
+        return _haversine(start.latitude, start.longitude, end.latitude, end.longitude)
+
+    def get_distance_summary(self, pin_a: str, pin_b: str) -> dict:
+        meters = self.get_distance_meters(pin_a, pin_b)
+        return {
+            "meters": meters,
+            "kilometers": meters / 1000.0,
+            "formatted": f"{meters/1000.0:.2f} km",
+        }
+
+    def nearest_pin(self, reference_pin: str, pins: Iterable[str]) -> str:
+        pins_list = list(pins)
+        if not pins_list:
+            raise DigiPinValidationError("No DIGIPIN values supplied")
+        if len(pins_list) > self.nearest_scan_limit:
+            return geo.nearest_pin(reference_pin, pins_list)
+        reference = self.decode_digipin(reference_pin)
+
+        def distance_to(pin: str) -> float:
+            decoded = self.decode_digipin(pin)
+            return _haversine(reference.latitude, reference.longitude, decoded.latitude, decoded.longitude)
+
+        return min(pins_list, key=distance_to)
+
+    def clear(self) -> None:
+        self.decodes.clear()
+        self.encodes.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {"decode": self.decodes.stats(), "encode": self.encodes.stats()}
@@ -0,0 +1,393 @@
+"""Compact DIGIPIN coverings of bounding boxes and GeoJSON polygons.
+
+:func:`cover_bbox` and :func:`cover_polygon` walk the 4x4 hierarchy from the
+16 level 1 cells down. A cell entirely inside the region is emitted at its
+own (coarse) level, a cell entirely outside is dropped, and only cells on the
+boundary are split further, down to the requested level. The result is a
+mixed-level covering: a short list of prefixes whose union contains the
+region, with fine cells only along its edge.
+
+Cells are classified for a whole level at once. A cell is on the boundary of
+a polygon exactly when some polygon edge meets it, otherwise it is uniformly
+inside or outside, which its centre decides. Coverings are conservative:
+cells that only touch the polygon boundary are included.
+
+:class:`CoverageCache` memoises coverings, so repeated service-area lookups
+skip the descent entirely. :class:`CoverageRaster` runs the same descent once
+into a full-grid bitmap for O(1) point-in-boundary checks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+from .cache import BoundedCache
+from .geo import DIGIPIN_BOUNDS, DigiPinValidationError
+from .packed import PIN_LEVELS, _cell_size, _check_level, _grid_bounds, _prefix_grid, format_prefixes
+
+BBox = Tuple[float, float, float, float]  # (min_lat, min_lon, max_lat, max_lon)
+Cells = Dict[int, np.ndarray]  # level -> sorted packed prefixes
+
+OUTSIDE, PARTIAL, INSIDE = 0, 1, 2
+
+DEFAULT_MAX_CELLS = 1_000_000
+# Cells x edges evaluated per block when classifying against a polygon.
+_BLOCK_ELEMENTS = 1 << 20
+
+_CHILDREN = np.arange(16, dtype=np.uint64)
+
+
+def _check_bbox(bbox: Sequence[float]) -> BBox:
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(value) for value in bbox)
+    except (TypeError, ValueError) as exc:
+        raise DigiPinValidationError("bbox must be (min_lat, min_lon, max_lat, max_lon)") from exc
+    if not (min_lat <= max_lat and min_lon <= max_lon):
+        raise DigiPinValidationError("bbox must be (min_lat, min_lon, max_lat, max_lon)")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def _overlap(low: np.ndarray, high: np.ndarray, start: float, end: float) -> np.ndarray:
+    # Positive-length overlap, except for a degenerate (zero-width) range.
+    if end > start:
+        return (high > start) & (low < end)
+    return (high >= start) & (low <= end)
+
+
+def _bbox_classifier(bbox: BBox) -> Callable[..., np.ndarray]:
+    b_min_lat, b_min_lon, b_max_lat, b_max_lon = bbox
+
+    def classify(min_lat, min_lon, max_lat, max_lon) -> np.ndarray:
+        state = np.full(min_lat.shape, OUTSIDE, dtype=np.int8)
+        meets = _overlap(min_lat, max_lat, b_min_lat, b_max_lat) & _overlap(min_lon, max_lon, b_min_lon, b_max_lon)
+        state[meets] = PARTIAL
+        inside = (min_lat >= b_min_lat) & (max_lat <= b_max_lat) & (min_lon >= b_min_lon) & (max_lon <= b_max_lon)
+        state[meets & inside] = INSIDE
+        return state
+
+    return classify
+
+
+def _geometry_polygons(geojson: Mapping[str, Any]) -> List[List[Any]]:
+    """Flatten a GeoJSON object into a list of polygons (lists of rings)."""
+    if not isinstance(geojson, Mapping):
+        raise DigiPinValidationError("GeoJSON must be an object")
+    kind = geojson.get("type")
+    if kind == "FeatureCollection":
+        return [polygon for feature in geojson.get("features") or [] for polygon in _geometry_polygons(feature)]
+    if kind == "Feature":
+        return _geometry_polygons(geojson.get("geometry") or {})
+    if kind == "GeometryCollection":
+        return [polygon for geometry in geojson.get("geometries") or [] for polygon in _geometry_polygons(geometry)]
+    if kind == "Polygon":
+        return [geojson.get("coordinates") or []]
+    if kind == "MultiPolygon":
+        return list(geojson.get("coordinates") or [])
+    raise DigiPinValidationError(f"Unsupported GeoJSON type: {kind}")
+
+
+def _polygon_edges(geojson: Mapping[str, Any]) -> np.ndarray:
+    """``(n, 4)`` array of ``(lon1, lat1, lon2, lat2)`` edges over every ring."""
+    edges = []
+    for polygon in _geometry_polygons(geojson):
+        for ring in polygon:
+            try:
+                points = np.asarray(ring, dtype=np.float64)[:, :2]
+            except (TypeError, ValueError, IndexError) as exc:
+                raise DigiPinValidationError("GeoJSON rings must be lists of [lon, lat] positions") from exc
+            if points.shape[0] < 3 or not np.isfinite(points).all():
+                raise DigiPinValidationError("GeoJSON rings need at least three finite positions")
+            if not np.array_equal(points[0], points[-1]):
+                points = np.vstack([points, points[:1]])
+            edges.append(np.hstack([points[:-1], points[1:]]))
+    if not edges:
+        raise DigiPinValidationError("GeoJSON contains no polygons")
+    return np.vstack(edges)
+
+
+def _points_in_polygon(lon: np.ndarray, lat: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Even-odd point-in-polygon test for many points against all rings."""
+    x1, y1, x2, y2 = (edges[:, column] for column in range(4))
+    inside = np.zeros(lon.shape, dtype=bool)
+    step = max(1, _BLOCK_ELEMENTS // len(edges))
+    for start in range(0, lon.size, step):
+        px = lon[start : start + step, None]
+        py = lat[start : start + step, None]
+        spans = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = (spans & (px < crossing_x)).sum(axis=1)
+        inside[start : start + step] = crossings % 2 == 1
+    return inside
+
+
+def _edges_meet_cells(min_lat, min_lon, max_lat, max_lon, edges: np.ndarray) -> np.ndarray:
+    """Whether any edge meets each (closed) cell, by the separating axis test."""
+    x1, y1, x2, y2 = (edges[:, column] for column in range(4))
+    low_x, high_x = np.minimum(x1, x2), np.maximum(x1, x2)
+    low_y, high_y = np.minimum(y1, y2), np.maximum(y1, y2)
+    dx, dy = x2 - x1, y2 - y1
+
+    meets = np.zeros(min_lat.shape, dtype=bool)
+    step = max(1, _BLOCK_ELEMENTS // len(edges))
+    for start in range(0, min_lat.size, step):
+        block = slice(start, start + step)
+        west, east = min_lon[block, None], max_lon[block, None]
+        south, north = min_lat[block, None], max_lat[block, None]
+        candidate = (high_x >= west) & (low_x <= east) & (high_y >= south) & (low_y <= north)
+        # Which side of the edge's line each cell corner lies on.
+        sides = [dx * (y - y1) - dy * (x - x1) for x, y in ((west, south), (west, north), (east, south), (east, north))]
+        above = (sides[0] > 0) & (sides[1] > 0) & (sides[2] > 0) & (sides[3] > 0)
+        below = (sides[0] < 0) & (sides[1] < 0) & (sides[2] < 0) & (sides[3] < 0)
+        meets[block] = (candidate & ~above & ~below).any(axis=1)
+    return meets
+
+
+def _polygon_classifier(edges: np.ndarray) -> Callable[..., np.ndarray]:
+    west, east = float(min(edges[:, 0].min(), edges[:, 2].min())), float(max(edges[:, 0].max(), edges[:, 2].max()))
+    south, north = float(min(edges[:, 1].min(), edges[:, 3].min())), float(max(edges[:, 1].max(), edges[:, 3].max()))
+
+    def classify(min_lat, min_lon, max_lat, max_lon) -> np.ndarray:
+        state = np.full(min_lat.shape, OUTSIDE, dtype=np.int8)
+        near = np.flatnonzero((max_lon >= west) & (min_lon <= east) & (max_lat >= south) & (min_lat <= north))
+        if not near.size:
+            return state
+        cells = (min_lat[near], min_lon[near], max_lat[near], max_lon[near])
+        boundary = _edges_meet_cells(*cells, edges)
+        state[near[boundary]] = PARTIAL
+        interior = near[~boundary]
+        centre_lat = (min_lat[interior] + max_lat[interior]) / 2.0
+        centre_lon = (min_lon[interior] + max_lon[interior]) / 2.0
+        state[interior[_points_in_polygon(centre_lon, centre_lat, edges)]] = INSIDE
+        return state
+
+    return classify
+
+
+def _compact(cells: Cells) -> Cells:
+    """Replace every complete set of 16 siblings by their parent, bottom up."""
+    for level in range(max(cells, default=0), 1, -1):
+        prefixes = cells.get(level)
+        if prefixes is None or prefixes.size < 16:
+            continue
+        parents, counts = np.unique(prefixes >> np.uint64(4), return_counts=True)
+        full = parents[counts == 16]
+        if full.size:
+            cells[level] = prefixes[~np.isin(prefixes >> np.uint64(4), full)]
+            cells[level - 1] = np.union1d(cells.get(level - 1, np.empty(0, dtype=np.uint64)), full)
+    return {level: prefixes for level, prefixes in cells.items() if prefixes.size}
+
+
+def _descend(classify: Callable[..., np.ndarray], level: int, max_cells: int) -> Tuple[Cells, np.ndarray]:
+    """Return the cells found entirely inside (by level) and the boundary cells at ``level``."""
+    _check_level(level)
+    inside: Cells = {}
+    frontier = _CHILDREN.copy()
+    current = 1
+    while True:
+        rows, cols = _prefix_grid(frontier, current)
+        state = classify(*_grid_bounds(rows, cols, current))
+        inside[current] = frontier[state == INSIDE]
+        partial = frontier[state == PARTIAL]
+        if current == level or not partial.size:
+            return inside, partial if current == level else np.empty(0, dtype=np.uint64)
+        if partial.size * 16 > max_cells:
+            raise DigiPinValidationError(
+                f"Covering at level {level} exceeds {max_cells} cells; use a coarser level"
+            )
+        frontier = ((partial[:, None] << np.uint64(4)) | _CHILDREN).ravel()
+        current += 1
+
+
+def _cover_cells(classify: Callable[..., np.ndarray], level: int, max_cells: int) -> Cells:
+    cells, boundary = _descend(classify, level, max_cells)
+    cells[level] = np.union1d(cells.get(level, np.empty(0, dtype=np.uint64)), boundary)
+    return _compact(cells)
+
+
+def _render(cells: Cells) -> List[str]:
+    """Dashed prefixes ordered along the hierarchy (parents before their area's neighbours)."""
+    keys, labels = [], []
+    for level, prefixes in cells.items():
+        keys.append(prefixes << np.uint64(4 * (PIN_LEVELS - level)))
+        labels.extend(format_prefixes(prefixes, level).tolist())
+    if not labels:
+        return []
+    order = np.argsort(np.concatenate(keys), kind="stable")
+    return [labels[index] for index in order.tolist()]
+
+
+def cover_bbox(bbox: Sequence[float], level: int, max_cells: int = DEFAULT_MAX_CELLS) -> List[str]:
+    """Compact covering of ``bbox`` (``(min_lat, min_lon, max_lat, max_lon)``) down to ``level``.
+
+    Returns dashed prefixes of mixed length (at most ``level`` symbols).
+    Raises :class:`DigiPinValidationError` when the boundary would need more
+    than ``max_cells`` cells.
+    """
+    return _render(_cover_cells(_bbox_classifier(_check_bbox(bbox)), level, max_cells))
+
+
+def cover_polygon(geojson: Mapping[str, Any], level: int, max_cells: int = DEFAULT_MAX_CELLS) -> List[str]:
+    """Compact covering of a GeoJSON (Multi)Polygon, Feature or FeatureCollection.
+
+    Coordinates are GeoJSON ``[lon, lat]`` positions; holes and multiple
+    polygons follow the even-odd rule.
+    """
+    return _render(_cover_cells(_polygon_classifier(_polygon_edges(geojson)), level, max_cells))
+
+
+def _geojson_key(geojson: Mapping[str, Any]) -> str:
+    payload = json.dumps(geojson, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CoverageCache:
+    """Bounded cache of coverings, keyed on the region and level.
+
+    Polygons are keyed by a hash of their canonical JSON, so the same service
+    area sent again (even with keys in a different order) is a cache hit.
+    """
+
+    def __init__(self, maxsize: int = 256, policy: str = "lru", max_cells: int = DEFAULT_MAX_CELLS):
+        self.coverings = BoundedCache(maxsize, policy)
+        self.max_cells = max_cells
+
+    def _get(self, key: Hashable, compute: Callable[[], List[str]]) -> List[str]:
+        return list(self.coverings.get_or_compute(key, lambda: tuple(compute())))
+
+    def cover_bbox(self, bbox: Sequence[float], level: int) -> List[str]:
+        bbox = _check_bbox(bbox)
+        return self._get(("bbox", bbox, level), lambda: cover_bbox(bbox, level, self.max_cells))
+
+    def cover_polygon(self, geojson: Mapping[str, Any], level: int) -> List[str]:
+        return self._get(
+            ("polygon", _geojson_key(geojson), level), lambda: cover_polygon(geojson, level, self.max_cells)
+        )
+
+    def clear(self) -> None:
+        self.coverings.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.coverings.stats()
+
+
+MAX_RASTER_LEVEL = 6
+
+
+class CoverageRaster:
+    """Precomputed point-in-boundary test, e.g. for India's border.
+
+    The DIGIPIN grid is rasterised once at ``level`` (a ``4**level`` square
+    of one byte per cell, 1 MiB at the default level 5) into cells that are
+    entirely inside, entirely outside, or on the boundary. :meth:`contains`
+    then answers most points with a single array lookup; only points in
+    boundary cells get an exact even-odd test, and only against the polygon
+    edges that cross their raster row.
+    """
+
+    def __init__(self, geojson: Mapping[str, Any], level: int = 5):
+        if not 1 <= level <= MAX_RASTER_LEVEL:
+            raise DigiPinValidationError(f"Raster level must be between 1 and {MAX_RASTER_LEVEL}")
+        self.level = level
+        self._edges = _polygon_edges(geojson)
+        inside, boundary = _descend(_polygon_classifier(self._edges), level, max_cells=4 ** (2 * level))
+
+        side = 4**level
+        self._raster = np.full((side, side), OUTSIDE, dtype=np.uint8)
+        for depth, prefixes in inside.items():
+            self._paint(prefixes, depth, INSIDE)
+        self._paint(boundary, level, PARTIAL)
+        self._index_edges()
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], level: int = 5) -> "CoverageRaster":
+        """Build from a GeoJSON file, such as ``public/india.geojson``."""
+        return cls(json.loads(Path(path).read_text()), level)
+
+    def _paint(self, prefixes: np.ndarray, depth: int, state: int) -> None:
+        if not prefixes.size:
+            return
+        scale = 4 ** (self.level - depth)
+        rows, cols = _prefix_grid(prefixes, depth)
+        offsets = np.arange(scale)
+        row_index = (rows[:, None] * scale + offsets)[:, :, None]
+        col_index = (cols[:, None] * scale + offsets)[:, None, :]
+        self._raster[row_index, col_index] = state
+
+    def _index_edges(self) -> None:
+        """Bucket edge indices by the raster rows (latitude bands) their y-span covers."""
+        last = self._raster.shape[0] - 1
+        lat_step, _ = _cell_size(self.level)
+        top = DIGIPIN_BOUNDS["max_lat"]
+        high = np.maximum(self._edges[:, 1], self._edges[:, 3])
+        low = np.minimum(self._edges[:, 1], self._edges[:, 3])
+        # One band of slack on each side absorbs rounding at band edges.
+        first = np.clip(np.floor((top - high) / lat_step).astype(np.int64) - 1, 0, last)
+        final = np.clip(np.floor((top - low) / lat_step).astype(np.int64) + 1, 0, last)
+        spans = final - first + 1
+        edge_ids = np.repeat(np.arange(len(self._edges)), spans)
+        band_ids = np.repeat(first - np.cumsum(spans) + spans, spans) + np.arange(spans.sum())
+        order = np.argsort(band_ids, kind="stable")
+        self._band_edges = edge_ids[order]
+        self._band_offsets = np.concatenate(([0], np.cumsum(np.bincount(band_ids, minlength=last + 1))))
+
+    def _cells(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Raster ``(rows, cols)`` with the encoder's edge rules (north and east cells win)."""
+        last = self._raster.shape[0] - 1
+        lat_step, lon_step = _cell_size(self.level)
+        rows = np.ceil((DIGIPIN_BOUNDS["max_lat"] - lat) / lat_step).astype(np.int64) - 1
+        cols = np.floor((lon - DIGIPIN_BOUNDS["min_lon"]) / lon_step).astype(np.int64)
+        return np.clip(rows, 0, last), np.clip(cols, 0, last)
+
+    def contains(self, lats, lons) -> np.ndarray:
+        """Vectorised in/out test; points outside ``DIGIPIN_BOUNDS`` (or NaN) are outside."""
+        lat, lon = np.broadcast_arrays(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        shape = lat.shape
+        lat, lon = lat.ravel(), lon.ravel()
+        result = np.zeros(lat.size, dtype=bool)
+        in_grid = np.flatnonzero(
+            (lat >= DIGIPIN_BOUNDS["min_lat"])
+            & (lat <= DIGIPIN_BOUNDS["max_lat"])
+            & (lon >= DIGIPIN_BOUNDS["min_lon"])
+            & (lon <= DIGIPIN_BOUNDS["max_lon"])
+        )
+        rows, cols = self._cells(lat[in_grid], lon[in_grid])
+        state = self._raster[rows, cols]
+        result[in_grid[state == INSIDE]] = True
+
+        boundary = state == PARTIAL
+        if boundary.any():
+            points = in_grid[boundary]
+            result[points] = self._exact(lat[points], lon[points], rows[boundary])
+        return result.reshape(shape)
+
+    def contains_point(self, lat: float, lon: float) -> bool:
+        return bool(self.contains(lat, lon))
+
+    def _exact(self, lat: np.ndarray, lon: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        inside = np.zeros(lat.size, dtype=bool)
+        order = np.argsort(rows, kind="stable")
+        bands, starts = np.unique(rows[order], return_index=True)
+        stops = np.append(starts[1:], order.size)
+        for band, start, stop in zip(bands.tolist(), starts.tolist(), stops.tolist()):
+            edges = self._edges[self._band_edges[self._band_offsets[band] : self._band_offsets[band + 1]]]
+            if edges.size:
+                members = order[start:stop]
+                inside[members] = _points_in_polygon(lon[members], lat[members], edges)
+        return inside
+
+    def stats(self) -> Dict[str, Any]:
+        counts = np.bincount(self._raster.ravel(), minlength=3)
+        return {
+            "level": self.level,
+            "inside_cells": int(counts[INSIDE]),
+            "boundary_cells": int(counts[PARTIAL]),
+            "outside_cells": int(counts[OUTSIDE]),
+            "edges": int(len(self._edges)),
+            "nbytes": int(self._raster.nbytes + self._band_edges.nbytes + self._band_offsets.nbytes),
+        }
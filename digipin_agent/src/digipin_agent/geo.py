@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import importlib.util
+import logging
 import math
+import os
+import re
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 DIGIPIN_GRID: Tuple[Tuple[str, ...], ...] = (
@@ -21,43 +27,157 @@ DIGIPIN_BOUNDS = {
     "max_lon": 99.5,
 }
 
+EARTH_RADIUS_METERS = 6371000.0
+
+# Grid bounds as (min_lat, max_lat, min_lon, max_lon) for the compiled kernels.
+_BOUNDS = np.array(
+    [DIGIPIN_BOUNDS["min_lat"], DIGIPIN_BOUNDS["max_lat"], DIGIPIN_BOUNDS["min_lon"], DIGIPIN_BOUNDS["max_lon"]]
+)
+
+_GRID_LOOKUP = {cell: (r, c) for r, row in enumerate(DIGIPIN_GRID) for c, cell in enumerate(row)}
+_CELLS_BY_INDEX = tuple(cell for row in DIGIPIN_GRID for cell in row)
+
+# Marker returned by the bulk helpers for elements that could not be encoded.
+INVALID_PIN = ""
+
+PIN_LEVELS = 10
+
+# Precompiled check for a normalised (undashed, uppercase) pin.
+_PIN_PATTERN = re.compile("[%s]{10}" % "".join(_GRID_LOOKUP))
+
+# Reason codes reported by validate_many.
+REASON_VALID = 0
+REASON_NOT_A_STRING = 1
+REASON_BAD_LENGTH = 2
+REASON_BAD_CHARACTER = 3
+
+REASON_MESSAGES = {
+    REASON_VALID: None,
+    REASON_NOT_A_STRING: "DIGIPIN must be a string",
+    REASON_BAD_LENGTH: "DIGIPIN must have 10 characters",
+    REASON_BAD_CHARACTER: "Invalid DIGIPIN character",
+}
+
+
+logger = logging.getLogger(__name__)
+
+# The bulk kernels run either on NumPy or, when numba is installed, as compiled
+# per-point loops (see _accel.py). DIGIPIN_GEO_BACKEND=numpy|numba overrides
+# the automatic choice. numba is imported on the first bulk call rather than
+# here, to keep ``import digipin_agent`` fast.
+GEO_BACKENDS = ("numpy", "numba")
+_accel = None
+
+
+def _default_backend() -> str:
+    requested = os.getenv("DIGIPIN_GEO_BACKEND", "auto").strip().lower()
+    if requested in GEO_BACKENDS:
+        return requested
+    return "numba" if importlib.util.find_spec("numba") is not None else "numpy"
+
+
+_backend = _default_backend()
+
+
+def get_backend() -> str:
+    """Name of the backend used by the bulk helpers."""
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """Select the bulk backend; ``"numba"`` raises ``ImportError`` without numba."""
+    global _backend, _accel
+    if name not in GEO_BACKENDS:
+        raise ValueError(f"Unknown geo backend: {name}")
+    if name == "numba":
+        from . import _accel as accel
+
+        _accel = accel
+    _backend = name
+
+
+def _accelerated():
+    """The compiled kernels module, or ``None`` when running on NumPy."""
+    if _backend != "numba":
+        return None
+    if _accel is None:
+        try:
+            set_backend("numba")
+        except ImportError as exc:
+            logger.warning("numba backend unavailable, falling back to NumPy: %s", exc)
+            set_backend("numpy")
+            return None
+    return _accel
+
 
 class DigiPinValidationError(ValueError):
     """Raised when a DIGIPIN fails validation."""
 
 
-def _normalise_pin(pin: str) -> str:
+def _check_level(level: int) -> int:
+    if not 1 <= level <= PIN_LEVELS:
+        raise DigiPinValidationError("level must be between 1 and 10")
+    return level
+
+
+def _normalise_pin(pin: str, level: int = PIN_LEVELS) -> str:
+    """Clean ``pin``, which must have exactly ``level`` symbols (a full pin by default)."""
     if not isinstance(pin, str):
-        raise DigiPinValidationError("DIGIPIN must be a string")
+        raise DigiPinValidationError(REASON_MESSAGES[REASON_NOT_A_STRING])
     clean = pin.strip().upper().replace("-", "")
-    if len(clean) != 10:
-        raise DigiPinValidationError("DIGIPIN must have 10 characters")
+    if level == PIN_LEVELS and _PIN_PATTERN.fullmatch(clean):
+        return clean
+    # Slow path, only reached for invalid pins or prefixes, to build a precise message.
+    if len(clean) != level:
+        message = REASON_MESSAGES[REASON_BAD_LENGTH]
+        raise DigiPinValidationError(message if level == PIN_LEVELS else f"DIGIPIN must have {level} characters")
     for char in clean:
-        if char not in {cell for row in DIGIPIN_GRID for cell in row}:
-            raise DigiPinValidationError(f"Invalid DIGIPIN character: {char}")
+        if char not in _GRID_LOOKUP:
+            raise DigiPinValidationError(f"{REASON_MESSAGES[REASON_BAD_CHARACTER]}: {char}")
     return clean
 
 
+def _normalise_prefix(prefix: str) -> Tuple[int, ...]:
+    """Return the symbol indices of a partial (1-10 symbol) DIGIPIN."""
+    if not isinstance(prefix, str):
+        raise DigiPinValidationError("DIGIPIN prefix must be a string")
+    clean = prefix.strip().upper().replace("-", "")
+    if not 1 <= len(clean) <= PIN_LEVELS:
+        raise DigiPinValidationError("DIGIPIN prefix must have between 1 and 10 characters")
+    indices = []
+    for char in clean:
+        if char not in _GRID_LOOKUP:
+            raise DigiPinValidationError(f"Invalid DIGIPIN character: {char}")
+        row, col = _GRID_LOOKUP[char]
+        indices.append(row * 4 + col)
+    return tuple(indices)
+
+
 def is_valid_digipin(pin: str) -> bool:
-    try:
-        _normalise_pin(pin)
-        return True
-    except DigiPinValidationError:
-        return False
+    return isinstance(pin, str) and _PIN_PATTERN.fullmatch(pin.strip().upper().replace("-", "")) is not None
 
 
-def encode_coordinates(lat: float, lon: float) -> str:
-    """Encode latitude & longitude into a DIGIPIN code."""
+def _check_coordinates(lat: float, lon: float) -> None:
     if not (DIGIPIN_BOUNDS["min_lat"] <= lat <= DIGIPIN_BOUNDS["max_lat"]):
         raise DigiPinValidationError("Latitude out of range for DIGIPIN grid")
     if not (DIGIPIN_BOUNDS["min_lon"] <= lon <= DIGIPIN_BOUNDS["max_lon"]):
         raise DigiPinValidationError("Longitude out of range for DIGIPIN grid")
 
+
+def encode_coordinates(lat: float, lon: float, level: int = PIN_LEVELS) -> str:
+    """Encode latitude & longitude into a DIGIPIN code.
+
+    A ``level`` below 10 stops after that many symbols and returns the dashed
+    prefix of the enclosing cell, e.g. ``"39J-4"`` for level 4.
+    """
+    _check_level(level)
+    _check_coordinates(lat, lon)
+
     min_lat, max_lat = DIGIPIN_BOUNDS["min_lat"], DIGIPIN_BOUNDS["max_lat"]
     min_lon, max_lon = DIGIPIN_BOUNDS["min_lon"], DIGIPIN_BOUNDS["max_lon"]
 
     code_chars: List[str] = []
-    for level in range(1, 11):
+    for step in range(1, level + 1):
         lat_step = (max_lat - min_lat) / 4.0
         lon_step = (max_lon - min_lon) / 4.0
 
@@ -68,7 +188,7 @@ def encode_coordinates(lat: float, lon: float) -> str:
         col = max(0, min(3, col))
         code_chars.append(DIGIPIN_GRID[row][col])
 
-        if level == 3 or level == 6:
+        if step == 3 or step == 6:
             code_chars.append("-")
 
         max_lat = min_lat + lat_step * (4 - row)
@@ -76,9 +196,8 @@ def encode_coordinates(lat: float, lon: float) -> str:
         min_lon = min_lon + lon_step * col
         max_lon = min_lon + lon_step
 
-    code = "".join(code_chars)
-    # Remove trailing dash if loop appended (won't happen with current logic but safe)
-    return code.rstrip("-")
+    # Level 3 and 6 prefixes end on a dash.
+    return "".join(code_chars).rstrip("-")
 
 
 @dataclass
@@ -98,17 +217,12 @@ class DecodedDigipin:
         }
 
 
-def decode_digipin(pin: str) -> DecodedDigipin:
-    """Decode a DIGIPIN string into centre coordinates and bounding box."""
-    clean = _normalise_pin(pin)
-
+def _decode_symbols(clean: str) -> DecodedDigipin:
     min_lat, max_lat = DIGIPIN_BOUNDS["min_lat"], DIGIPIN_BOUNDS["max_lat"]
     min_lon, max_lon = DIGIPIN_BOUNDS["min_lon"], DIGIPIN_BOUNDS["max_lon"]
 
-    grid_lookup = {cell: (r, c) for r, row in enumerate(DIGIPIN_GRID) for c, cell in enumerate(row)}
-
     for char in clean:
-        row, col = grid_lookup[char]
+        row, col = _GRID_LOOKUP[char]
         lat_step = (max_lat - min_lat) / 4.0
         lon_step = (max_lon - min_lon) / 4.0
 
@@ -129,15 +243,301 @@ def decode_digipin(pin: str) -> DecodedDigipin:
     )
 
 
+def decode_digipin(pin: str) -> DecodedDigipin:
+    """Decode a DIGIPIN string into centre coordinates and bounding box."""
+    return _decode_symbols(_normalise_pin(pin))
+
+
+def decode_prefix(prefix: str) -> DecodedDigipin:
+    """Decode a partial DIGIPIN (1-10 symbols) into the centre and bounding box of its cell.
+
+    ``decode_prefix(encode_coordinates(lat, lon, level))`` is the level-``level``
+    cell containing the point; a full pin decodes as with :func:`decode_digipin`.
+    """
+    return _decode_symbols("".join(_CELLS_BY_INDEX[index] for index in _normalise_prefix(prefix)))
+
+
+# Lookup tables shared by the vectorised helpers below. Symbols are indexed as
+# ``row * 4 + col`` so that a symbol index maps straight back onto the grid.
+_SYMBOL_CODEPOINTS = np.array([ord(cell) for row in DIGIPIN_GRID for cell in row], dtype=np.uint32)
+_CODEPOINT_TO_SYMBOL = np.full(128, -1, dtype=np.int8)
+_CODEPOINT_TO_SYMBOL[_SYMBOL_CODEPOINTS] = np.arange(16, dtype=np.int8)
+_ASCII_WHITESPACE = np.zeros(128, dtype=bool)
+_ASCII_WHITESPACE[[ord(char) for char in " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"]] = True
+_ASCII_UPPER = np.arange(128, dtype=np.uint32)
+_ASCII_UPPER[ord("a") : ord("z") + 1] -= 32
+# Character offsets of the 10 symbols inside the dashed ``XXX-XXX-XXXX`` form.
+_DASHED_POSITIONS = (0, 1, 2, 4, 5, 6, 8, 9, 10, 11)
+
+
+@dataclass
+class DecodedDigipinArray:
+    """Column-oriented result of :func:`decode_many`.
+
+    Invalid elements are flagged in ``valid`` and carry ``NaN`` in every
+    coordinate column.
+    """
+
+    latitude: np.ndarray
+    longitude: np.ndarray
+    min_lat: np.ndarray
+    min_lon: np.ndarray
+    max_lat: np.ndarray
+    max_lon: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.valid.size)
+
+
+def _encode_indices(lats, lons, level: int = PIN_LEVELS) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+    """Encode coordinates into an ``(n, level)`` array of symbol indices plus a validity mask.
+
+    Only the first ``level`` subdivisions are computed, so coarse encodes cost
+    proportionally less.
+    """
+    _check_level(level)
+    lat, lon = np.broadcast_arrays(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+    shape = lat.shape
+    lat = lat.ravel()
+    lon = lon.ravel()
+
+    accel = _accelerated()
+    if accel is not None:
+        indices, valid = accel.encode_indices(np.ascontiguousarray(lat), np.ascontiguousarray(lon), _BOUNDS, level)
+        return indices, valid, shape
+
+    valid = (
+        (lat >= DIGIPIN_BOUNDS["min_lat"])
+        & (lat <= DIGIPIN_BOUNDS["max_lat"])
+        & (lon >= DIGIPIN_BOUNDS["min_lon"])
+        & (lon <= DIGIPIN_BOUNDS["max_lon"])
+    )
+    lat = np.where(valid, lat, DIGIPIN_BOUNDS["min_lat"])
+    lon = np.where(valid, lon, DIGIPIN_BOUNDS["min_lon"])
+
+    size = lat.size
+    min_lat = np.full(size, DIGIPIN_BOUNDS["min_lat"])
+    max_lat = np.full(size, DIGIPIN_BOUNDS["max_lat"])
+    min_lon = np.full(size, DIGIPIN_BOUNDS["min_lon"])
+    max_lon = np.full(size, DIGIPIN_BOUNDS["max_lon"])
+    indices = np.empty((size, level), dtype=np.intp)
+
+    # Same floating point operations, in the same order, as encode_coordinates
+    # so that both paths agree bit for bit.
+    for step in range(level):
+        lat_step = (max_lat - min_lat) / 4.0
+        lon_step = (max_lon - min_lon) / 4.0
+
+        row = np.clip(3.0 - np.floor((lat - min_lat) / lat_step), 0.0, 3.0)
+        col = np.clip(np.floor((lon - min_lon) / lon_step), 0.0, 3.0)
+        indices[:, step] = row * 4.0 + col
+
+        max_lat = min_lat + lat_step * (4.0 - row)
+        min_lat = min_lat + lat_step * (3.0 - row)
+        min_lon = min_lon + lon_step * col
+        max_lon = min_lon + lon_step
+
+    indices[~valid] = 0
+    return indices, valid, shape
+
+
+def _pin_width(level: int) -> int:
+    """Characters in a dashed level-``level`` pin or prefix (12 for a full pin)."""
+    return _DASHED_POSITIONS[level - 1] + 1
+
+
+def _format_indices(indices: np.ndarray, valid: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Render ``(n, level)`` symbol indices as dashed pins or prefixes (``INVALID_PIN`` where invalid)."""
+    level = indices.shape[1]
+    width = _pin_width(level)
+    codepoints = np.zeros((valid.size, width), dtype=np.uint32)
+    for dash in (3, 7):
+        if dash < width:
+            codepoints[:, dash] = ord("-")
+    codepoints[:, _DASHED_POSITIONS[:level]] = _SYMBOL_CODEPOINTS[indices]
+    codepoints[~valid] = 0
+    return codepoints.view(np.dtype(f"U{width}")).reshape(shape)
+
+
+def encode_many(lats, lons, level: int = PIN_LEVELS) -> np.ndarray:
+    """Vectorised :func:`encode_coordinates` over array-likes of coordinates.
+
+    Returns an array of dashed DIGIPIN strings (level-``level`` prefixes when
+    ``level`` is below 10) with the broadcast shape of the inputs. Coordinates
+    outside ``DIGIPIN_BOUNDS`` (or NaN) yield ``INVALID_PIN`` instead of raising.
+    """
+    return _format_indices(*_encode_indices(lats, lons, level))
+
+
+def _string_array(pins) -> Tuple[np.ndarray, np.ndarray]:
+    """Coerce an array-like of pins to a unicode array, returning ``(strings, is_string)``."""
+    raw = np.asarray(pins)
+    if raw.dtype.kind == "U":
+        return raw, np.ones(raw.shape, dtype=bool)
+    flat = raw.ravel()
+    is_string = np.fromiter((isinstance(pin, str) for pin in flat), dtype=bool, count=flat.size)
+    strings = np.array([pin if ok else "" for pin, ok in zip(flat, is_string)], dtype=str)
+    return strings.reshape(raw.shape), is_string.reshape(raw.shape)
+
+
+def _clean_codepoints(strings: np.ndarray, level: int = PIN_LEVELS) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalise pins on their UTF-32 code points, without per-pin Python work.
+
+    Mirrors ``pin.strip().upper().replace("-", "")`` and returns the first
+    ``level`` cleaned code points of every pin as an ``(n, level)`` array, plus
+    the cleaned lengths. Pins containing non-ASCII characters take the exact
+    Python path.
+    """
+    flat = np.ascontiguousarray(strings.ravel())
+    size = flat.size
+    width = flat.dtype.itemsize // 4
+    cleaned = np.zeros((size, level), dtype=np.uint32)
+    lengths = np.zeros(size, dtype=np.intp)
+    if not size or not width:
+        return cleaned, lengths
+
+    points = flat.view(np.uint32).reshape(size, width)
+    present = points != 0
+    ascii_points = np.minimum(points, 127)
+    spaces = _ASCII_WHITESPACE[ascii_points] & present
+    leading = np.logical_and.accumulate(spaces, axis=1)
+    trailing = np.logical_and.accumulate((spaces | ~present)[:, ::-1], axis=1)[:, ::-1]
+    keep = present & ~leading & ~trailing & (points != ord("-"))
+    lengths[:] = keep.sum(axis=1)
+
+    exotic = (points >= 128).any(axis=1)
+    rows = np.flatnonzero((lengths == level) & ~exotic)
+    if rows.size:
+        cleaned[rows] = _ASCII_UPPER[ascii_points[rows][keep[rows]]].reshape(rows.size, level)
+    for row in np.flatnonzero(exotic).tolist():
+        clean = str(flat[row]).strip().upper().replace("-", "")
+        lengths[row] = len(clean)
+        cleaned[row, : min(len(clean), level)] = [ord(char) for char in clean[:level]]
+    return cleaned, lengths
+
+
+def _validate_array(pins, level: int = PIN_LEVELS) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+    """Return ``(indices, reasons, shape)`` for an array-like of level-``level`` pins.
+
+    ``indices`` is an ``(n, level)`` array of symbol indices (zeroed for invalid
+    rows) and ``reasons`` holds one ``REASON_*`` code per pin.
+    """
+    _check_level(level)
+    strings, is_string = _string_array(pins)
+    shape = strings.shape
+    codepoints, lengths = _clean_codepoints(strings, level)
+
+    indices = _CODEPOINT_TO_SYMBOL[np.minimum(codepoints, 127)].astype(np.intp)
+    reasons = np.full(lengths.size, REASON_VALID, dtype=np.uint8)
+    reasons[~(indices >= 0).all(axis=1)] = REASON_BAD_CHARACTER
+    reasons[lengths != level] = REASON_BAD_LENGTH
+    reasons[~is_string.ravel()] = REASON_NOT_A_STRING
+    indices[reasons != REASON_VALID] = 0
+    return indices, reasons, shape
+
+
+def _symbol_indices(pins, level: int = PIN_LEVELS) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+    """Map pins onto an ``(n, level)`` array of symbol indices plus a validity mask."""
+    indices, reasons, shape = _validate_array(pins, level)
+    return indices, reasons == REASON_VALID, shape
+
+
+def validate_many(pins, level: int = PIN_LEVELS) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorised validation returning ``(valid_mask, reason_codes)``.
+
+    Reason codes are the ``REASON_*`` constants; :data:`REASON_MESSAGES` maps
+    them to the messages raised by the scalar validator. With ``level`` below
+    10, pins must be level-``level`` prefixes such as ``"39J-4"``.
+    """
+    _, reasons, shape = _validate_array(pins, level)
+    reasons = reasons.reshape(shape)
+    return reasons == REASON_VALID, reasons
+
+
+def validation_messages(pins: Sequence, reasons: np.ndarray, level: int = PIN_LEVELS) -> List[Optional[str]]:
+    """Per-pin error messages (``None`` for valid pins) matching the scalar validator.
+
+    ``reasons`` may be the codes from :func:`validate_many` or any array that is
+    non-zero exactly for the invalid pins; only those reach the scalar path.
+    """
+    messages: List[Optional[str]] = [None] * len(pins)
+    for index in np.flatnonzero(reasons).tolist():
+        try:
+            _normalise_pin(pins[index], level)
+        except DigiPinValidationError as exc:
+            messages[index] = str(exc)
+        else:  # pragma: no cover - only for exotic Unicode case mappings
+            messages[index] = REASON_MESSAGES[int(reasons[index])]
+    return messages
+
+
+def _decode_indices(indices: np.ndarray, valid: np.ndarray, shape: Tuple[int, ...]) -> DecodedDigipinArray:
+    """Decode an ``(n, level)`` array of symbol indices into the centres and bounds of their cells."""
+    accel = _accelerated()
+    if accel is not None:
+        columns = list(accel.decode_indices(np.ascontiguousarray(indices), np.ascontiguousarray(valid), _BOUNDS))
+        return DecodedDigipinArray(*(column.reshape(shape) for column in columns), valid=valid.reshape(shape))
+
+    size = valid.size
+    min_lat = np.full(size, DIGIPIN_BOUNDS["min_lat"])
+    max_lat = np.full(size, DIGIPIN_BOUNDS["max_lat"])
+    min_lon = np.full(size, DIGIPIN_BOUNDS["min_lon"])
+    max_lon = np.full(size, DIGIPIN_BOUNDS["max_lon"])
+
+    for step in range(indices.shape[1]):
+        row = (indices[:, step] // 4).astype(np.float64)
+        col = (indices[:, step] % 4).astype(np.float64)
+        lat_step = (max_lat - min_lat) / 4.0
+        lon_step = (max_lon - min_lon) / 4.0
+
+        max_lat = min_lat + lat_step * (4.0 - row)
+        min_lat = min_lat + lat_step * (3.0 - row)
+        min_lon = min_lon + lon_step * col
+        max_lon = min_lon + lon_step
+
+    latitude = (min_lat + max_lat) / 2.0
+    longitude = (min_lon + max_lon) / 2.0
+    columns = [latitude, longitude, min_lat, min_lon, max_lat, max_lon]
+    for column in columns:
+        column[~valid] = np.nan
+    return DecodedDigipinArray(*(column.reshape(shape) for column in columns), valid=valid.reshape(shape))
+
+
+def decode_many(pins, level: int = PIN_LEVELS) -> DecodedDigipinArray:
+    """Vectorised :func:`decode_digipin` over an array-like of pins.
+
+    Accepts the same spellings as the scalar decoder (dashes, lowercase,
+    surrounding whitespace). Invalid pins are flagged in ``valid`` instead of
+    raising. With ``level`` below 10, ``pins`` are level-``level`` prefixes
+    (as produced by ``encode_many(..., level=level)``) and decode to their
+    cells, as with :func:`decode_prefix`.
+    """
+    return _decode_indices(*_symbol_indices(pins, level))
+
+
 def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    radius_earth = 6371000.0  # metres
     phi1, phi2 = math.radians(lat1), math.radians(lat2)
     delta_phi = math.radians(lat2 - lat1)
     delta_lambda = math.radians(lon2 - lon1)
 
     a = math.sin(delta_phi / 2.0) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2.0) ** 2
     c = 2.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
-    return radius_earth * c
+    return EARTH_RADIUS_METERS * c
+
+
+def _haversine_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Broadcasting NumPy counterpart of :func:`_haversine`."""
+    accel = _accelerated()
+    if accel is not None and np.result_type(lat1, lon1, lat2, lon2) == np.float64:
+        return accel.haversine(lat1, lon1, lat2, lon2, EARTH_RADIUS_METERS)
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    delta_phi = np.radians(np.subtract(lat2, lat1))
+    delta_lambda = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(delta_phi / 2.0) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2.0) ** 2
+    c = 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+    return EARTH_RADIUS_METERS * c
 
 
 def get_distance_meters(pin_a: str, pin_b: str) -> float:
@@ -161,9 +561,62 @@ def nearest_pin(reference_pin: str, pins: Iterable[str]) -> str:
         raise DigiPinValidationError("No DIGIPIN values supplied")
     reference = decode_digipin(reference_pin)
 
-    def distance_to(pin: str) -> float:
-        decoded = decode_digipin(pin)
-        return _haversine(reference.latitude, reference.longitude, decoded.latitude, decoded.longitude)
-
-    nearest = min(pins_list, key=distance_to)
-    return nearest
+    decoded = decode_many(pins_list)
+    if not decoded.valid.all():
+        _normalise_pin(pins_list[int(np.argmin(decoded.valid))])  # raises the scalar error message
+    distances = _haversine_array(reference.latitude, reference.longitude, decoded.latitude, decoded.longitude)
+    return pins_list[int(np.argmin(distances))]
+
+
+def _decode_for_matrix(pins) -> DecodedDigipinArray:
+    decoded = decode_many(pins)
+    if decoded.latitude.ndim != 1:
+        raise DigiPinValidationError("Distance matrices need one-dimensional pin lists")
+    return decoded
+
+
+def _rows_per_chunk(columns: int, chunk_size: int) -> int:
+    return max(1, chunk_size // max(columns, 1))
+
+
+def distance_matrix(pins_a, pins_b, dtype=np.float64, chunk_size: int = 1 << 20) -> np.ndarray:
+    """Haversine distances in metres between every pin of ``pins_a`` and ``pins_b``.
+
+    Returns an ``(len(pins_a), len(pins_b))`` array of ``dtype`` (``float64`` or
+    ``float32``). Work is done in row blocks of roughly ``chunk_size`` cells so
+    temporaries stay bounded however large the matrix is. Rows or columns of
+    invalid pins are ``NaN``.
+    """
+    a = _decode_for_matrix(pins_a)
+    b = _decode_for_matrix(pins_b)
+    out = np.empty((len(a), len(b)), dtype=dtype)
+    step = _rows_per_chunk(len(b), chunk_size)
+    for start in range(0, len(a), step):
+        stop = start + step
+        out[start:stop] = _haversine_array(
+            a.latitude[start:stop, None], a.longitude[start:stop, None], b.latitude, b.longitude
+        )
+    return out
+
+
+def pairwise_distances(pins, dtype=np.float64, chunk_size: int = 1 << 20) -> np.ndarray:
+    """Symmetric :func:`distance_matrix` of ``pins`` against themselves.
+
+    Only the upper triangle is computed; each block is mirrored into the lower
+    triangle, roughly halving the trigonometry.
+    """
+    decoded = _decode_for_matrix(pins)
+    size = len(decoded)
+    out = np.empty((size, size), dtype=dtype)
+    step = _rows_per_chunk(size, chunk_size)
+    for start in range(0, size, step):
+        stop = min(start + step, size)
+        block = _haversine_array(
+            decoded.latitude[start:stop, None],
+            decoded.longitude[start:stop, None],
+            decoded.latitude[start:],
+            decoded.longitude[start:],
+        )
+        out[start:stop, start:] = block
+        out[start:, start:stop] = block.T
+    return out
@@ -0,0 +1,161 @@
+"""Neighbours, k-rings, parents and children of DIGIPIN cells.
+
+A level ``L`` cell is addressed by its global row and column in the
+``4**L x 4**L`` grid, whose base-4 digits are exactly its symbols' row and
+column digits. Stepping to a neighbour is then an integer add on the row or
+column, and the carry into coarser digits is what crosses parent-cell edges;
+no coordinates are decoded or re-encoded. Steps past the edge of
+``DIGIPIN_BOUNDS`` have no cell: the string helpers drop them and the
+vectorised ``*_packed`` helpers return ``INVALID_PACKED`` in their place.
+
+Cells may be full pins or prefixes of any level; the packed helpers take the
+level explicitly and operate on whole arrays of packed prefixes at once.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .geo import DigiPinValidationError
+from .packed import (
+    INVALID_PACKED,
+    PIN_LEVELS,
+    _CELLS,
+    _check_level,
+    _grid_prefixes,
+    _prefix_grid,
+    format_prefixes,
+    pack_prefix,
+)
+
+# (row, col) steps in the order N, NE, E, SE, S, SW, W, NW; row 0 is the northern edge.
+_NEIGHBOUR_STEPS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+_NEIGHBOUR_ROWS = np.array([step[0] for step in _NEIGHBOUR_STEPS], dtype=np.int64)
+_NEIGHBOUR_COLS = np.array([step[1] for step in _NEIGHBOUR_STEPS], dtype=np.int64)
+_CHILD_SYMBOLS = np.arange(16, dtype=np.uint64)
+
+
+def _cell_grid(value: int, level: int) -> Tuple[int, int]:
+    row = col = 0
+    for shift in range(4 * (level - 1), -1, -4):
+        symbol = (value >> shift) & 0xF
+        row = (row << 2) | (symbol >> 2)
+        col = (col << 2) | (symbol & 0x3)
+    return row, col
+
+
+def _grid_cell(row: int, col: int, level: int) -> int:
+    value = 0
+    for shift in range(2 * (level - 1), -1, -2):
+        value = (value << 4) | (((row >> shift) & 0x3) << 2) | ((col >> shift) & 0x3)
+    return value
+
+
+def _format_cell(value: int, level: int) -> str:
+    symbols = "".join(_CELLS[(value >> shift) & 0xF] for shift in range(4 * (level - 1), -1, -4))
+    return "-".join(part for part in (symbols[:3], symbols[3:6], symbols[6:]) if part)
+
+
+def _check_k(k: int) -> int:
+    if k < 0:
+        raise DigiPinValidationError("k must be zero or positive")
+    return k
+
+
+def neighbours(pin: str) -> List[str]:
+    """The up to 8 cells bordering ``pin``, clockwise from north.
+
+    ``pin`` may be a full DIGIPIN or a prefix; neighbours are returned at the
+    same level. Cells on the edge of the DIGIPIN grid have fewer neighbours.
+    """
+    value, level = pack_prefix(pin)
+    row, col = _cell_grid(value, level)
+    side = 4**level
+    return [
+        _format_cell(_grid_cell(row + d_row, col + d_col, level), level)
+        for d_row, d_col in _NEIGHBOUR_STEPS
+        if 0 <= row + d_row < side and 0 <= col + d_col < side
+    ]
+
+
+def k_ring(pin: str, k: int) -> List[str]:
+    """All cells at most ``k`` steps (including diagonals) from ``pin``, ``pin`` included.
+
+    Cells are listed row by row from the north-west corner of the
+    ``(2k + 1) x (2k + 1)`` block; those beyond the grid edge are left out.
+    """
+    value, level = pack_prefix(pin)
+    cells = k_ring_packed(np.uint64(value), k, level)
+    return format_prefixes(cells[cells != INVALID_PACKED], level).tolist()
+
+
+def parent(pin: str, level: Optional[int] = None) -> str:
+    """The ancestor of ``pin`` at ``level`` (default: one level up)."""
+    value, pin_level = pack_prefix(pin)
+    level = pin_level - 1 if level is None else level
+    if not 1 <= level < pin_level:
+        raise DigiPinValidationError(f"parent level must be between 1 and {pin_level - 1}")
+    return _format_cell(value >> 4 * (pin_level - level), level)
+
+
+def children(pin: str) -> List[str]:
+    """The 16 cells one level below the prefix ``pin``, in symbol order."""
+    value, level = pack_prefix(pin)
+    if level == PIN_LEVELS:
+        raise DigiPinValidationError("A full DIGIPIN has no children")
+    return [_format_cell((value << 4) | symbol, level + 1) for symbol in range(16)]
+
+
+def _offset_cells(codes, level: int, d_rows: np.ndarray, d_cols: np.ndarray) -> np.ndarray:
+    """Cells at ``(row + d_rows, col + d_cols)`` of every packed prefix, along a new last axis."""
+    _check_level(level)
+    codes = np.asarray(codes, dtype=np.uint64)
+    rows, cols = _prefix_grid(codes, level)
+    rows = rows[..., None] + d_rows
+    cols = cols[..., None] + d_cols
+    side = 4**level
+    inside = (
+        (codes < np.uint64(1 << 4 * level))[..., None] & (rows >= 0) & (rows < side) & (cols >= 0) & (cols < side)
+    )
+    cells = _grid_prefixes(np.where(inside, rows, 0), np.where(inside, cols, 0))
+    cells[~inside] = INVALID_PACKED
+    return cells
+
+
+def neighbours_packed(codes, level: int = PIN_LEVELS) -> np.ndarray:
+    """Vectorised :func:`neighbours` on packed level-``level`` prefixes.
+
+    Returns an array of shape ``codes.shape + (8,)``, clockwise from north,
+    with ``INVALID_PACKED`` for steps off the grid and for invalid inputs.
+    """
+    return _offset_cells(codes, level, _NEIGHBOUR_ROWS, _NEIGHBOUR_COLS)
+
+
+def k_ring_packed(codes, k: int, level: int = PIN_LEVELS) -> np.ndarray:
+    """Vectorised :func:`k_ring`, of shape ``codes.shape + ((2k + 1) ** 2,)``."""
+    steps = np.arange(-_check_k(k), k + 1, dtype=np.int64)
+    d_rows, d_cols = np.meshgrid(steps, steps, indexing="ij")
+    return _offset_cells(codes, level, d_rows.ravel(), d_cols.ravel())
+
+
+def parent_packed(codes, level: int = PIN_LEVELS, parent_level: Optional[int] = None) -> np.ndarray:
+    """Level-``parent_level`` ancestors (default: one level up) of packed level-``level`` prefixes."""
+    _check_level(level)
+    parent_level = level - 1 if parent_level is None else parent_level
+    if not 1 <= parent_level < level:
+        raise DigiPinValidationError(f"parent level must be between 1 and {level - 1}")
+    codes = np.asarray(codes, dtype=np.uint64)
+    parents = codes >> np.uint64(4 * (level - parent_level))
+    return np.where(codes < np.uint64(1 << 4 * level), parents, INVALID_PACKED)
+
+
+def children_packed(codes, level: int = PIN_LEVELS - 1) -> np.ndarray:
+    """The 16 children of packed level-``level`` prefixes, of shape ``codes.shape + (16,)``."""
+    if not 1 <= level < PIN_LEVELS:
+        raise DigiPinValidationError(f"level must be between 1 and {PIN_LEVELS - 1}")
+    codes = np.asarray(codes, dtype=np.uint64)
+    cells = (codes[..., None] << np.uint64(4)) | _CHILD_SYMBOLS
+    cells[codes >= np.uint64(1 << 4 * level)] = INVALID_PACKED
+    return cells
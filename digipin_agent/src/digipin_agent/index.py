@@ -0,0 +1,329 @@
+"""Prefix quadtree spatial index over a fixed set of DIGIPINs.
+
+Pins are kept sorted by their packed value, so every DIGIPIN cell at every
+level is a contiguous slice of the index and a cell's children are found with
+a single ``searchsorted``. Queries walk the hierarchy best-first, pruning
+cells with a conservative great-circle lower bound, and only run exact
+haversine distances on small leaf slices.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .geo import (
+    DIGIPIN_BOUNDS,
+    EARTH_RADIUS_METERS,
+    DigiPinValidationError,
+    _haversine_array,
+    _normalise_pin,
+    decode_digipin,
+)
+from .packed import INVALID_PACKED, PIN_LEVELS, PinArray, decode_packed, pack_many, unpack_pin
+
+Reference = Union[str, Tuple[float, float]]
+
+_FORMAT_VERSION = 1
+_META_FILE = "meta.json"
+_ARRAY_NAMES = ("codes", "positions", "latitude", "longitude")
+
+_CHILD_ROWS = np.repeat(np.arange(4, dtype=np.float64), 4)
+_CHILD_COLS = np.tile(np.arange(4, dtype=np.float64), 4)
+_CHILD_OFFSETS = np.arange(17, dtype=np.uint64)
+
+
+def _lower_bound_meters(lat: float, lon: float, min_lat, max_lat, min_lon, max_lon) -> np.ndarray:
+    """Lower bound on the great-circle distance from a point to lat/lon boxes.
+
+    Uses the meridional gap (no path can change latitude faster) and the
+    cross-track distance to the nearest bounding meridian, which separates the
+    point from the box whenever its longitude lies outside the box.
+    """
+    delta_lat = np.maximum(np.maximum(min_lat - lat, lat - max_lat), 0.0)
+    delta_lon = np.maximum(np.maximum(min_lon - lon, lon - max_lon), 0.0)
+    along = np.radians(delta_lat)
+    across = np.arcsin(
+        np.minimum(np.sin(np.radians(np.minimum(delta_lon, 90.0))) * math.cos(math.radians(lat)), 1.0)
+    )
+    return EARTH_RADIUS_METERS * np.maximum(along, across)
+
+
+def _upper_bound_meters(lat: float, lon: float, min_lat, max_lat, min_lon, max_lon) -> np.ndarray:
+    """Distance to the farthest corner, which bounds every point in a small box."""
+    return np.maximum.reduce(
+        [
+            _haversine_array(lat, lon, min_lat, min_lon),
+            _haversine_array(lat, lon, min_lat, max_lon),
+            _haversine_array(lat, lon, max_lat, min_lon),
+            _haversine_array(lat, lon, max_lat, max_lon),
+        ]
+    )
+
+
+class DigipinIndex:
+    """Spatial index supporting nearest, k-nearest and radius queries.
+
+    ``reference`` arguments accept a DIGIPIN string or a ``(lat, lon)`` tuple.
+    Results are ``(pin, distance_meters)`` tuples ordered by distance, with ties
+    broken by the position of the pin in the input, matching
+    :func:`~digipin_agent.geo.nearest_pin`. Pins are returned in canonical
+    dashed form.
+    """
+
+    def __init__(self, pins: Iterable[str], leaf_size: int = 32):
+        pins_list = list(pins)
+        codes = pack_many(pins_list) if pins_list else np.empty(0, dtype=np.uint64)
+        invalid = np.flatnonzero(codes == INVALID_PACKED)
+        if invalid.size:
+            _normalise_pin(pins_list[int(invalid[0])])  # raises with the scalar error message
+
+        positions = np.argsort(codes, kind="stable")
+        self._init_arrays(codes[positions], positions, leaf_size)
+
+    @classmethod
+    def from_pin_array(cls, pins: PinArray, leaf_size: int = 32) -> "DigipinIndex":
+        """Build from an already packed :class:`~digipin_agent.packed.PinArray`."""
+        index = cls.__new__(cls)
+        positions = pins.argsort()
+        index._init_arrays(pins.codes[positions], positions, leaf_size)
+        return index
+
+    def _init_arrays(self, codes: np.ndarray, positions: np.ndarray, leaf_size: int, lat=None, lon=None) -> None:
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be positive")
+        self._codes = codes
+        self._positions = positions
+        if lat is None or lon is None:
+            decoded = decode_packed(codes)
+            lat, lon = decoded.latitude, decoded.longitude
+        self._lat = lat
+        self._lon = lon
+        self.leaf_size = leaf_size
+
+    def save(self, directory: Union[str, Path], extra: Optional[Mapping[str, np.ndarray]] = None) -> None:
+        """Persist the index as ``.npy`` arrays that :meth:`load` can memory-map.
+
+        The arrays are written to a new versioned sibling directory and
+        ``directory`` becomes a symlink to it, swapped in with a single
+        ``os.replace``: readers always find a complete index there, old or new.
+        ``extra`` arrays (e.g. per-pin weights) are saved alongside as
+        ``<name>.npy`` and swapped in together with the index.
+        """
+        target = Path(directory)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        version = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+        link = target.with_name(f"{version.name}.link")
+        try:
+            for name, array in {**(extra or {}), **self._arrays()}.items():
+                np.save(version / f"{name}.npy", np.ascontiguousarray(array))
+            (version / _META_FILE).write_text(
+                json.dumps({"format": _FORMAT_VERSION, "size": len(self), "leaf_size": self.leaf_size})
+            )
+            os.symlink(version.name, link)
+            if target.is_symlink():
+                previous = target.parent / os.readlink(target)
+            elif target.exists():
+                # Saved before indexes were versioned: a plain directory cannot be
+                # replaced by a link, so it has to be moved aside first.
+                previous = target.with_name(f".{target.name}-retired-{os.getpid()}")
+                os.replace(target, previous)
+            else:
+                previous = None
+            os.replace(link, target)
+        except BaseException:
+            if link.is_symlink():
+                link.unlink()
+            shutil.rmtree(version, ignore_errors=True)
+            raise
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    @staticmethod
+    def remove(directory: Union[str, Path]) -> None:
+        """Delete an index written by :meth:`save`, including the version it points to."""
+        target = Path(directory)
+        if target.is_symlink():
+            version = target.parent / os.readlink(target)
+            target.unlink()
+            shutil.rmtree(version, ignore_errors=True)
+        else:
+            shutil.rmtree(target, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> "DigipinIndex":
+        """Load an index written by :meth:`save`, memory-mapped (read-only) by default."""
+        # Resolve the link once, so a concurrent save cannot mix two versions' arrays.
+        source = Path(directory).resolve()
+        meta = json.loads((source / _META_FILE).read_text())
+        if meta.get("format") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format in {source}: {meta.get('format')}")
+        mode = "r" if mmap else None
+        arrays = {name: np.load(source / f"{name}.npy", mmap_mode=mode) for name in _ARRAY_NAMES}
+        index = cls.__new__(cls)
+        index._init_arrays(
+            arrays["codes"],
+            arrays["positions"],
+            int(meta["leaf_size"]),
+            lat=arrays["latitude"],
+            lon=arrays["longitude"],
+        )
+        return index
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "codes": self._codes,
+            "positions": self._positions,
+            "latitude": self._lat,
+            "longitude": self._lon,
+        }
+
+    def __len__(self) -> int:
+        return int(self._codes.size)
+
+    @staticmethod
+    def _resolve(reference: Reference) -> Tuple[float, float]:
+        if isinstance(reference, str):
+            decoded = decode_digipin(reference)
+            return decoded.latitude, decoded.longitude
+        lat, lon = reference
+        return float(lat), float(lon)
+
+    def _root(self):
+        return (
+            0,
+            0,
+            0,
+            len(self._codes),
+            DIGIPIN_BOUNDS["min_lat"],
+            DIGIPIN_BOUNDS["max_lat"],
+            DIGIPIN_BOUNDS["min_lon"],
+            DIGIPIN_BOUNDS["max_lon"],
+        )
+
+    def _children(self, cell):
+        """Split a cell into its non-empty children, returning parallel arrays."""
+        level, prefix, lo, hi, min_lat, max_lat, min_lon, max_lon = cell
+        shift = np.uint64(4 * (PIN_LEVELS - level - 1))
+        starts = (np.uint64(prefix * 16) + _CHILD_OFFSETS) << shift
+        bounds = lo + np.searchsorted(self._codes[lo:hi], starts)
+        occupied = np.flatnonzero(bounds[1:] > bounds[:-1])
+
+        lat_step = (max_lat - min_lat) / 4.0
+        lon_step = (max_lon - min_lon) / 4.0
+        rows = _CHILD_ROWS[occupied]
+        cols = _CHILD_COLS[occupied]
+        return (
+            occupied,
+            bounds[occupied],
+            bounds[occupied + 1],
+            min_lat + lat_step * (3.0 - rows),
+            min_lat + lat_step * (4.0 - rows),
+            min_lon + lon_step * cols,
+            min_lon + lon_step * (cols + 1.0),
+        )
+
+    def _leaf_distances(self, lat: float, lon: float, lo: int, hi: int) -> np.ndarray:
+        return _haversine_array(lat, lon, self._lat[lo:hi], self._lon[lo:hi])
+
+    def _is_leaf(self, cell) -> bool:
+        return cell[0] == PIN_LEVELS or cell[3] - cell[2] <= self.leaf_size
+
+    def k_nearest(self, reference: Reference, k: int) -> List[Tuple[str, float]]:
+        """Return the ``k`` closest pins to ``reference``."""
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        if not len(self):
+            raise DigiPinValidationError("No DIGIPIN values supplied")
+        lat, lon = self._resolve(reference)
+
+        # Entries are (distance, kind, tiebreak, payload); kind 0 (cell) sorts
+        # before kind 1 (point) so a cell that might hold an equally distant,
+        # earlier-positioned pin is expanded before a tie is reported.
+        heap: list = [(0.0, 0, 0, self._root())]
+        results: List[Tuple[str, float]] = []
+        while heap and len(results) < k:
+            distance, kind, _, payload = heapq.heappop(heap)
+            if kind == 1:
+                results.append((unpack_pin(self._codes[payload]), distance))
+                continue
+
+            if self._is_leaf(payload):
+                lo, hi = payload[2], payload[3]
+                for offset, meters in enumerate(self._leaf_distances(lat, lon, lo, hi).tolist()):
+                    heapq.heappush(heap, (meters, 1, int(self._positions[lo + offset]), lo + offset))
+                continue
+
+            level, prefix = payload[0], payload[1]
+            occupied, los, his, min_lats, max_lats, min_lons, max_lons = self._children(payload)
+            bounds = _lower_bound_meters(lat, lon, min_lats, max_lats, min_lons, max_lons)
+            for index in range(occupied.size):
+                child = (
+                    level + 1,
+                    prefix * 16 + int(occupied[index]),
+                    int(los[index]),
+                    int(his[index]),
+                    float(min_lats[index]),
+                    float(max_lats[index]),
+                    float(min_lons[index]),
+                    float(max_lons[index]),
+                )
+                heapq.heappush(heap, (float(bounds[index]), 0, child[1], child))
+        return results
+
+    def nearest(self, reference: Reference) -> str:
+        """Return the closest pin to ``reference``."""
+        return self.k_nearest(reference, 1)[0][0]
+
+    def within_radius(self, reference: Reference, meters: float) -> List[Tuple[str, float]]:
+        """Return every pin within ``meters`` of ``reference``, closest first."""
+        if meters < 0:
+            raise ValueError("meters must be non-negative")
+        if not len(self):
+            return []
+        lat, lon = self._resolve(reference)
+
+        slices: List[Tuple[int, int]] = []
+        stack = [self._root()]
+        while stack:
+            cell = stack.pop()
+            if self._is_leaf(cell):
+                slices.append((cell[2], cell[3]))
+                continue
+            occupied, los, his, min_lats, max_lats, min_lons, max_lons = self._children(cell)
+            lower = _lower_bound_meters(lat, lon, min_lats, max_lats, min_lons, max_lons)
+            upper = _upper_bound_meters(lat, lon, min_lats, max_lats, min_lons, max_lons)
+            for index in np.flatnonzero(lower <= meters).tolist():
+                lo, hi = int(los[index]), int(his[index])
+                if upper[index] <= meters:
+                    slices.append((lo, hi))
+                    continue
+                stack.append(
+                    (
+                        cell[0] + 1,
+                        cell[1] * 16 + int(occupied[index]),
+                        lo,
+                        hi,
+                        float(min_lats[index]),
+                        float(max_lats[index]),
+                        float(min_lons[index]),
+                        float(max_lons[index]),
+                    )
+                )
+
+        if not slices:
+            return []
+        rows = np.concatenate([np.arange(lo, hi) for lo, hi in slices])
+        distances = _haversine_array(lat, lon, self._lat[rows], self._lon[rows])
+        keep = distances <= meters
+        rows, distances = rows[keep], distances[keep]
+        order = np.lexsort((self._positions[rows], distances))
+        return [(unpack_pin(self._codes[rows[i]]), float(distances[i])) for i in order.tolist()]
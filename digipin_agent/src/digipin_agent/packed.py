@@ -0,0 +1,370 @@
+"""Integer-packed DIGIPIN representation.
+
+Every DIGIPIN symbol is one of the 16 cells of a 4x4 grid, so a full 10 level
+pin fits in 40 bits. Symbols are stored most significant first as
+``row * 4 + col``, which means numeric order on the packed value follows the
+DIGIPIN hierarchy: all pins sharing a prefix form one contiguous range.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from .geo import (
+    _BOUNDS,
+    _GRID_LOOKUP,
+    _DASHED_POSITIONS,
+    _SYMBOL_CODEPOINTS,
+    _accelerated,
+    DIGIPIN_BOUNDS,
+    PIN_LEVELS,
+    DecodedDigipinArray,
+    DigiPinValidationError,
+    _check_level,
+    _decode_indices,
+    _encode_indices,
+    _format_indices,
+    _normalise_pin,
+    _normalise_prefix,
+    _symbol_indices,
+)
+
+PACKED_BITS = 4 * PIN_LEVELS
+# Sentinel used by the bulk helpers for elements that are not valid pins.
+INVALID_PACKED = np.uint64(np.iinfo(np.uint64).max)
+
+_CELLS = tuple(cell for cell, _ in sorted(_GRID_LOOKUP.items(), key=lambda item: item[1][0] * 4 + item[1][1]))
+_SHIFTS = np.array([4 * (PIN_LEVELS - 1 - level) for level in range(PIN_LEVELS)], dtype=np.uint64)
+
+
+def pack_prefix(prefix: str) -> Tuple[int, int]:
+    """Pack a partial DIGIPIN, returning ``(value, level)``.
+
+    ``value`` holds only the ``level`` leading symbols, so every full pin
+    starting with ``prefix`` satisfies ``pin >> 4 * (10 - level) == value``.
+    """
+    value = 0
+    indices = _normalise_prefix(prefix)
+    for index in indices:
+        value = (value << 4) | index
+    return value, len(indices)
+
+
+def pack_pin(pin: str) -> int:
+    """Pack a DIGIPIN string into a 40-bit integer."""
+    clean = _normalise_pin(pin)
+    value = 0
+    for char in clean:
+        row, col = _GRID_LOOKUP[char]
+        value = (value << 4) | (row * 4 + col)
+    return value
+
+
+def unpack_pin(value: int) -> str:
+    """Render a packed DIGIPIN back into its dashed string form."""
+    value = int(value)
+    if not 0 <= value < 1 << PACKED_BITS:
+        raise DigiPinValidationError("Packed DIGIPIN must be a 40-bit unsigned integer")
+    chars: List[str] = []
+    for level in range(PIN_LEVELS):
+        index = (value >> (4 * (PIN_LEVELS - 1 - level))) & 0xF
+        chars.append(_CELLS[index])
+        if level == 2 or level == 5:
+            chars.append("-")
+    return "".join(chars)
+
+
+def _pack_indices(indices: np.ndarray, valid: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Pack ``(n, level)`` symbol indices into level-``level`` prefixes (full pins for 10)."""
+    codes = np.bitwise_or.reduce(indices.astype(np.uint64) << _SHIFTS[PIN_LEVELS - indices.shape[1] :], axis=1)
+    codes[~valid] = INVALID_PACKED
+    return codes.reshape(shape)
+
+
+def _unpack_indices(codes) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+    codes = np.asarray(codes, dtype=np.uint64)
+    shape = codes.shape
+    flat = codes.ravel()
+    valid = flat < np.uint64(1 << PACKED_BITS)
+    indices = ((flat[:, None] >> _SHIFTS) & np.uint64(0xF)).astype(np.intp)
+    indices[~valid] = 0
+    return indices, valid, shape
+
+
+def pack_many(pins, level: int = PIN_LEVELS) -> np.ndarray:
+    """Vectorised :func:`pack_pin`; invalid pins become ``INVALID_PACKED``.
+
+    With ``level`` below 10, ``pins`` are level-``level`` prefixes and pack
+    like :func:`pack_prefix`.
+    """
+    return _pack_indices(*_symbol_indices(pins, level))
+
+
+def unpack_many(codes) -> np.ndarray:
+    """Vectorised :func:`unpack_pin`; out-of-range values become ``INVALID_PIN``."""
+    return _format_indices(*_unpack_indices(codes))
+
+
+def encode_packed(lats, lons, level: int = PIN_LEVELS) -> np.ndarray:
+    """Encode coordinates straight into packed form without building strings.
+
+    With ``level`` below 10 only that many subdivisions are computed and the
+    result holds level-``level`` prefixes (``pin >> 4 * (10 - level)``), the
+    keys :class:`~digipin_agent.aggregate.PrefixAggregate` groups on.
+    """
+    accel = _accelerated()
+    if accel is not None:
+        _check_level(level)
+        lat, lon = np.broadcast_arrays(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        codes = accel.encode_packed(np.ascontiguousarray(lat.ravel()), np.ascontiguousarray(lon.ravel()), _BOUNDS, level)
+        return codes.reshape(lat.shape)
+    return _pack_indices(*_encode_indices(lats, lons, level))
+
+
+def decode_packed(codes, level: int = PIN_LEVELS) -> DecodedDigipinArray:
+    """Decode packed pins (or level-``level`` prefixes) into centres and bounds."""
+    if _check_level(level) < PIN_LEVELS:
+        return _decode_prefixes(codes, level)
+    accel = _accelerated()
+    if accel is not None:
+        codes = np.asarray(codes, dtype=np.uint64)
+        columns, valid = accel.decode_packed(np.ascontiguousarray(codes.ravel()), _BOUNDS)
+        return DecodedDigipinArray(*(column.reshape(codes.shape) for column in columns), valid=valid.reshape(codes.shape))
+    return _decode_indices(*_unpack_indices(codes))
+
+
+def _compact_pairs(values: np.ndarray) -> np.ndarray:
+    """Gather the low bit pair of every nibble into consecutive bits (most significant first)."""
+    values = values & np.uint64(0x3333333333333333)
+    values = (values | (values >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    values = (values | (values >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    values = (values | (values >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    values = (values | (values >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return values.astype(np.int64)
+
+
+def _prefix_grid(prefixes, level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Global ``(rows, cols)`` of packed level-``level`` prefixes; row 0 is the northern edge.
+
+    A symbol is ``row * 4 + col``, so the row digits are the high bit pair of
+    every nibble and the column digits the low pair; both are pulled out with
+    bit operations instead of a per-level divide.
+    """
+    prefixes = np.asarray(prefixes, dtype=np.uint64)
+    return _compact_pairs(prefixes >> np.uint64(2)), _compact_pairs(prefixes)
+
+
+_SPREAD_STEPS = tuple(
+    (np.uint64(shift), np.uint64(mask))
+    for shift, mask in (
+        (16, 0x0000FFFF0000FFFF),
+        (8, 0x00FF00FF00FF00FF),
+        (4, 0x0F0F0F0F0F0F0F0F),
+        (2, 0x3333333333333333),
+    )
+)
+
+
+def _spread_pairs(values: np.ndarray) -> np.ndarray:
+    """Inverse of :func:`_compact_pairs`: move consecutive bit pairs into the low pair of each nibble."""
+    # In place: on large neighbour and ring arrays, allocating a temporary per
+    # step costs more than the bit operations themselves.
+    values = values.astype(np.uint64)
+    values &= np.uint64(0x00000000FFFFFFFF)
+    scratch = np.empty_like(values)
+    for shift, mask in _SPREAD_STEPS:
+        np.left_shift(values, shift, out=scratch)
+        values |= scratch
+        values &= mask
+    return values
+
+
+def _grid_prefixes(rows, cols) -> np.ndarray:
+    """Packed prefixes of the cells at global ``rows``/``cols``; inverse of :func:`_prefix_grid`."""
+    prefixes = _spread_pairs(np.asarray(rows))
+    prefixes <<= np.uint64(2)
+    prefixes |= _spread_pairs(np.asarray(cols))
+    return prefixes
+
+
+def _cell_size(level: int) -> Tuple[float, float]:
+    """``(lat_step, lon_step)`` in degrees of a level-``level`` cell."""
+    cells = 4.0**level
+    return (
+        (DIGIPIN_BOUNDS["max_lat"] - DIGIPIN_BOUNDS["min_lat"]) / cells,
+        (DIGIPIN_BOUNDS["max_lon"] - DIGIPIN_BOUNDS["min_lon"]) / cells,
+    )
+
+
+def _grid_bounds(rows, cols, level: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """``(min_lat, min_lon, max_lat, max_lon)`` of the level-``level`` cells at ``rows``/``cols``.
+
+    Every cell edge is a multiple of a power-of-two fraction of the 36 degree
+    grid span, so these products are exact and agree with the level-by-level
+    decoder bit for bit.
+    """
+    lat_step, lon_step = _cell_size(level)
+    max_lat = DIGIPIN_BOUNDS["max_lat"] - np.asarray(rows, dtype=np.float64) * lat_step
+    min_lon = DIGIPIN_BOUNDS["min_lon"] + np.asarray(cols, dtype=np.float64) * lon_step
+    return max_lat - lat_step, min_lon, max_lat, min_lon + lon_step
+
+
+def _decode_prefixes(prefixes, level: int) -> DecodedDigipinArray:
+    """Cells of packed level-``level`` prefixes, straight from their grid row/column."""
+    prefixes = np.asarray(prefixes, dtype=np.uint64)
+    valid = prefixes < np.uint64(1 << 4 * level)
+    rows, cols = _prefix_grid(np.where(valid, prefixes, 0), level)
+    min_lat, min_lon, max_lat, max_lon = _grid_bounds(rows, cols, level)
+    columns = [(min_lat + max_lat) / 2.0, (min_lon + max_lon) / 2.0, min_lat, min_lon, max_lat, max_lon]
+    for column in columns:
+        column[~valid] = np.nan
+    return DecodedDigipinArray(*columns, valid=valid)
+
+
+def format_prefixes(prefixes, level: int) -> np.ndarray:
+    """Render packed level-``level`` prefixes in dashed form, e.g. ``"39J-4"``."""
+    prefixes = np.asarray(prefixes, dtype=np.uint64)
+    _check_level(level)
+    positions = list(_DASHED_POSITIONS[:level])
+    width = positions[-1] + 1
+    codepoints = np.zeros((prefixes.size, width), dtype=np.uint32)
+    for dash in (3, 7):
+        if dash < width:
+            codepoints[:, dash] = ord("-")
+    shifts = np.array([4 * (level - 1 - step) for step in range(level)], dtype=np.uint64)
+    symbols = (prefixes.ravel()[:, None] >> shifts) & np.uint64(0xF)
+    codepoints[:, positions] = _SYMBOL_CODEPOINTS[symbols.astype(np.intp)]
+    return codepoints.view(np.dtype(f"U{width}")).reshape(prefixes.shape)
+
+
+def _mix64(codes: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser, used to spread packed pins evenly across buckets."""
+    with np.errstate(over="ignore"):
+        z = codes + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+class PinArray:
+    """Compact array of DIGIPINs backed by a ``uint64`` NumPy buffer.
+
+    Costs 8 bytes per pin and keeps sorting, de-duplication, hashing and
+    prefix matching on the packed integers. Operations return new arrays.
+    """
+
+    __slots__ = ("_codes",)
+
+    def __init__(self, codes: Union[np.ndarray, Iterable[int]] = ()):
+        codes = np.ascontiguousarray(codes, dtype=np.uint64).ravel()
+        if codes.size and codes.max() >= np.uint64(1 << PACKED_BITS):
+            raise DigiPinValidationError("PinArray values must be 40-bit packed DIGIPINs")
+        self._codes = codes
+
+    @classmethod
+    def from_pins(cls, pins, drop_invalid: bool = False) -> "PinArray":
+        """Build from DIGIPIN strings, raising on invalid pins unless ``drop_invalid``."""
+        codes = pack_many(pins).ravel()
+        return cls._from_checked(codes, drop_invalid, "DIGIPIN")
+
+    @classmethod
+    def from_coordinates(cls, lats, lons, drop_invalid: bool = False) -> "PinArray":
+        """Build by encoding coordinates, raising on out-of-range points unless ``drop_invalid``."""
+        codes = encode_packed(lats, lons).ravel()
+        return cls._from_checked(codes, drop_invalid, "coordinate")
+
+    @classmethod
+    def _from_checked(cls, codes: np.ndarray, drop_invalid: bool, label: str) -> "PinArray":
+        invalid = codes == INVALID_PACKED
+        if invalid.any():
+            if not drop_invalid:
+                position = int(np.flatnonzero(invalid)[0])
+                raise DigiPinValidationError(f"Invalid {label} at index {position}")
+            codes = codes[~invalid]
+        return cls(codes)
+
+    @property
+    def codes(self) -> np.ndarray:
+        """The underlying packed values (read-only view)."""
+        view = self._codes.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._codes.nbytes)
+
+    def __len__(self) -> int:
+        return int(self._codes.size)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_strings().tolist())
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return unpack_pin(self._codes[key])
+        return PinArray(self._codes[key])
+
+    def __contains__(self, pin: object) -> bool:
+        try:
+            code = pack_pin(pin)
+        except DigiPinValidationError:
+            return False
+        return bool((self._codes == np.uint64(code)).any())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PinArray):
+            return NotImplemented
+        return np.array_equal(self._codes, other._codes)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        preview = ", ".join(unpack_many(self._codes[:3]).tolist())
+        suffix = ", ..." if len(self) > 3 else ""
+        return f"PinArray([{preview}{suffix}], size={len(self)})"
+
+    def to_strings(self) -> np.ndarray:
+        return unpack_many(self._codes)
+
+    def decode(self) -> DecodedDigipinArray:
+        return decode_packed(self._codes)
+
+    def argsort(self) -> np.ndarray:
+        return np.argsort(self._codes, kind="stable")
+
+    def sort(self) -> "PinArray":
+        """Return a copy sorted in hierarchical (prefix) order."""
+        return PinArray(np.sort(self._codes))
+
+    def unique(self, return_counts: bool = False):
+        """Return the sorted distinct pins, optionally with their multiplicities."""
+        if return_counts:
+            codes, counts = np.unique(self._codes, return_counts=True)
+            return PinArray(codes), counts
+        return PinArray(np.unique(self._codes))
+
+    def hashes(self) -> np.ndarray:
+        """Well-mixed 64-bit hashes of each pin, e.g. for sharding or partitioning."""
+        return _mix64(self._codes)
+
+    def prefixes(self, level: int) -> np.ndarray:
+        """Packed prefixes of every pin truncated to ``level`` symbols."""
+        _check_level(level)
+        return self._codes >> np.uint64(4 * (PIN_LEVELS - level))
+
+    def startswith(self, prefix: str) -> np.ndarray:
+        """Boolean mask of pins that share ``prefix`` (1-10 symbols, dashes optional)."""
+        value, level = pack_prefix(prefix)
+        return self.prefixes(level) == np.uint64(value)
+
+    def isin(self, other: "PinArray") -> np.ndarray:
+        """Boolean mask of pins that also occur in ``other``."""
+        return np.isin(self._codes, other._codes)
+
+    @staticmethod
+    def concatenate(arrays: Iterable["PinArray"]) -> "PinArray":
+        return PinArray(np.concatenate([array._codes for array in arrays] or [np.empty(0, dtype=np.uint64)]))
+
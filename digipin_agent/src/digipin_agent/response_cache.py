@@ -0,0 +1,184 @@
+"""TTL cache and single-flight coalescing for agent responses.
+
+The assistant UI tends to fire the same prompt several times in a burst.
+:class:`ResponseCache` keys answers on the normalised prompt and context,
+serves repeats from a pluggable backend until they expire, and lets concurrent
+identical requests share one in-flight model call instead of each starting
+their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None  # type: ignore
+
+
+def prompt_key(message: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Stable cache key for a prompt, ignoring case and whitespace differences."""
+    normalised = " ".join(str(message).split()).casefold()
+    payload = json.dumps([normalised, context], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryResponseBackend:
+    """In-process LRU store whose entries expire after their TTL."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisResponseBackend:
+    """Shared store on a Redis-compatible server, so every worker sees one cache.
+
+    Pass either a ``client`` exposing ``get``, ``set(..., px=)``, ``scan_iter``
+    and ``delete``, or a ``url`` (requires the ``redis`` package).
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, prefix: str = "digipin:agent:"):
+        if client is None:
+            if url is None:
+                raise ValueError("Either client or url is required")
+            if redis is None:
+                raise ImportError("The redis package is required for RedisResponseBackend")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    def clear(self) -> None:
+        for key in list(self.client.scan_iter(match=self.prefix + "*")):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """Caches response text for ``ttl`` seconds and coalesces concurrent misses.
+
+    ``backend`` defaults to a :class:`MemoryResponseBackend`. Calls that fail
+    or return ``None`` are not cached; a failure is raised to every caller
+    that was waiting on it.
+    """
+
+    def __init__(self, backend: Any = None, ttl: float = 300.0):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.backend = backend if backend is not None else MemoryResponseBackend()
+        self.ttl = ttl
+        self._inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def _run(self, method: Callable[..., Any], *args: Any) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Return the cached text for ``key``, or the result of a shared ``call()``."""
+        cached = await self.lookup(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._call_and_store(key, call))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller timing out or disconnecting does not cancel
+        # the call the other waiters depend on.
+        return await asyncio.shield(task)
+
+    async def lookup(self, key: str) -> Optional[str]:
+        """Return the cached text for ``key`` without starting a call."""
+        cached = await self._run(self.backend.get, key)
+        if cached is None:
+            return None
+        self.hits += 1
+        return json.loads(cached)
+
+    async def store(self, key: str, value: str) -> None:
+        """Cache ``value`` for ``key``, e.g. after a streamed answer completes."""
+        await self._run(self.backend.set, key, json.dumps(value), self.ttl)
+
+    def _forget(self, key: str, task: "asyncio.Future[Optional[str]]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter gave up
+
+    async def _call_and_store(self, key: str, call: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        value = await call()
+        if value is not None:
+            await self.store(key, value)
+        return value
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
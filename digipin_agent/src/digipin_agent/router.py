@@ -0,0 +1,133 @@
+"""Rule-based fast path for agent prompts that need no language model.
+
+Prompts such as ``decode 39J-438-TJC7`` or ``encode 28.61, 77.20`` map onto a
+single geo call. :class:`FastPathRouter` recognises them with anchored regular
+expressions and answers straight from the geo helpers, so only open-ended
+prompts pay for a Gemini round trip. Anything that does not match a rule in
+full, or names a pin that does not validate, falls through to the model.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from . import geo
+from .geo import DigiPinValidationError
+
+# Only DIGIPIN symbols, so ten-letter place names ("Chandigarh") are not taken for pins.
+_SYMBOL = "[2-9CFJKLMPTcfjklmpt]"
+_PIN = rf"({_SYMBOL}{{3}}-?{_SYMBOL}{{3}}-?{_SYMBOL}{{4}})"
+_NUMBER = r"([-+]?\d+(?:\.\d+)?)"
+_POLITE = r"(?:please\s+|can\s+you\s+|could\s+you\s+)?"
+_END = r"\s*[?.!]*\s*$"
+
+_DECODE = re.compile(
+    rf"^\s*{_POLITE}(?:decode|locate|where\s+is)\s+(?:the\s+)?(?:digipin\s+)?{_PIN}{_END}", re.IGNORECASE
+)
+_ENCODE = re.compile(
+    rf"^\s*{_POLITE}(?:encode|(?:what\s+is\s+)?(?:the\s+)?digipin\s+(?:for|of))\s+(?:coordinates\s+)?"
+    rf"\(?\s*{_NUMBER}\s*[,\s]\s*{_NUMBER}\s*\)?{_END}",
+    re.IGNORECASE,
+)
+_VALIDATE = re.compile(
+    rf"^\s*{_POLITE}(?:validate|check|is)\s+(?:the\s+)?(?:digipin\s+)?{_PIN}(?:\s+(?:a\s+)?valid(?:\s+digipin)?)?{_END}",
+    re.IGNORECASE,
+)
+_DISTANCE = re.compile(
+    rf"^\s*{_POLITE}(?:what\s+is\s+the\s+)?(?:distance|how\s+far)\s+(?:is\s+it\s+)?(?:between|from)\s+"
+    rf"{_PIN}\s+(?:and|to)\s+{_PIN}{_END}",
+    re.IGNORECASE,
+)
+
+INTENTS = ("decode", "encode", "validate", "distance")
+
+
+class FastPathRouter:
+    """Answers simple DIGIPIN prompts directly and counts how often it could.
+
+    ``geo_module`` may be :mod:`digipin_agent.geo` or a
+    :class:`~digipin_agent.cache.GeoCache`. :meth:`route` returns the usual
+    ``{"message", "response"}`` payload, or ``None`` when the prompt should go
+    to the model.
+    """
+
+    def __init__(self, geo_module: Any = geo):
+        self.geo = geo_module
+        self._rules: Dict[str, Callable[[re.Match], Optional[str]]] = {
+            "decode": self._decode,
+            "encode": self._encode,
+            "validate": self._validate,
+            "distance": self._distance,
+        }
+        self._patterns = {"decode": _DECODE, "encode": _ENCODE, "validate": _VALIDATE, "distance": _DISTANCE}
+        self._lock = threading.Lock()
+        self.total = 0
+        self.intents = dict.fromkeys(INTENTS, 0)
+
+    def route(self, message: str) -> Optional[Dict[str, Any]]:
+        intent, match = self._match(message)
+        response = None if intent is None else self._rules[intent](match)
+        with self._lock:
+            self.total += 1
+            if response is not None:
+                self.intents[intent] += 1
+        if response is None:
+            return None
+        return {"message": message, "response": response}
+
+    def _match(self, message: str):
+        if not isinstance(message, str) or len(message) > 200:
+            return None, None
+        # Validation is tried before decode so "is X valid?" is not read as a lookup.
+        for intent in ("validate", "distance", "encode", "decode"):
+            match = self._patterns[intent].match(message)
+            if match:
+                return intent, match
+        return None, None
+
+    def _decode(self, match: re.Match) -> Optional[str]:
+        pin = match.group(1)
+        try:
+            decoded = self.geo.decode_digipin(pin)
+        except DigiPinValidationError:
+            return None
+        (min_lat, min_lon), (max_lat, max_lon) = decoded.bounds
+        return (
+            f"DIGIPIN {pin} is centred at latitude {decoded.latitude:.6f}, longitude {decoded.longitude:.6f} "
+            f"(cell bounds {min_lat:.6f} to {max_lat:.6f} N, {min_lon:.6f} to {max_lon:.6f} E)."
+        )
+
+    def _encode(self, match: re.Match) -> str:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        try:
+            pin = self.geo.encode_coordinates(lat, lon)
+        except DigiPinValidationError as exc:
+            return f"Could not encode {lat}, {lon}: {exc}."
+        return f"The DIGIPIN for latitude {lat}, longitude {lon} is {pin}."
+
+    def _validate(self, match: re.Match) -> Optional[str]:
+        pin = match.group(1)
+        if self.geo.is_valid_digipin(pin):
+            return f"{pin} is a valid DIGIPIN."
+        return None
+
+    def _distance(self, match: re.Match) -> Optional[str]:
+        start, end = match.group(1), match.group(2)
+        try:
+            summary = self.geo.get_distance_summary(start, end)
+        except DigiPinValidationError:
+            return None
+        return f"The distance between {start} and {end} is {summary['formatted']} ({summary['meters']:.1f} m)."
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            handled = sum(self.intents.values())
+            return {
+                "total": self.total,
+                "fast_path": handled,
+                "fallback": self.total - handled,
+                "fast_path_rate": handled / self.total if self.total else 0.0,
+                "intents": dict(self.intents),
+            }
@@ -0,0 +1,195 @@
+"""Named, disk-backed DIGIPIN collections with prebuilt spatial indexes."""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .aggregate import PrefixAggregate
+from .index import _META_FILE, DigipinIndex
+
+logger = logging.getLogger(__name__)
+
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+_WEIGHTS = "weights"
+_WEIGHTS_FILE = f"{_WEIGHTS}.npy"
+
+
+@dataclass(frozen=True)
+class _Entry:
+    stamp: Tuple[int, int]
+    index: DigipinIndex
+    weights: Optional[np.ndarray]
+
+
+class CollectionStore:
+    """Registry of :class:`DigipinIndex` objects persisted under ``root``.
+
+    Each collection lives in ``root/<name>``, a link to its current version
+    (see :meth:`DigipinIndex.save`), and is memory-mapped when the store is
+    created, so a freshly started worker can serve queries straight away
+    without decoding or sorting anything. Per-cell aggregates are built from
+    the sorted index on first use and kept until the collection changes.
+
+    Disk is the source of truth: every lookup checks the collection's
+    ``meta.json`` and reloads it when it was registered, replaced or deleted
+    by another process (e.g. another server worker sharing ``root``). A
+    collection whose files are missing keeps being served until a later
+    lookup finds them still missing, so a swap in progress never looks like
+    a deletion.
+    """
+
+    def __init__(self, root: Union[str, Path], leaf_size: int = 32):
+        self.root = Path(root)
+        self.leaf_size = leaf_size
+        self._entries: Dict[str, _Entry] = {}
+        self._aggregates: Dict[str, PrefixAggregate] = {}
+        self._missing: Set[str] = set()
+        self._lock = threading.Lock()
+        self.load_all()
+
+    @staticmethod
+    def _check_name(name: str) -> str:
+        if not _NAME_PATTERN.match(name or ""):
+            raise ValueError("Collection names must be 1-64 letters, digits, '-' or '_'")
+        return name
+
+    def _stamp(self, name: str) -> Optional[Tuple[int, int]]:
+        # Every save swaps in a new directory, so the meta file's inode changes.
+        try:
+            stat = (self.root / name / _META_FILE).stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self, name: str, stamp: Tuple[int, int]) -> _Entry:
+        # Resolve the link once, so the weights come from the same version as the index.
+        path = (self.root / name).resolve()
+        index = DigipinIndex.load(path)
+        weights_path = path / _WEIGHTS_FILE
+        weights = np.load(weights_path, mmap_mode="r") if weights_path.exists() else None
+        return _Entry(stamp, index, weights)
+
+    def _refresh(self, name: str) -> Optional[_Entry]:
+        """The current entry for ``name``, reloaded from disk if it changed there."""
+        stamp = self._stamp(name) if _NAME_PATTERN.match(name or "") else None
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+        if stamp is None:
+            with self._lock:
+                if entry is not None and name not in self._missing:
+                    # Possibly caught between two renames by a writer; only a
+                    # second miss means the collection is really gone.
+                    self._missing.add(name)
+                    return entry
+            loaded = None
+        else:
+            try:
+                loaded = self._load(name, stamp)
+            except Exception as exc:
+                # Most likely caught mid-swap by a writer; keep serving what we had.
+                logger.warning("Could not reload collection %s: %s", name, exc)
+                return entry
+        with self._lock:
+            self._missing.discard(name)
+            if self._entries.get(name) is entry:
+                if loaded is None:
+                    self._entries.pop(name, None)
+                else:
+                    self._entries[name] = loaded
+                self._aggregates.pop(name, None)
+            return self._entries.get(name)
+
+    def load_all(self) -> None:
+        """(Re)load every collection found under ``root``."""
+        loaded: Dict[str, _Entry] = {}
+        for name in self._disk_names():
+            stamp = self._stamp(name)
+            try:
+                loaded[name] = self._load(name, stamp)
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("Skipping unreadable collection %s: %s", self.root / name, exc)
+        with self._lock:
+            self._entries = loaded
+            self._aggregates = {}
+            self._missing = set()
+
+    def _disk_names(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            path.name
+            for path in self.root.iterdir()
+            if _NAME_PATTERN.match(path.name) and (path / _META_FILE).is_file()
+        )
+
+    def names(self) -> List[str]:
+        return sorted(self.sizes())
+
+    def sizes(self) -> Dict[str, int]:
+        names = set(self._disk_names())
+        with self._lock:
+            names.update(self._entries)
+        entries = {name: self._refresh(name) for name in sorted(names)}
+        return {name: len(entry.index) for name, entry in entries.items() if entry is not None}
+
+    def get(self, name: str) -> DigipinIndex:
+        """Return the index for ``name``; raises ``KeyError`` when unknown."""
+        entry = self._refresh(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry.index
+
+    def aggregate(self, name: str) -> PrefixAggregate:
+        """Per-level cell counts (and weight sums, if registered with weights) for ``name``."""
+        entry = self._refresh(name)
+        if entry is None:
+            raise KeyError(name)
+        with self._lock:
+            aggregate = self._aggregates.get(name)
+        if aggregate is None:
+            aggregate = PrefixAggregate.from_index(entry.index, entry.weights)
+            with self._lock:
+                # Only cache if the collection was not replaced meanwhile.
+                if self._entries.get(name) is entry:
+                    self._aggregates[name] = aggregate
+        return aggregate
+
+    def register(self, name: str, pins: Iterable[str], weights: Optional[Sequence[float]] = None) -> DigipinIndex:
+        """Build, persist and activate a collection, replacing any previous one.
+
+        ``weights`` (one per pin) are summed per cell by :meth:`aggregate`;
+        without them every pin counts as 1. The index and its weights are
+        swapped in together, so readers never see one without the other.
+        """
+        path = self.root / self._check_name(name)
+        pins = list(pins)
+        extra = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (len(pins),):
+                raise ValueError("weights must have one value per pin")
+            extra = {_WEIGHTS: weights}
+        DigipinIndex(pins, leaf_size=self.leaf_size).save(path, extra)
+        entry = self._refresh(name)
+        if entry is None:  # pragma: no cover - deleted by another process straight away
+            raise KeyError(name)
+        return entry.index
+
+    def delete(self, name: str) -> None:
+        """Remove a collection from memory and disk; raises ``KeyError`` when unknown."""
+        if self._refresh(name) is None:
+            raise KeyError(name)
+        with self._lock:
+            self._entries.pop(name, None)
+            self._aggregates.pop(name, None)
+            self._missing.discard(name)
+        DigipinIndex.remove(self.root / name)
@@ -0,0 +1,133 @@
+"""Compact MessagePack wire format for bulk geo payloads.
+
+JSON bodies cost a parse, a Python object and a model field per item; for
+large batches that dwarfs the geo math itself. In this format a payload is a
+MessagePack map whose array values travel as raw little-endian column
+buffers::
+
+    {"latitudes": {"dtype": "<f8", "shape": [n], "data": <n * 8 bytes>}, ...}
+
+:func:`packb` turns NumPy arrays into such columns and :func:`unpackb` maps
+them straight back onto NumPy arrays over the received bytes, so no per-item
+objects are built on either side. Pins travel as packed ``<u8`` columns
+(see :mod:`digipin_agent.packed`); other values are plain MessagePack.
+Requires the optional ``msgpack`` package.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .geo import DigiPinValidationError
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None  # type: ignore
+
+MEDIA_TYPE = "application/msgpack"
+MEDIA_TYPES = (MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+AVAILABLE = msgpack is not None
+
+# Column dtypes accepted from the wire; anything else (objects in particular) is refused.
+COLUMN_DTYPES = frozenset({"|b1", "|u1", "<u4", "<u8", "<i4", "<i8", "<f4", "<f8"})
+_COLUMN_KEYS = frozenset({"dtype", "shape", "data"})
+
+
+def _require_msgpack() -> None:
+    if msgpack is None:
+        raise ImportError("The msgpack package is required for the binary wire format")
+
+
+def is_msgpack(media_type: Optional[str]) -> bool:
+    """Whether a ``Content-Type`` or ``Accept`` header value names MessagePack."""
+    if not media_type:
+        return False
+    return any(part.split(";")[0].strip().lower() in MEDIA_TYPES for part in media_type.split(","))
+
+
+def _pack_column(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        column = np.ascontiguousarray(value)
+        dtype = column.dtype.newbyteorder("<") if column.dtype.byteorder == ">" else column.dtype
+        if dtype.str not in COLUMN_DTYPES:
+            raise TypeError(f"Unsupported column dtype: {value.dtype}")
+        return {"dtype": dtype.str, "shape": list(column.shape), "data": column.astype(dtype, copy=False).tobytes()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _unpack_column(value: Dict[Any, Any]) -> Any:
+    if value.keys() != _COLUMN_KEYS:
+        return value
+    dtype, shape, data = value["dtype"], value["shape"], value["data"]
+    if dtype not in COLUMN_DTYPES:
+        raise DigiPinValidationError(f"Unsupported column dtype: {dtype}")
+    if not isinstance(shape, list) or not all(isinstance(size, int) and size >= 0 for size in shape):
+        raise DigiPinValidationError("Column shape must be a list of non-negative integers")
+    column = np.frombuffer(data, dtype=np.dtype(dtype))
+    if column.size != int(np.prod(shape, dtype=np.int64)):
+        raise DigiPinValidationError("Column data does not match its shape")
+    return column.reshape(shape)
+
+
+def packb(payload: Mapping[str, Any]) -> bytes:
+    """Serialise ``payload``, sending NumPy arrays as column buffers."""
+    _require_msgpack()
+    return msgpack.packb(payload, default=_pack_column, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Dict[str, Any]:
+    """Parse a MessagePack map, turning column buffers back into (read-only) NumPy arrays."""
+    _require_msgpack()
+    try:
+        payload = msgpack.unpackb(data, object_hook=_unpack_column, raw=False, strict_map_key=True)
+    except DigiPinValidationError:
+        raise
+    except Exception as exc:
+        raise DigiPinValidationError(f"Invalid MessagePack body: {exc or type(exc).__name__}") from exc
+    if not isinstance(payload, dict):
+        raise DigiPinValidationError("MessagePack body must be a map")
+    return payload
+
+
+def column(
+    payload: Mapping[str, Any],
+    name: str,
+    kinds: str = "f",
+    max_items: Optional[int] = None,
+    strings: bool = False,
+) -> Any:
+    """One-dimensional array field ``name`` of an unpacked payload.
+
+    Accepts a column buffer whose dtype kind is in ``kinds`` or, with
+    ``strings=True``, a plain list of strings (returned as is). Numeric lists
+    are accepted too, for clients without a column encoder; for unsigned
+    columns (``kinds`` without ``"f"``) their items must be non-negative
+    integers, never silently truncated floats.
+    """
+    if name not in payload:
+        raise DigiPinValidationError(f"{name} is required")
+    value = payload[name]
+    if isinstance(value, list):
+        if strings and all(isinstance(item, str) for item in value):
+            values: Sequence[Any] = value
+        elif all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+            if "f" not in kinds and not all(isinstance(item, int) and item >= 0 for item in value):
+                raise DigiPinValidationError(f"{name} must hold non-negative integers")
+            try:
+                values = np.asarray(value, dtype=np.float64 if "f" in kinds else np.uint64)
+            except (OverflowError, TypeError, ValueError) as exc:
+                raise DigiPinValidationError(f"{name} has an out-of-range item") from exc
+        else:
+            raise DigiPinValidationError(f"{name} has an unsupported item type")
+    elif isinstance(value, np.ndarray) and value.dtype.kind in kinds and value.ndim == 1:
+        values = value
+    else:
+        raise DigiPinValidationError(f"{name} must be a one-dimensional column")
+    if max_items is not None and len(values) > max_items:
+        raise DigiPinValidationError(f"{name} is limited to {max_items} items")
+    return values
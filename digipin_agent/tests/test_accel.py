@@ -0,0 +1,99 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent import geo
+from digipin_agent.geo import DIGIPIN_BOUNDS, decode_many, encode_coordinates, encode_many, pairwise_distances
+from digipin_agent.packed import decode_packed, encode_packed
+
+try:
+    import numba  # noqa: F401
+except ImportError:
+    numba = None
+
+
+def _edge_points():
+    """Points on cell boundaries down to level 10, where rounding matters most."""
+    lat_edges = DIGIPIN_BOUNDS["min_lat"] + np.arange(0, 4**4 + 1) * (36.0 / 4**4)
+    lon_edges = DIGIPIN_BOUNDS["min_lon"] + np.arange(0, 4**4 + 1) * (36.0 / 4**4)
+    fine = 28.6 + np.arange(-50, 50) * (36.0 / 4**10)
+    lats = np.concatenate([lat_edges, fine, np.nextafter(lat_edges, 0), [np.nan, np.inf, 1.0, 40.0]])
+    lons = np.concatenate([lon_edges, fine + 48.6, np.nextafter(lon_edges, 0), [77.0, 77.0, 77.0, 77.0]])
+    return lats, lons
+
+
+@unittest.skipIf(numba is None, "numba is not installed")
+class TestNumbaBackendParity(unittest.TestCase):
+    def setUp(self):
+        self.previous = geo.get_backend()
+        rng = np.random.default_rng(7)
+        count = 200000
+        random_lats = rng.uniform(DIGIPIN_BOUNDS["min_lat"] - 1, DIGIPIN_BOUNDS["max_lat"] + 1, count)
+        random_lons = rng.uniform(DIGIPIN_BOUNDS["min_lon"] - 1, DIGIPIN_BOUNDS["max_lon"] + 1, count)
+        edge_lats, edge_lons = _edge_points()
+        self.lats = np.concatenate([random_lats, edge_lats])
+        self.lons = np.concatenate([random_lons, edge_lons])
+
+    def tearDown(self):
+        geo.set_backend(self.previous)
+
+    def _both(self, func, *args, **kwargs):
+        geo.set_backend("numpy")
+        expected = func(*args, **kwargs)
+        geo.set_backend("numba")
+        return expected, func(*args, **kwargs)
+
+    def test_encode_is_bit_identical(self):
+        expected, actual = self._both(encode_many, self.lats, self.lons)
+        np.testing.assert_array_equal(actual, expected)
+        for lat, lon, pin in zip(self.lats[:200], self.lons[:200], actual[:200]):
+            if pin:
+                self.assertEqual(pin, encode_coordinates(float(lat), float(lon)))
+
+    def test_decode_is_bit_identical(self):
+        geo.set_backend("numpy")
+        pins = encode_many(self.lats, self.lons).tolist() + ["bogus", None]
+        expected, actual = self._both(decode_many, pins)
+        for field in ("latitude", "longitude", "min_lat", "min_lon", "max_lat", "max_lon", "valid"):
+            np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field), err_msg=field)
+
+    def test_packed_kernels_are_bit_identical(self):
+        expected, actual = self._both(encode_packed, self.lats.reshape(-1, 1), self.lons.reshape(-1, 1))
+        self.assertEqual(actual.shape, expected.shape)
+        np.testing.assert_array_equal(actual, expected)
+
+        expected, actual = self._both(decode_packed, expected.ravel())
+        for field in ("latitude", "longitude", "min_lat", "min_lon", "max_lat", "max_lon", "valid"):
+            np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field), err_msg=field)
+
+    def test_coarse_levels_are_bit_identical(self):
+        for level in (1, 4, 7):
+            expected, actual = self._both(encode_packed, self.lats, self.lons, level)
+            np.testing.assert_array_equal(actual, expected)
+            expected, actual = self._both(encode_many, self.lats, self.lons, level)
+            np.testing.assert_array_equal(actual, expected)
+            expected, actual = self._both(decode_many, expected, level)
+            for field in ("latitude", "longitude", "min_lat", "min_lon", "max_lat", "max_lon", "valid"):
+                np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field), err_msg=field)
+
+    def test_distances_match(self):
+        geo.set_backend("numpy")
+        pins = encode_many(self.lats[:500], self.lons[:500])
+        pins = pins[pins != ""].tolist()
+        expected, actual = self._both(pairwise_distances, pins)
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-6)
+        # float32 output stays on the NumPy kernels under either backend.
+        expected, actual = self._both(pairwise_distances, pins, dtype=np.float32)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            geo.set_backend("cython")
+
+
+if __name__ == "__main__":
+    unittest.main()
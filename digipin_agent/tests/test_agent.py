@@ -1,3 +1,6 @@
+import asyncio
+import os
+import subprocess
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 import sys
@@ -9,7 +12,24 @@ print(f"DEBUG: Adding {src_path} to sys.path")
 sys.path.insert(0, src_path)
 print(f"DEBUG: sys.path[0] is {sys.path[0]}")
 
-from digipin_agent.agent import GeminiDigipinAgent
+from digipin_agent.agent import TOOL_CALLS, GeminiDigipinAgent
+from digipin_agent.response_cache import ResponseCache
+
+class TestLazySdkImport(unittest.TestCase):
+    def test_package_import_does_not_load_sdk(self):
+        code = (
+            "import sys; import digipin_agent; "
+            "print(any(name.startswith('google.generativeai') for name in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": src_path},
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
 
 class TestGeminiDigipinAgent(unittest.IsolatedAsyncioTestCase):
     @patch("digipin_agent.agent.HarmBlockThreshold", create=True)
@@ -22,6 +42,7 @@ class TestGeminiDigipinAgent(unittest.IsolatedAsyncioTestCase):
         
         # Mock the chat session
         self.mock_chat = MagicMock()
+        self.mock_chat.send_message_async = AsyncMock()
         self.mock_model.start_chat.return_value = self.mock_chat
         
         self.agent = GeminiDigipinAgent(api_key="test_key")
@@ -32,21 +53,204 @@ class TestGeminiDigipinAgent(unittest.IsolatedAsyncioTestCase):
         mock_response.text = "The coordinates for 88-88-88 are 12.34, 56.78"
         # Ensure candidates is empty so it falls back to .text
         mock_response.candidates = []
-        self.mock_chat.send_message.return_value = mock_response
+        self.mock_chat.send_message_async.return_value = mock_response
 
         response = await self.agent.respond("Where is 88-88-88?")
         
         self.assertEqual(response["response"], "The coordinates for 88-88-88 are 12.34, 56.78")
-        self.mock_chat.send_message.assert_called()
+        self.mock_chat.send_message_async.assert_awaited()
+        self.mock_chat.send_message.assert_not_called()
 
     async def test_respond_error(self):
         # Mock an exception during send_message
-        self.mock_chat.send_message.side_effect = Exception("API Error")
+        self.mock_chat.send_message_async.side_effect = Exception("API Error")
 
         with self.assertRaises(Exception) as cm:
             await self.agent.respond("Where is 88-88-88?")
         
         self.assertEqual(str(cm.exception), "API Error")
 
+    async def test_respond_timeout(self):
+        async def slow_send(_prompt):
+            await asyncio.sleep(1)
+
+        self.mock_chat.send_message_async.side_effect = slow_send
+        self.agent.request_timeout = 0.01
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.agent.respond("Where is 88-88-88?")
+
+    async def test_concurrency_limit(self):
+        self.agent.max_concurrency = 2
+        active = peak = 0
+
+        async def tracked_send(_prompt):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            response = MagicMock()
+            response.candidates = []
+            response.parts = []
+            response.text = "ok"
+            return response
+
+        self.mock_chat.send_message_async.side_effect = tracked_send
+        results = await asyncio.gather(*(self.agent.respond("hi") for _ in range(6)))
+
+        self.assertEqual([result["response"] for result in results], ["ok"] * 6)
+        self.assertEqual(peak, 2)
+
+    async def test_simple_prompt_skips_the_model(self):
+        response = await self.agent.respond("decode 39J-438-TJC7")
+
+        self.assertIn("28.6", response["response"])
+        self.mock_chat.send_message_async.assert_not_called()
+        self.assertEqual(self.agent.router.stats()["fast_path"], 1)
+
+    async def test_response_cache_coalesces_identical_prompts(self):
+        self.agent.response_cache = ResponseCache(ttl=60)
+
+        async def slow_send(_prompt):
+            await asyncio.sleep(0.01)
+            return self._text_response("cached answer")
+
+        self.mock_chat.send_message_async.side_effect = slow_send
+        prompts = ["Tell me about DIGIPIN", "tell me about  digipin", "Tell me about DIGIPIN"]
+        results = await asyncio.gather(*(self.agent.respond(prompt) for prompt in prompts))
+        results.append(await self.agent.respond("Tell me about DIGIPIN"))
+
+        self.assertEqual([result["response"] for result in results], ["cached answer"] * 4)
+        self.assertEqual(results[1]["message"], "tell me about  digipin")
+        self.assertEqual(self.mock_chat.send_message_async.await_count, 1)
+
+    @staticmethod
+    def _function_call_response(*calls):
+        parts = []
+        for name, args in calls:
+            part = MagicMock()
+            part.function_call.name = name
+            part.function_call.args = args
+            parts.append(part)
+        response = MagicMock()
+        response.parts = parts
+        return response
+
+    @staticmethod
+    def _text_response(text):
+        response = MagicMock()
+        response.parts = []
+        response.candidates = []
+        response.text = text
+        return response
+
+    @patch("digipin_agent.agent.genai")
+    async def test_parallel_tool_calls_in_one_round_trip(self, mock_genai):
+        mock_genai.protos.Part.side_effect = lambda **kwargs: kwargs
+        mock_genai.protos.FunctionResponse.side_effect = lambda **kwargs: kwargs
+        self.mock_chat.send_message_async.side_effect = [
+            self._function_call_response(
+                ("decode_digipin", {"pin": "39J-438-TJC7"}),
+                ("validate_digipin", {"pin": "bogus"}),
+                ("encode_coordinates", {"latitude": 28.6139, "longitude": 77.209}),
+            ),
+            self._text_response("done"),
+        ]
+
+        decodes_before = TOOL_CALLS.value(tool="decode_digipin", outcome="ok")
+        response = await self.agent.respond("Compare these")
+
+        self.assertEqual(response["response"], "done")
+        self.assertEqual(self.mock_chat.send_message_async.await_count, 2)
+        parts = self.mock_chat.send_message_async.await_args_list[1].args[0]
+        self.assertEqual(
+            [part["function_response"]["name"] for part in parts],
+            ["decode_digipin", "validate_digipin", "encode_coordinates"],
+        )
+        results = [part["function_response"]["response"]["result"] for part in parts]
+        self.assertIn("latitude", results[0])
+        self.assertFalse(results[1]["is_valid"])
+        self.assertEqual(results[2]["pin"], "39J-438-TJC7")
+        self.assertEqual(TOOL_CALLS.value(tool="decode_digipin", outcome="ok"), decodes_before + 1)
+
+    @patch("digipin_agent.agent.genai")
+    async def test_tool_loop_is_capped(self, mock_genai):
+        self.agent.max_tool_rounds = 3
+        self.mock_chat.send_message_async.return_value = self._function_call_response(
+            ("validate_digipin", {"pin": "39J-438-TJC7"})
+        )
+
+        await self.agent.respond("Loop forever")
+
+        # The initial prompt plus one follow-up per permitted round.
+        self.assertEqual(self.mock_chat.send_message_async.await_count, 4)
+
+
+    @staticmethod
+    def _stream(*chunks):
+        class FakeStream:
+            async def __aiter__(self):
+                for chunk in chunks:
+                    yield chunk
+
+        return FakeStream()
+
+    @staticmethod
+    def _chunk(text=None, call=None):
+        part = MagicMock()
+        part.text = text
+        part.function_call = None
+        if call is not None:
+            part.function_call = MagicMock()
+            part.function_call.name, part.function_call.args = call
+        chunk = MagicMock()
+        chunk.parts = [part]
+        return chunk
+
+    async def _collect(self, message):
+        return [event async for event in self.agent.respond_stream(message)]
+
+    async def test_stream_text_deltas(self):
+        self.mock_chat.send_message_async.return_value = self._stream(self._chunk("Hel"), self._chunk("lo"))
+
+        events = await self._collect("Explain DIGIPIN")
+
+        self.assertEqual([event["type"] for event in events], ["text", "text", "done"])
+        self.assertEqual([event["delta"] for event in events[:2]], ["Hel", "lo"])
+        self.assertEqual(events[-1], {"type": "done", "message": "Explain DIGIPIN", "response": "Hello"})
+        self.assertTrue(self.mock_chat.send_message_async.await_args.kwargs["stream"])
+
+    @patch("digipin_agent.agent.genai")
+    async def test_stream_tool_progress(self, mock_genai):
+        self.mock_chat.send_message_async.side_effect = [
+            self._stream(self._chunk(call=("validate_digipin", {"pin": "39J-438-TJC7"}))),
+            self._stream(self._chunk("It is valid.")),
+        ]
+
+        events = await self._collect("Check my pin please, thanks")
+
+        self.assertEqual([event["type"] for event in events], ["tool_call", "tool_result", "text", "done"])
+        self.assertEqual(events[0]["args"], {"pin": "39J-438-TJC7"})
+        self.assertTrue(events[1]["result"]["is_valid"])
+        self.assertEqual(events[-1]["response"], "It is valid.")
+
+    async def test_stream_fast_path(self):
+        events = await self._collect("validate 39J-438-TJC7")
+
+        self.assertEqual([event["type"] for event in events], ["text", "done"])
+        self.mock_chat.send_message_async.assert_not_called()
+
+    async def test_stream_timeout(self):
+        async def slow_send(*_args, **_kwargs):
+            await asyncio.sleep(1)
+
+        self.mock_chat.send_message_async.side_effect = slow_send
+        self.agent.request_timeout = 0.01
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self._collect("Explain DIGIPIN")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.aggregate import PrefixAggregate, level_for_zoom
+from digipin_agent.geo import DigiPinValidationError, decode_many, encode_many
+from digipin_agent.packed import INVALID_PACKED, PinArray, encode_packed, format_prefixes, pack_prefix
+from digipin_agent.store import CollectionStore
+
+
+class TestPrefixAggregate(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        self.lats = rng.uniform(8.0, 35.0, 5000)
+        self.lons = rng.uniform(68.0, 97.0, 5000)
+        self.codes = encode_packed(self.lats, self.lons)
+        self.weights = rng.uniform(0.0, 10.0, 5000)
+        self.aggregate = PrefixAggregate(self.codes, self.weights)
+
+    def test_every_level_matches_brute_force(self):
+        for level in range(1, 11):
+            prefixes = self.codes >> np.uint64(4 * (10 - level))
+            expected, inverse, counts = np.unique(prefixes, return_inverse=True, return_counts=True)
+            table = self.aggregate.table(level)
+            np.testing.assert_array_equal(table.prefixes, expected)
+            np.testing.assert_array_equal(table.counts, counts)
+            np.testing.assert_allclose(table.weights, np.bincount(inverse, self.weights), rtol=1e-12)
+        self.assertEqual(self.aggregate.total_count, 5000)
+        self.assertAlmostEqual(self.aggregate.total_weight, self.weights.sum(), places=6)
+
+    def test_invalid_pins_are_skipped_and_weights_default_to_one(self):
+        codes = np.append(self.codes[:10], [INVALID_PACKED, INVALID_PACKED])
+        aggregate = PrefixAggregate(codes)
+        self.assertEqual(aggregate.total_count, 10)
+        np.testing.assert_array_equal(aggregate.table(10).weights, aggregate.table(10).counts)
+        self.assertEqual(PrefixAggregate(np.empty(0, dtype=np.uint64)).total_count, 0)
+        with self.assertRaises(DigiPinValidationError):
+            PrefixAggregate(self.codes, self.weights[:3])
+        with self.assertRaises(DigiPinValidationError):
+            self.aggregate.table(11)
+
+    def test_cell_bounds_and_labels(self):
+        table = self.aggregate.table(10)
+        pins = PinArray(table.prefixes).to_strings()
+        decoded = decode_many(pins)
+        min_lat, min_lon, max_lat, max_lon = table.bounds()
+        for expected, actual in zip(
+            (decoded.min_lat, decoded.min_lon, decoded.max_lat, decoded.max_lon), (min_lat, min_lon, max_lat, max_lon)
+        ):
+            np.testing.assert_array_equal(actual, expected)
+        np.testing.assert_array_equal(table.labels(), pins)
+
+        coarse = self.aggregate.table(4)
+        for label, prefix in zip(coarse.labels().tolist(), coarse.prefixes.tolist()):
+            self.assertEqual(len(label), 5)
+            self.assertEqual(pack_prefix(label), (prefix, 4))
+        self.assertEqual(format_prefixes(np.array([pack_prefix("39J-438-T")[0]]), 7).tolist(), ["39J-438-T"])
+
+    def test_viewport_query(self):
+        bbox = (20.0, 75.0, 22.5, 80.0)
+        for level in (2, 5, 7):
+            table = self.aggregate.table(level)
+            min_lat, min_lon, max_lat, max_lon = table.bounds()
+            expected = (max_lat >= bbox[0]) & (min_lat <= bbox[2]) & (max_lon >= bbox[1]) & (min_lon <= bbox[3])
+            np.testing.assert_array_equal(self.aggregate.query(level, bbox).prefixes, table.prefixes[expected])
+        self.assertEqual(len(self.aggregate.query(5, (40.0, 60.0, 45.0, 62.0))), 0)
+        with self.assertRaises(DigiPinValidationError):
+            self.aggregate.query(5, (22.0, 75.0, 20.0, 80.0))
+
+    def test_coarse_prefix_input(self):
+        codes = encode_packed(self.lats, self.lons, 6)
+        aggregate = PrefixAggregate(np.append(codes, INVALID_PACKED), np.append(self.weights, 5.0), level=6)
+        self.assertEqual(aggregate.level, 6)
+        for level in (1, 4, 6):
+            expected, actual = self.aggregate.table(level), aggregate.table(level)
+            np.testing.assert_array_equal(actual.prefixes, expected.prefixes)
+            np.testing.assert_array_equal(actual.counts, expected.counts)
+            np.testing.assert_allclose(actual.weights, expected.weights, rtol=1e-12)
+        with self.assertRaises(DigiPinValidationError):
+            aggregate.table(7)
+
+    def test_level_for_zoom(self):
+        self.assertEqual(level_for_zoom(0), 1)
+        self.assertEqual(level_for_zoom(10), 5)
+        self.assertEqual(level_for_zoom(22), 10)
+        self.assertEqual([level_for_zoom(zoom) for zoom in range(23)], sorted(level_for_zoom(zoom) for zoom in range(23)))
+        with self.assertRaises(DigiPinValidationError):
+            level_for_zoom(30)
+
+
+class TestCollectionAggregate(unittest.TestCase):
+    def test_store_caches_until_replaced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CollectionStore(tmp)
+            pins = encode_many([28.6, 28.6, 12.9], [77.2, 77.2, 77.5])
+            store.register("hubs", pins, weights=[1.0, 2.0, 4.0])
+            aggregate = store.aggregate("hubs")
+            self.assertIs(store.aggregate("hubs"), aggregate)
+            table = aggregate.table(10)
+            by_pin = dict(zip(PinArray(table.prefixes).to_strings().tolist(), table.weights.tolist()))
+            self.assertEqual(by_pin, {pins[0]: 3.0, pins[2]: 4.0})
+
+            restarted = CollectionStore(tmp)
+            self.assertEqual(restarted.aggregate("hubs").total_weight, 7.0)
+
+            store.register("hubs", pins)
+            self.assertEqual(store.aggregate("hubs").total_weight, 3.0)
+            with self.assertRaises(ValueError):
+                store.register("hubs", pins, weights=[1.0])
+            store.delete("hubs")
+            with self.assertRaises(KeyError):
+                store.aggregate("hubs")
+
+
+if __name__ == "__main__":
+    unittest.main()
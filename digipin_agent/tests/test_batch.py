@@ -0,0 +1,94 @@
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.batch import main, run_batch
+from digipin_agent.geo import REASON_BAD_LENGTH, DigiPinValidationError, decode_many, encode_many
+from digipin_agent.packed import INVALID_PACKED, encode_packed
+
+
+class TestBatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        rng = np.random.default_rng(19)
+        self.points = np.column_stack([rng.uniform(2.0, 39.0, 1000), rng.uniform(63.0, 100.0, 1000)])
+        self.points_path = self.dir / "points.npy"
+        np.save(self.points_path, self.points)
+
+    def test_encode_across_processes_keeps_order(self):
+        output = self.dir / "codes.npy"
+        result = run_batch("encode", self.points_path, output, workers=2, chunk_size=128)
+        expected = encode_packed(self.points[:, 0], self.points[:, 1])
+        np.testing.assert_array_equal(np.load(output), expected)
+        self.assertEqual(result.rows, 1000)
+        self.assertEqual(result.chunks, 8)
+        self.assertEqual(result.workers, 2)
+        self.assertEqual(result.invalid, int((expected == INVALID_PACKED).sum()))
+        self.assertGreater(result.rows_per_second, 0)
+
+    def test_encode_pins_then_decode_and_validate(self):
+        pins_path = self.dir / "pins.npy"
+        run_batch("encode", self.points_path, pins_path, workers=1, chunk_size=300, pins=True)
+        pins = np.load(pins_path)
+        self.assertEqual(pins.dtype, np.dtype("S12"))
+        np.testing.assert_array_equal(pins.astype(str), encode_many(self.points[:, 0], self.points[:, 1]))
+
+        centres_path = self.dir / "centres.npy"
+        result = run_batch("decode", pins_path, centres_path, workers=1, chunk_size=300)
+        decoded = decode_many(pins.astype(str))
+        np.testing.assert_array_equal(np.load(centres_path), np.column_stack([decoded.latitude, decoded.longitude]))
+        self.assertEqual(result.invalid, int((~decoded.valid).sum()))
+
+        reasons_path = self.dir / "reasons.npy"
+        run_batch("validate", pins_path, reasons_path, workers=1)
+        reasons = np.load(reasons_path)
+        self.assertTrue(((reasons == 0) == decoded.valid).all())
+        self.assertTrue((reasons[~decoded.valid] == REASON_BAD_LENGTH).all())
+
+    def test_coarse_level_encode_and_decode(self):
+        codes_path, pins_path, centres_path = self.dir / "codes.npy", self.dir / "pins.npy", self.dir / "centres.npy"
+        run_batch("encode", self.points_path, codes_path, workers=1, level=5)
+        codes = np.load(codes_path)
+        np.testing.assert_array_equal(codes, encode_packed(self.points[:, 0], self.points[:, 1], 5))
+        run_batch("encode", self.points_path, pins_path, workers=1, pins=True, level=5)
+        pins = np.load(pins_path)
+        self.assertEqual(pins.dtype, np.dtype("S6"))
+        result = run_batch("decode", codes_path, centres_path, workers=1, level=5)
+        decoded = decode_many(pins.astype(str), level=5)
+        np.testing.assert_array_equal(np.load(centres_path)[:, 0], decoded.latitude)
+        self.assertEqual(result.invalid, int((~decoded.valid).sum()))
+        with self.assertRaises(DigiPinValidationError):
+            run_batch("encode", self.points_path, codes_path, level=0)
+
+    def test_rejects_wrong_layout(self):
+        with self.assertRaises(DigiPinValidationError):
+            run_batch("validate", self.points_path, self.dir / "out.npy")
+        with self.assertRaises(DigiPinValidationError):
+            run_batch("reverse", self.points_path, self.dir / "out.npy")
+
+    def test_cli_reports_throughput(self):
+        output = self.dir / "codes.npy"
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = main(["encode", str(self.points_path), str(output), "--workers", "1"])
+        self.assertEqual(status, 0)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["rows"], 1000)
+        self.assertIn("rows_per_second", report)
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["decode", str(self.points_path), str(output)]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.bulk import iter_csv, iter_ndjson
+from digipin_agent.geo import DigiPinValidationError, encode_coordinates
+
+
+class TestBulkStreaming(unittest.TestCase):
+    def test_csv_encode_chunks(self):
+        lines = ["id,Latitude,Longitude\n"] + [f"{i},28.6,77.{i}\n" for i in range(5)] + ["x,oops,77\n"]
+        blocks = list(iter_csv(lines, "encode", chunk_size=2))
+        self.assertEqual(blocks[0], "id,Latitude,Longitude,digipin,error\n")
+        self.assertEqual(len(blocks), 1 + 3)
+        rows = "".join(blocks[1:]).splitlines()
+        self.assertEqual(rows[0], f"0,28.6,77.0,{encode_coordinates(28.6, 77.0)},")
+        self.assertEqual(rows[-1], "x,oops,77,,Latitude and longitude must be numbers")
+
+    def test_csv_decode_pads_short_rows(self):
+        rows = "".join(iter_csv(["id,pin\n", "1,39J-438-TJC7\n", "2\n"], "decode")).splitlines()
+        self.assertTrue(rows[1].startswith("1,39J-438-TJC7,28.6139"))
+        self.assertEqual(rows[2], "2,,,,DIGIPIN must have 10 characters")
+
+    def test_csv_missing_columns(self):
+        with self.assertRaises(DigiPinValidationError):
+            next(iter_csv(["id,name\n"], "decode"))
+
+    def test_ndjson_is_lazy(self):
+        consumed = []
+
+        def lines():
+            for i in range(10):
+                consumed.append(i)
+                yield json.dumps({"pin": "39J-438-TJC7"}) + "\n"
+
+        stream = iter_ndjson(lines(), "decode", chunk_size=3)
+        first = next(stream)
+        self.assertEqual(len(first.splitlines()), 3)
+        self.assertLessEqual(len(consumed), 4)
+
+    def test_ndjson_errors_per_line(self):
+        lines = ['{"latitude": 28.6, "longitude": 77.2}\n', "\n", "not json\n"]
+        records = [json.loads(line) for line in "".join(iter_ndjson(lines, "encode")).splitlines()]
+        self.assertEqual(records[0]["digipin"], encode_coordinates(28.6, 77.2))
+        self.assertEqual(records[1], {"line": 3, "error": "Line is not a JSON object"})
+
+
+if __name__ == "__main__":
+    unittest.main()
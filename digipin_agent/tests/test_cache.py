@@ -0,0 +1,97 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.cache import BoundedCache, GeoCache
+from digipin_agent.geo import (
+    DigiPinValidationError,
+    decode_digipin,
+    encode_coordinates,
+    get_distance_summary,
+    nearest_pin,
+)
+
+
+class TestBoundedCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BoundedCache(maxsize=2, policy="lru")
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: 0), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: 9), 9)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 4, 2))
+
+    def test_fifo_ignores_hits(self):
+        cache = BoundedCache(maxsize=2, policy="fifo")
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: 7), 7)
+
+    def test_errors_are_not_cached(self):
+        cache = BoundedCache(maxsize=2)
+
+        def boom():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_compute("a", boom)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            BoundedCache(policy="random")
+
+
+class TestGeoCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = GeoCache(decode_size=8, encode_size=8)
+
+    def test_decode_keyed_by_normalised_pin(self):
+        first = self.cache.decode_digipin("39J-438-TJC7")
+        second = self.cache.decode_digipin(" 39j438tjc7 ")
+        self.assertIs(first, second)
+        self.assertEqual(first, decode_digipin("39J-438-TJC7"))
+        self.assertEqual(self.cache.stats()["decode"]["hits"], 1)
+        with self.assertRaises(DigiPinValidationError):
+            self.cache.decode_digipin("bad")
+
+    def test_encode_matches_geo(self):
+        rng = np.random.default_rng(8)
+        cache = GeoCache(encode_size=0)
+        for lat, lon in zip(rng.uniform(2.5, 38.5, 20000), rng.uniform(63.5, 99.5, 20000)):
+            self.assertEqual(cache.encode_coordinates(lat, lon), encode_coordinates(lat, lon))
+        # Points just inside a cell edge and on the grid corners.
+        for lat, lon in ((28.62890625 - 1e-9, 77.2), (2.5, 63.5), (38.5, 99.5), (2.5 + 1e-12, 99.5)):
+            self.assertEqual(self.cache.encode_coordinates(lat, lon), encode_coordinates(lat, lon))
+        for lat, lon in ((2.49999999, 77.0), (38.50000001, 77.0), (20.0, 99.50000001), (float("nan"), 77.0)):
+            for cache in (self.cache, GeoCache(encode_precision=7)):
+                with self.assertRaises(DigiPinValidationError):
+                    cache.encode_coordinates(lat, lon)
+
+    def test_encode_quantised(self):
+        cache = GeoCache(encode_precision=7)
+        self.assertEqual(cache.encode_coordinates(28.6139, 77.209), encode_coordinates(28.6139, 77.209))
+        cache.encode_coordinates(28.61390000001, 77.20900000001)
+        self.assertEqual(cache.stats()["encode"]["hits"], 1)
+        self.cache.encode_coordinates(28.61390000001, 77.20900000001)
+        self.assertEqual(self.cache.stats()["encode"]["hits"], 0)
+
+    def test_helpers_match_geo(self):
+        pins = ["4FK-595-8823", "39J-438-TJC8", "39J-438-TJC7"]
+        self.assertEqual(
+            self.cache.get_distance_summary(pins[0], pins[1]), get_distance_summary(pins[0], pins[1])
+        )
+        self.assertEqual(self.cache.nearest_pin("39J-438-TJC9", pins), nearest_pin("39J-438-TJC9", pins))
+        self.cache.nearest_scan_limit = 1
+        self.assertEqual(self.cache.nearest_pin("39J-438-TJC9", pins), "39J-438-TJC8")
+
+
+if __name__ == "__main__":
+    unittest.main()
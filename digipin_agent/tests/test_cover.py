@@ -0,0 +1,160 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.cover import (
+    OUTSIDE,
+    CoverageCache,
+    CoverageRaster,
+    _points_in_polygon,
+    _polygon_classifier,
+    _polygon_edges,
+    cover_bbox,
+    cover_polygon,
+)
+from digipin_agent.geo import DigiPinValidationError, decode_many, encode_many
+from digipin_agent.packed import PinArray, _grid_bounds, _prefix_grid, pack_prefix
+
+INDIA = json.loads((Path(__file__).parents[2] / "public" / "india.geojson").read_text())
+
+
+def _expand(covering, level):
+    """Every level-``level`` packed prefix inside a mixed-level covering."""
+    expanded = []
+    for prefix in covering:
+        value, depth = pack_prefix(prefix)
+        span = 4 * (level - depth)
+        expanded.append(np.arange(value << span, (value + 1) << span, dtype=np.uint64))
+    return np.sort(np.concatenate(expanded))
+
+
+def _covered(covering, pins):
+    """Mask of ``pins`` that fall inside one of the covering's cells."""
+    codes = PinArray.from_pins(pins).codes
+    mask = np.zeros(codes.size, dtype=bool)
+    for prefix in covering:
+        value, depth = pack_prefix(prefix)
+        mask |= (codes >> np.uint64(4 * (10 - depth))) == np.uint64(value)
+    return mask
+
+
+class TestCoverBBox(unittest.TestCase):
+    def test_matches_brute_force_cells(self):
+        bbox = (20.1, 75.3, 22.7, 79.9)
+        covering = cover_bbox(bbox, 4)
+        self.assertLess(len(covering), len(_expand(covering, 4)))
+
+        # The all-"F" descendant of a level 4 cell sits in its north-west corner.
+        level4 = np.arange(1 << 16, dtype=np.uint64)
+        corners = decode_many(PinArray(level4 << np.uint64(24)).to_strings())
+        north, west, step = corners.max_lat, corners.min_lon, 36.0 / 4**4
+        meets = (north - step < bbox[2]) & (north > bbox[0]) & (west < bbox[3]) & (west + step > bbox[1])
+        np.testing.assert_array_equal(_expand(covering, 4), level4[meets])
+
+    def test_whole_grid_and_validation(self):
+        self.assertEqual(len(cover_bbox((2.5, 63.5, 38.5, 99.5), 6)), 16)
+        self.assertEqual(cover_bbox((28.0, 77.0, 29.0, 78.0), 3), ["39F", "39C", "39J", "393", "39K", "394"])
+        self.assertEqual(cover_bbox((50.0, 10.0, 51.0, 11.0), 5), [])
+        with self.assertRaises(DigiPinValidationError):
+            cover_bbox((29.0, 77.0, 28.0, 78.0), 3)
+        with self.assertRaises(DigiPinValidationError):
+            cover_bbox((28.0, 77.0, 29.0, 78.0), 0)
+        with self.assertRaises(DigiPinValidationError):
+            cover_bbox((3.0, 64.0, 38.0, 99.0), 10, max_cells=1000)
+
+
+class TestCoverPolygon(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        self.lats = rng.uniform(2.5, 38.5, 20000)
+        self.lons = rng.uniform(63.5, 99.5, 20000)
+        self.inside = _points_in_polygon(self.lons, self.lats, _polygon_edges(INDIA))
+        self.pins = encode_many(self.lats, self.lons)
+
+    def test_india_covering_contains_every_inside_point(self):
+        for level in (3, 5):
+            covering = cover_polygon(INDIA, level)
+            lengths = {len(prefix.replace("-", "")) for prefix in covering}
+            self.assertEqual(max(lengths), level)
+            self.assertGreater(len(lengths), 1)  # mixed-level
+            self.assertTrue(_covered(covering, self.pins)[self.inside].all())
+
+    def test_no_cell_lies_outside(self):
+        classify = _polygon_classifier(_polygon_edges(INDIA))
+        expanded = _expand(cover_polygon(INDIA, 5), 5)
+        state = classify(*_grid_bounds(*_prefix_grid(expanded, 5), 5))
+        self.assertTrue((state != OUTSIDE).all())
+
+    def test_finer_levels_hug_the_boundary(self):
+        coarse, fine = cover_polygon(INDIA, 3), cover_polygon(INDIA, 6)
+        self.assertLess(_covered(fine, self.pins).sum(), _covered(coarse, self.pins).sum())
+
+    def test_geojson_variants(self):
+        polygon = INDIA["features"][0]["geometry"]
+        expected = cover_polygon(INDIA, 4)
+        self.assertEqual(cover_polygon(polygon, 4), expected)
+        self.assertEqual(cover_polygon({"type": "MultiPolygon", "coordinates": [polygon["coordinates"]]}, 4), expected)
+
+        square = [[77.0, 28.0], [78.0, 28.0], [78.0, 29.0], [77.0, 29.0], [77.0, 28.0]]
+        hole = [[77.4, 28.4], [77.6, 28.4], [77.6, 28.6], [77.4, 28.6], [77.4, 28.4]]
+        donut = cover_polygon({"type": "Polygon", "coordinates": [square, hole]}, 6)
+        centre = encode_many(np.array([28.5]), np.array([77.5]))
+        self.assertFalse(_covered(donut, centre).any())
+        self.assertTrue(_covered(donut, encode_many(np.array([28.2]), np.array([77.2]))).all())
+
+        for bad in ({"type": "Point", "coordinates": [77, 28]}, {"type": "Polygon", "coordinates": [[[1, 2]]]}, []):
+            with self.assertRaises(DigiPinValidationError):
+                cover_polygon(bad, 3)
+
+
+class TestCoverageCache(unittest.TestCase):
+    def test_repeated_lookups_hit(self):
+        cache = CoverageCache(maxsize=4)
+        first = cache.cover_polygon(INDIA, 4)
+        reordered = json.loads(json.dumps(INDIA, sort_keys=True))
+        self.assertEqual(cache.cover_polygon(reordered, 4), first)
+        first.append("mutated")
+        self.assertNotIn("mutated", cache.cover_polygon(INDIA, 4))
+        self.assertEqual(cache.cover_bbox([28.0, 77.0, 29.0, 78.0], 3), cache.cover_bbox((28, 77, 29, 78), 3))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 2))
+
+
+class TestCoverageRaster(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.raster = CoverageRaster.from_file(Path(__file__).parents[2] / "public" / "india.geojson", level=4)
+
+    def test_matches_exact_point_in_polygon(self):
+        rng = np.random.default_rng(22)
+        lats = rng.uniform(2.0, 39.0, 50000)
+        lons = rng.uniform(63.0, 100.0, 50000)
+        expected = _points_in_polygon(lons, lats, _polygon_edges(INDIA))
+        expected &= (lats >= 2.5) & (lats <= 38.5) & (lons >= 63.5) & (lons <= 99.5)
+        np.testing.assert_array_equal(self.raster.contains(lats, lons), expected)
+        self.assertEqual(self.raster.contains(lats.reshape(100, 500), lons.reshape(100, 500)).shape, (100, 500))
+
+    def test_known_places(self):
+        # The bundled outline is a coarse diagonal band from the south-west to the north-east.
+        self.assertTrue(self.raster.contains_point(16.0, 80.0))
+        self.assertTrue(self.raster.contains_point(7.5, 68.5))
+        self.assertFalse(self.raster.contains_point(28.6139, 77.209))
+        self.assertFalse(self.raster.contains_point(15.0, 65.0))
+        self.assertFalse(self.raster.contains_point(float("nan"), 77.0))
+        self.assertFalse(self.raster.contains_point(45.0, 77.0))
+
+    def test_raster_shape_and_limits(self):
+        stats = self.raster.stats()
+        self.assertEqual(stats["inside_cells"] + stats["boundary_cells"] + stats["outside_cells"], 4**8)
+        self.assertGreater(stats["inside_cells"], stats["boundary_cells"])
+        with self.assertRaises(DigiPinValidationError):
+            CoverageRaster(INDIA, level=7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.geo import (
+    INVALID_PIN,
+    REASON_BAD_CHARACTER,
+    REASON_BAD_LENGTH,
+    REASON_NOT_A_STRING,
+    REASON_VALID,
+    DigiPinValidationError,
+    decode_digipin,
+    decode_many,
+    decode_prefix,
+    distance_matrix,
+    encode_coordinates,
+    encode_many,
+    get_distance_meters,
+    is_valid_digipin,
+    nearest_pin,
+    pairwise_distances,
+    validate_many,
+    validation_messages,
+)
+
+
+class TestBulkGeo(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.lats = np.concatenate([rng.uniform(2.5, 38.5, 2000), [2.5, 38.5, 20.0, 1.0, np.nan]])
+        self.lons = np.concatenate([rng.uniform(63.5, 99.5, 2000), [63.5, 99.5, 100.0, 70.0, 70.0]])
+
+    def test_encode_many_matches_scalar(self):
+        pins = encode_many(self.lats, self.lons)
+        for lat, lon, pin in zip(self.lats, self.lons, pins):
+            try:
+                expected = encode_coordinates(lat, lon)
+            except DigiPinValidationError:
+                expected = INVALID_PIN
+            self.assertEqual(pin, expected)
+
+    def test_encode_many_marks_out_of_range(self):
+        pins = encode_many(self.lats[-3:], self.lons[-3:])
+        self.assertEqual(list(pins), [INVALID_PIN] * 3)
+
+    def test_decode_many_matches_scalar(self):
+        pins = encode_many(self.lats[:2002], self.lons[:2002])
+        decoded = decode_many(pins)
+        self.assertTrue(decoded.valid.all())
+        for index, pin in enumerate(pins):
+            expected = decode_digipin(pin)
+            self.assertEqual(decoded.latitude[index], expected.latitude)
+            self.assertEqual(decoded.longitude[index], expected.longitude)
+            self.assertEqual(
+                ((decoded.min_lat[index], decoded.min_lon[index]), (decoded.max_lat[index], decoded.max_lon[index])),
+                expected.bounds,
+            )
+
+    def test_decode_many_flags_invalid(self):
+        decoded = decode_many([" 39j-438-tjc7 ", "39J-438-TJC", "39J-438-TJCA", None, "39J438TJC7"])
+        self.assertEqual(decoded.valid.tolist(), [True, False, False, False, True])
+        self.assertTrue(np.isnan(decoded.latitude[1:4]).all())
+        self.assertEqual(decoded.latitude[0], decoded.latitude[4])
+
+
+    def test_decode_many_empty(self):
+        self.assertEqual(len(decode_many([])), 0)
+
+    def test_coarse_levels_are_prefixes_of_full_pins(self):
+        full = encode_many(self.lats, self.lons)
+        for level in (1, 3, 4, 6, 9):
+            pins = encode_many(self.lats, self.lons, level)
+            self.assertEqual(pins.dtype, np.dtype(f"U{level + (level - 1) // 3}"))
+            for lat, lon, pin, whole in zip(self.lats[:50], self.lons[:50], pins, full):
+                self.assertEqual(pin, encode_coordinates(lat, lon, level))
+                self.assertEqual(pin, whole[: len(pin)])
+                self.assertFalse(pin.endswith("-"))
+            decoded = decode_many(pins, level)
+            np.testing.assert_array_equal(decoded.valid, full != INVALID_PIN)
+            cell = decode_prefix(str(pins[0]))
+            self.assertEqual((decoded.latitude[0], decoded.longitude[0]), (cell.latitude, cell.longitude))
+            self.assertEqual(
+                ((decoded.min_lat[0], decoded.min_lon[0]), (decoded.max_lat[0], decoded.max_lon[0])), cell.bounds
+            )
+            self.assertTrue(cell.bounds[0][0] <= self.lats[0] <= cell.bounds[1][0])
+        with self.assertRaises(DigiPinValidationError):
+            encode_coordinates(28.6, 77.2, 11)
+
+    def test_decode_prefix(self):
+        self.assertEqual(decode_prefix("39J-438-TJC7"), decode_digipin("39J-438-TJC7"))
+        self.assertEqual(decode_prefix("f").bounds, ((29.5, 63.5), (38.5, 72.5)))
+        for prefix in ("", "39J-438-TJC7F", "3X"):
+            with self.assertRaises(DigiPinValidationError):
+                decode_prefix(prefix)
+
+
+class TestValidation(unittest.TestCase):
+    PINS = ["39J-438-TJC7", " 39j438tjc7\n", "39J 438TJC", "39J-438-TJCA", "39J-438", None, 42, "\xa039J-438-TJC7"]
+
+    def test_validate_many_matches_scalar(self):
+        valid, reasons = validate_many(np.array(self.PINS, dtype=object))
+        self.assertEqual(valid.tolist(), [is_valid_digipin(pin) for pin in self.PINS])
+        self.assertEqual(
+            reasons.tolist(),
+            [
+                REASON_VALID,
+                REASON_VALID,
+                REASON_BAD_CHARACTER,
+                REASON_BAD_CHARACTER,
+                REASON_BAD_LENGTH,
+                REASON_NOT_A_STRING,
+                REASON_NOT_A_STRING,
+                REASON_VALID,
+            ],
+        )
+
+    def test_prefix_level_validation(self):
+        valid, reasons = validate_many(["39J-4", "39j4", "39J-43", "39X-4"], level=4)
+        self.assertEqual(valid.tolist(), [True, True, False, False])
+        self.assertEqual(reasons.tolist(), [REASON_VALID, REASON_VALID, REASON_BAD_LENGTH, REASON_BAD_CHARACTER])
+        self.assertEqual(
+            validation_messages(["39J-43", "39X-4"], reasons[2:], level=4),
+            ["DIGIPIN must have 4 characters", "Invalid DIGIPIN character: X"],
+        )
+
+    def test_messages_match_exceptions(self):
+        _, reasons = validate_many(np.array(self.PINS, dtype=object))
+        for pin, message in zip(self.PINS, validation_messages(self.PINS, reasons)):
+            if message is None:
+                self.assertTrue(is_valid_digipin(pin))
+                continue
+            with self.assertRaises(DigiPinValidationError) as ctx:
+                decode_digipin(pin)
+            self.assertEqual(str(ctx.exception), message)
+
+
+class TestDistanceMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.pins = encode_many(rng.uniform(8.0, 35.0, 60), rng.uniform(68.0, 97.0, 60))
+
+    def test_matches_scalar_distance(self):
+        matrix = distance_matrix(self.pins[:7], self.pins[7:], chunk_size=16)
+        self.assertEqual(matrix.shape, (7, 53))
+        for row in range(7):
+            for col in range(53):
+                self.assertAlmostEqual(matrix[row, col], get_distance_meters(self.pins[row], self.pins[7 + col]), places=6)
+
+    def test_pairwise_is_symmetric(self):
+        pairwise = pairwise_distances(self.pins, chunk_size=100)
+        np.testing.assert_allclose(pairwise, distance_matrix(self.pins, self.pins), rtol=1e-12)
+        np.testing.assert_array_equal(pairwise, pairwise.T)
+        self.assertTrue((np.diag(pairwise) == 0.0).all())
+
+    def test_float32_and_invalid(self):
+        matrix = distance_matrix(["39J-438-TJC7", "bad"], self.pins[:3], dtype=np.float32)
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertTrue(np.isnan(matrix[1]).all())
+
+    def test_nearest_pin(self):
+        candidates = ["4FK-595-8823", "39J-438-TJC8", "39j438tjc8"]
+        self.assertEqual(nearest_pin("39J-438-TJC9", candidates), "39J-438-TJC8")
+        with self.assertRaises(DigiPinValidationError):
+            nearest_pin("39J-438-TJC9", ["39J-438-TJC8", "bad"])
+
+
+if __name__ == "__main__":
+    unittest.main()
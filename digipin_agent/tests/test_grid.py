@@ -0,0 +1,118 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.geo import DigiPinValidationError, decode_digipin, encode_coordinates
+from digipin_agent.grid import (
+    children,
+    children_packed,
+    k_ring,
+    k_ring_packed,
+    neighbours,
+    neighbours_packed,
+    parent,
+    parent_packed,
+)
+from digipin_agent.packed import INVALID_PACKED, encode_packed, format_prefixes, pack_pin, pack_prefix, unpack_many
+
+
+def _shifted_pin(pin, d_row, d_col):
+    """Neighbour by decoding, offsetting the centre by whole cells and re-encoding."""
+    decoded = decode_digipin(pin)
+    (min_lat, min_lon), (max_lat, max_lon) = decoded.bounds
+    lat_step, lon_step = max_lat - min_lat, max_lon - min_lon
+    return encode_coordinates(decoded.latitude - d_row * lat_step, decoded.longitude + d_col * lon_step)
+
+
+class TestNeighbours(unittest.TestCase):
+    def test_neighbours_match_decode_offset_encode(self):
+        steps = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+        # Delhi, plus a pin whose neighbours cross every level of parent edges.
+        for pin in (encode_coordinates(28.6139, 77.2090), "39J-MMM-MMMM", "F8M-MMM-MMMM"):
+            expected = [_shifted_pin(pin, d_row, d_col) for d_row, d_col in steps]
+            self.assertEqual(neighbours(pin), expected)
+
+    def test_grid_edges_have_fewer_neighbours(self):
+        north_west = encode_coordinates(38.5, 63.5)
+        self.assertEqual(len(neighbours(north_west)), 3)
+        self.assertEqual(len(neighbours("F")), 3)
+        self.assertEqual(len(neighbours("2")), 8)
+
+    def test_k_ring(self):
+        pin = encode_coordinates(12.9716, 77.5946)
+        ring = k_ring(pin, 2)
+        self.assertEqual(len(ring), 25)
+        self.assertEqual(ring[12], pin)
+        self.assertEqual(set(k_ring(pin, 1)) - {pin}, set(neighbours(pin)))
+        self.assertEqual(k_ring(pin, 0), [pin])
+        with self.assertRaises(DigiPinValidationError):
+            k_ring(pin, -1)
+
+    def test_parent_and_children(self):
+        pin = "39J-438-TJC7"
+        self.assertEqual(parent(pin), "39J-438-TJC")
+        self.assertEqual(parent(pin, 4), "39J-4")
+        self.assertEqual(parent("39J-4"), "39J")
+        kids = children("39J-438-TJC")
+        self.assertEqual(len(kids), 16)
+        self.assertIn(pin, kids)
+        self.assertTrue(all(parent(kid) == "39J-438-TJC" for kid in kids))
+        with self.assertRaises(DigiPinValidationError):
+            children(pin)
+        with self.assertRaises(DigiPinValidationError):
+            parent("3")
+
+
+    def test_package_exports_do_not_shadow_the_module(self):
+        import digipin_agent
+        import digipin_agent.grid as grid
+
+        self.assertTrue(callable(grid.k_ring))
+        self.assertIs(digipin_agent.grid, grid)
+        self.assertIs(digipin_agent.neighbours, neighbours)
+
+
+class TestPackedNeighbours(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(23)
+        self.codes = encode_packed(rng.uniform(2.5, 38.5, 500), rng.uniform(63.5, 99.5, 500))
+
+    def test_matches_string_helpers(self):
+        cells = neighbours_packed(self.codes)
+        self.assertEqual(cells.shape, (500, 8))
+        for code, row in zip(self.codes[:50], cells[:50]):
+            pin = unpack_many(code).item()
+            self.assertEqual(unpack_many(row[row != INVALID_PACKED]).tolist(), neighbours(pin))
+
+    def test_k_ring_at_coarse_levels(self):
+        for level in (1, 4, 7):
+            prefixes = self.codes[:20] >> np.uint64(4 * (10 - level))
+            rings = k_ring_packed(prefixes, 2, level)
+            np.testing.assert_array_equal(rings[:, 12], prefixes)
+            for label, ring in zip(format_prefixes(prefixes, level).tolist(), rings):
+                self.assertEqual(format_prefixes(ring[ring != INVALID_PACKED], level).tolist(), k_ring(label, 2))
+
+    def test_invalid_inputs_propagate(self):
+        codes = np.array([INVALID_PACKED, pack_pin("39J-438-TJC7")], dtype=np.uint64)
+        self.assertTrue((neighbours_packed(codes)[0] == INVALID_PACKED).all())
+        self.assertTrue((k_ring_packed(codes, 1)[0] == INVALID_PACKED).all())
+        self.assertEqual(parent_packed(codes)[0], INVALID_PACKED)
+        self.assertEqual(parent_packed(codes, parent_level=3)[1], pack_prefix("39J")[0])
+        self.assertTrue((children_packed(np.array([INVALID_PACKED]))[0] == INVALID_PACKED).all())
+
+    def test_children_round_trip(self):
+        prefixes = self.codes >> np.uint64(4)
+        kids = children_packed(prefixes)
+        self.assertEqual(kids.shape, (500, 16))
+        self.assertTrue((kids == self.codes[:, None]).any(axis=1).all())
+        np.testing.assert_array_equal(parent_packed(kids).min(axis=1), prefixes)
+        with self.assertRaises(DigiPinValidationError):
+            children_packed(self.codes, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
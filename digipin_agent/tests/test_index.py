@@ -0,0 +1,60 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.geo import DigiPinValidationError, _haversine_array, decode_many, encode_many, nearest_pin
+from digipin_agent.index import DigipinIndex
+from digipin_agent.packed import PinArray
+
+
+class TestDigipinIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        cls.pins = encode_many(rng.uniform(8.0, 35.0, 5000), rng.uniform(68.0, 97.0, 5000))
+        cls.decoded = decode_many(cls.pins)
+        cls.index = DigipinIndex(cls.pins, leaf_size=8)
+        cls.queries = encode_many(rng.uniform(8.0, 35.0, 25), rng.uniform(68.0, 97.0, 25))
+
+    def _brute_force(self, query):
+        ref = decode_many([query])
+        distances = _haversine_array(ref.latitude[0], ref.longitude[0], self.decoded.latitude, self.decoded.longitude)
+        return distances, np.lexsort((np.arange(distances.size), distances))
+
+    def test_k_nearest_matches_brute_force(self):
+        for query in self.queries:
+            distances, order = self._brute_force(query)
+            result = self.index.k_nearest(query, 5)
+            self.assertEqual([pin for pin, _ in result], [self.pins[i] for i in order[:5]])
+            self.assertAlmostEqual(result[0][1], distances[order[0]])
+
+    def test_within_radius_matches_brute_force(self):
+        for query in self.queries[:10]:
+            distances, _ = self._brute_force(query)
+            result = self.index.within_radius(query, 40000.0)
+            self.assertEqual(len(result), int((distances <= 40000.0).sum()))
+            self.assertTrue(all(meters <= 40000.0 for _, meters in result))
+            self.assertEqual([meters for _, meters in result], sorted(meters for _, meters in result))
+
+    def test_nearest_matches_nearest_pin(self):
+        candidates = ["39J-438-TJC8", "4FK-595-8823", "39J-438-TJC7", "39J-438-TJC7"]
+        index = DigipinIndex(candidates)
+        for query in ["39J-438-TJC9", "4FK-595-8822", (28.6, 77.2)]:
+            reference = query if isinstance(query, str) else encode_many(*query).item()
+            self.assertEqual(index.nearest(query), nearest_pin(reference, candidates))
+
+    def test_from_pin_array_and_errors(self):
+        index = DigipinIndex.from_pin_array(PinArray.from_pins(self.pins[:100]))
+        self.assertEqual(len(index), 100)
+        with self.assertRaises(DigiPinValidationError):
+            DigipinIndex(["39J-438-TJC7", "bad"])
+        with self.assertRaises(DigiPinValidationError):
+            DigipinIndex([]).nearest("39J-438-TJC7")
+
+
+if __name__ == "__main__":
+    unittest.main()
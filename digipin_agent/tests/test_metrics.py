@@ -0,0 +1,64 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.metrics import Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        requests = self.registry.counter("requests_total", "Requests", ("route",))
+        requests.inc(route="/a")
+        requests.inc(2, route="/a")
+        in_flight = self.registry.gauge("in_flight", "In flight")
+        with in_flight.track_inprogress():
+            self.assertEqual(in_flight.value(), 1)
+        self.assertEqual(in_flight.value(), 0)
+        self.assertEqual(requests.value(route="/a"), 3)
+        with self.assertRaises(ValueError):
+            requests.inc(-1, route="/a")
+        with self.assertRaises(ValueError):
+            requests.inc(method="GET")
+
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{route="/a"} 3', text)
+        self.assertIn("in_flight 0", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = self.registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latency.observe(value, route="/a")
+
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum{route="/a"} 6.05', text)
+        self.assertIn('latency_seconds_count{route="/a"} 4', text)
+        self.assertEqual(latency.count(route="/a"), 4)
+
+    def test_registry_reuses_and_rejects_conflicts(self):
+        first = self.registry.counter("hits_total", "Hits")
+        self.assertIs(self.registry.counter("hits_total", "Hits"), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("hits_total", "Hits")
+
+    def test_collectors_and_escaping(self):
+        self.registry.register_collector(
+            "cache",
+            lambda: [("cache_hits_total", "counter", "Cache hits", [("cache_hits_total", {"cache": 'a"b'}, 7)])],
+        )
+        text = self.registry.render()
+        self.assertIn('cache_hits_total{cache="a\\"b"} 7', text)
+        self.registry.unregister_collector("cache")
+        self.assertNotIn("cache_hits_total", self.registry.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
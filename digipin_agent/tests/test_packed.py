@@ -0,0 +1,80 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.geo import DigiPinValidationError, decode_many, encode_many
+from digipin_agent.packed import (
+    INVALID_PACKED,
+    PinArray,
+    decode_packed,
+    pack_many,
+    pack_pin,
+    pack_prefix,
+    unpack_many,
+    unpack_pin,
+)
+
+
+class TestPackedPins(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.lats = rng.uniform(2.5, 38.5, 1000)
+        self.lons = rng.uniform(63.5, 99.5, 1000)
+        self.pins = encode_many(self.lats, self.lons)
+
+    def test_round_trip(self):
+        self.assertEqual(unpack_pin(pack_pin("39j438tjc7")), "39J-438-TJC7")
+        self.assertTrue((unpack_many(pack_many(self.pins)) == self.pins).all())
+        with self.assertRaises(DigiPinValidationError):
+            unpack_pin(1 << 40)
+
+    def test_invalid_marker(self):
+        codes = pack_many(["39J-438-TJC7", "nope"])
+        self.assertEqual(codes[1], INVALID_PACKED)
+        self.assertEqual(unpack_many(codes)[1], "")
+
+    def test_decode_packed_matches_strings(self):
+        expected = decode_many(self.pins)
+        decoded = decode_packed(pack_many(self.pins))
+        np.testing.assert_array_equal(decoded.latitude, expected.latitude)
+        np.testing.assert_array_equal(decoded.longitude, expected.longitude)
+
+    def test_pin_array_from_coordinates(self):
+        array = PinArray.from_coordinates(self.lats, self.lons)
+        self.assertEqual(len(array), 1000)
+        self.assertEqual(array.nbytes, 8000)
+        self.assertEqual(array.to_strings().tolist(), self.pins.tolist())
+        with self.assertRaises(DigiPinValidationError):
+            PinArray.from_coordinates([1.0], [70.0])
+        self.assertEqual(len(PinArray.from_pins(["39J-438-TJC7", "bad"], drop_invalid=True)), 1)
+
+    def test_sort_unique_and_prefix(self):
+        array = PinArray.from_pins(list(self.pins) + list(self.pins[:10]))
+        unique, counts = array.unique(return_counts=True)
+        self.assertEqual(len(unique), 1000)
+        self.assertEqual(int(counts.sum()), 1010)
+        ordered = array.sort()
+        self.assertTrue((np.diff(ordered.codes.astype(np.int64)) >= 0).all())
+
+        prefix = self.pins[0][:5]
+        mask = array.startswith(prefix)
+        expected = [pin.startswith(prefix) for pin in array]
+        self.assertEqual(mask.tolist(), expected)
+        value, level = pack_prefix(prefix)
+        self.assertEqual(level, 4)
+        self.assertEqual(value, pack_pin(self.pins[0]) >> 24)
+        self.assertIn(self.pins[0], array)
+        self.assertNotIn("not-a-pin", array)
+
+    def test_hashes_are_stable(self):
+        array = PinArray.from_pins(self.pins[:5])
+        np.testing.assert_array_equal(array.hashes(), PinArray(array.codes.copy()).hashes())
+        self.assertEqual(len(set(array.hashes().tolist())), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import fnmatch
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.response_cache import (
+    MemoryResponseBackend,
+    RedisResponseBackend,
+    ResponseCache,
+    prompt_key,
+)
+
+
+class FakeRedis:
+    """Just enough of the redis client API, with a controllable clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.data = {}
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[0] <= self.now:
+            return None
+        return entry[1].encode("utf-8")
+
+    def set(self, key, value, px):
+        self.data[key] = (self.now + px / 1000.0, value)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestPromptKey(unittest.TestCase):
+    def test_normalisation(self):
+        self.assertEqual(prompt_key("Decode  39J-438-TJC7 "), prompt_key("decode 39J-438-TJC7"))
+        self.assertEqual(prompt_key("hi", {"a": 1, "b": 2}), prompt_key("hi", {"b": 2, "a": 1}))
+        self.assertNotEqual(prompt_key("hi"), prompt_key("hi", {"a": 1}))
+
+
+class TestMemoryResponseBackend(unittest.TestCase):
+    def test_ttl_and_lru(self):
+        now = [0.0]
+        backend = MemoryResponseBackend(maxsize=2, clock=lambda: now[0])
+        backend.set("a", "1", ttl=10)
+        backend.set("b", "2", ttl=10)
+        backend.get("a")
+        backend.set("c", "3", ttl=10)
+        self.assertEqual((backend.get("a"), backend.get("b"), backend.get("c")), ("1", None, "3"))
+        now[0] = 10.0
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(len(backend), 1)
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    async def test_hits_after_first_call(self):
+        cache = ResponseCache(ttl=60)
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return "answer"
+
+        self.assertEqual(await cache.get_or_call("k", call), "answer")
+        self.assertEqual(await cache.get_or_call("k", call), "answer")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    async def test_concurrent_requests_share_one_call(self):
+        cache = ResponseCache(ttl=60)
+        calls = []
+        release = asyncio.Event()
+
+        async def call():
+            calls.append(1)
+            await release.wait()
+            return "answer"
+
+        waiters = [asyncio.ensure_future(cache.get_or_call("k", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await asyncio.gather(*waiters), ["answer"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+        self.assertEqual(cache.stats()["in_flight"], 0)
+
+    async def test_failures_and_empty_results_are_not_cached(self):
+        cache = ResponseCache(ttl=60)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def empty():
+            return None
+
+        with self.assertRaises(RuntimeError):
+            await cache.get_or_call("k", fail)
+        self.assertIsNone(await cache.get_or_call("k", empty))
+        self.assertEqual(await cache.get_or_call("k", lambda: asyncio.sleep(0, "ok")), "ok")
+        self.assertEqual(cache.misses, 3)
+
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        cache = ResponseCache(ttl=60)
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return "answer"
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_call("k", call), timeout=0.001)
+        self.assertEqual(await cache.get_or_call("k", call), "answer")
+        self.assertEqual(cache.coalesced, 1)
+
+    async def test_shared_backend(self):
+        client = FakeRedis()
+        first = ResponseCache(RedisResponseBackend(client), ttl=5)
+        second = ResponseCache(RedisResponseBackend(client), ttl=5)
+
+        self.assertEqual(await first.get_or_call("k", lambda: asyncio.sleep(0, "answer")), "answer")
+        self.assertEqual(await second.get_or_call("k", lambda: asyncio.sleep(0, "other")), "answer")
+        client.now = 5.0
+        self.assertEqual(await second.get_or_call("k", lambda: asyncio.sleep(0, "other")), "other")
+        first.clear()
+        self.assertEqual(client.data, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.cache import GeoCache
+from digipin_agent.geo import decode_digipin, encode_coordinates, get_distance_summary
+from digipin_agent.router import FastPathRouter
+
+
+class TestFastPathRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = FastPathRouter()
+
+    def test_decode(self):
+        result = self.router.route("Decode 39J-438-TJC7")
+        decoded = decode_digipin("39J-438-TJC7")
+        self.assertEqual(result["message"], "Decode 39J-438-TJC7")
+        self.assertIn(f"{decoded.latitude:.6f}", result["response"])
+        self.assertIn(f"{decoded.longitude:.6f}", result["response"])
+
+    def test_encode(self):
+        result = self.router.route("encode 28.61, 77.20")
+        self.assertIn(encode_coordinates(28.61, 77.20), result["response"])
+        result = self.router.route("what is the digipin for (28.61 77.20)?")
+        self.assertIn(encode_coordinates(28.61, 77.20), result["response"])
+
+    def test_validate(self):
+        self.assertIn("is a valid", self.router.route("is 39J438TJC7 valid?")["response"])
+        self.assertIsNone(self.router.route("validate 39J-438-TJCA"))
+
+    def test_distance(self):
+        result = self.router.route("distance between 39J-438-TJC7 and 4FK-595-8823")
+        summary = get_distance_summary("39J-438-TJC7", "4FK-595-8823")
+        self.assertIn(summary["formatted"], result["response"])
+
+    def test_errors_are_answered_not_raised(self):
+        self.assertIn("out of range", self.router.route("encode 60, 77")["response"])
+
+    def test_place_names_are_not_taken_for_pins(self):
+        for prompt in (
+            "Where is Chandigarh?",
+            "locate Puducherry",
+            "where is Vijayawada",
+            "check Trivandrum",
+            "Is Darjeeling valid?",
+            "distance between Chandigarh and Puducherry",
+            "decode 39J-438-TJCA",
+        ):
+            self.assertIsNone(self.router.route(prompt), prompt)
+        stats = self.router.stats()
+        self.assertEqual((stats["total"], stats["fast_path"]), (7, 0))
+
+    def test_open_ended_prompts_fall_through(self):
+        for prompt in (
+            "Where is 88-88-88?",
+            "decode 39J-438-TJC7 and tell me about the area",
+            "Explain how DIGIPIN works",
+        ):
+            self.assertIsNone(self.router.route(prompt), prompt)
+
+    def test_stats(self):
+        self.router.route("decode 39J-438-TJC7")
+        self.router.route("encode 28.61, 77.20")
+        self.router.route("tell me a story")
+        stats = self.router.stats()
+        self.assertEqual((stats["total"], stats["fast_path"], stats["fallback"]), (3, 2, 1))
+        self.assertAlmostEqual(stats["fast_path_rate"], 2 / 3)
+        self.assertEqual(stats["intents"]["decode"], 1)
+
+    def test_uses_supplied_geo_cache(self):
+        cache = GeoCache()
+        router = FastPathRouter(cache)
+        router.route("decode 39J-438-TJC7")
+        router.route("decode 39J-438-TJC7")
+        self.assertEqual(cache.stats()["decode"]["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent.geo import DigiPinValidationError, encode_many
+from digipin_agent.index import DigipinIndex
+from digipin_agent.store import CollectionStore
+
+
+class TestCollectionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        rng = np.random.default_rng(11)
+        self.pins = encode_many(rng.uniform(8.0, 35.0, 500), rng.uniform(68.0, 97.0, 500))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index_round_trip_is_memory_mapped(self):
+        index = DigipinIndex(self.pins)
+        index.save(self.root / "hubs")
+        loaded = DigipinIndex.load(self.root / "hubs")
+        self.assertIsInstance(loaded._codes, np.memmap)
+        for query in self.pins[:10]:
+            self.assertEqual(loaded.k_nearest(query, 3), index.k_nearest(query, 3))
+
+    def test_register_survives_restart(self):
+        store = CollectionStore(self.root)
+        store.register("hubs", self.pins)
+        store.register("hubs", self.pins[:10])
+        restarted = CollectionStore(self.root)
+        self.assertEqual(restarted.sizes(), {"hubs": 10})
+        self.assertEqual(restarted.get("hubs").nearest(self.pins[0]), self.pins[0])
+        # The link and the version it points to; the replaced version is gone.
+        self.assertEqual(len(list(self.root.iterdir())), 2)
+        self.assertTrue((self.root / "hubs").is_symlink())
+
+    def test_changes_from_another_store_are_picked_up(self):
+        writer, reader = CollectionStore(self.root), CollectionStore(self.root)
+        writer.register("hubs", self.pins, weights=np.full(len(self.pins), 2.0))
+        self.assertEqual(reader.sizes(), {"hubs": 500})
+        self.assertEqual(reader.aggregate("hubs").table(1).weights.sum(), 1000.0)
+        writer.register("hubs", self.pins[:10])
+        self.assertEqual(len(reader.get("hubs")), 10)
+        # Replacing without weights must not leave the old weights behind.
+        self.assertEqual(reader.aggregate("hubs").table(1).weights.sum(), 10.0)
+        self.assertFalse((self.root / "hubs" / "weights.npy").exists())
+        writer.delete("hubs")
+        # A single miss could be a swap in progress, so only the second lookup evicts.
+        self.assertEqual(len(reader.get("hubs")), 10)
+        with self.assertRaises(KeyError):
+            reader.get("hubs")
+        self.assertEqual(reader.names(), [])
+        with self.assertRaises(KeyError):
+            reader.delete("hubs")
+
+    def test_readers_keep_serving_during_a_swap(self):
+        writer, reader = CollectionStore(self.root), CollectionStore(self.root)
+        writer.register("hubs", self.pins)
+        # Turn it into a plain directory, as saved before indexes were versioned.
+        version = (self.root / "hubs").resolve()
+        (self.root / "hubs").unlink()
+        version.rename(self.root / "hubs")
+        self.assertEqual(len(reader.get("hubs")), 500)
+        seen = []
+        real_replace = os.replace
+
+        def replace(source, target):
+            real_replace(source, target)
+            seen.append(len(reader.get("hubs")))
+
+        with mock.patch("digipin_agent.index.os.replace", replace):
+            writer.register("hubs", self.pins[:10])
+            writer.register("hubs", self.pins[:20])
+        # The plain directory is moved aside before the link replaces it; later swaps are a single rename.
+        self.assertEqual(seen, [500, 10, 20])
+        self.assertEqual(len(list(self.root.iterdir())), 2)
+
+    def test_delete_and_validation(self):
+        store = CollectionStore(self.root)
+        store.register("depots", self.pins[:5])
+        store.delete("depots")
+        self.assertEqual(store.names(), [])
+        self.assertEqual(list(self.root.iterdir()), [])
+        with self.assertRaises(KeyError):
+            store.get("depots")
+        with self.assertRaises(ValueError):
+            store.register("../escape", self.pins[:5])
+        with self.assertRaises(DigiPinValidationError):
+            store.register("broken", ["not-a-pin"])
+        self.assertEqual(store.names(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from digipin_agent import wire
+from digipin_agent.geo import DigiPinValidationError
+from digipin_agent.packed import encode_packed
+
+
+@unittest.skipUnless(wire.AVAILABLE, "msgpack is not installed")
+class TestWireFormat(unittest.TestCase):
+    def test_columns_round_trip(self):
+        lats = np.linspace(8.0, 35.0, 101)
+        payload = {
+            "pins": encode_packed(lats, np.full(101, 77.0)),
+            "latitudes": lats.astype(np.float32),
+            "matrix": np.arange(12, dtype=np.float64).reshape(3, 4),
+            "valid": lats > 20.0,
+            "invalid_count": np.int64(3),
+            "dtype": "float32",
+        }
+        decoded = wire.unpackb(wire.packb(payload))
+        for name in ("pins", "latitudes", "matrix", "valid"):
+            self.assertEqual(decoded[name].dtype, payload[name].dtype)
+            np.testing.assert_array_equal(decoded[name], payload[name])
+        self.assertEqual(decoded["invalid_count"], 3)
+        self.assertEqual(decoded["dtype"], "float32")
+
+    def test_big_endian_columns_are_sent_little_endian(self):
+        values = np.arange(5, dtype=">f8")
+        decoded = wire.unpackb(wire.packb({"values": values}))["values"]
+        self.assertEqual(decoded.dtype.str, "<f8")
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_rejects_malformed_payloads(self):
+        import msgpack
+
+        with self.assertRaises(DigiPinValidationError):
+            wire.unpackb(b"\xc1")
+        with self.assertRaises(DigiPinValidationError):
+            wire.unpackb(wire.packb([1, 2]))
+        with self.assertRaises(DigiPinValidationError):
+            wire.unpackb(msgpack.packb({"x": {"dtype": "|O", "shape": [1], "data": b"\0" * 8}}))
+        with self.assertRaises(DigiPinValidationError):
+            wire.unpackb(msgpack.packb({"x": {"dtype": "<f8", "shape": [2], "data": b"\0" * 8}}))
+        with self.assertRaises(TypeError):
+            wire.packb({"x": np.array(["a"])})
+
+    def test_column(self):
+        payload = wire.unpackb(
+            wire.packb({"lats": np.zeros(4), "pins": ["39J-438-TJC7"], "plain": [1.5, 2], "bad": ["a", 1]})
+        )
+        self.assertEqual(wire.column(payload, "lats").shape, (4,))
+        self.assertEqual(wire.column(payload, "pins", "u", strings=True), ["39J-438-TJC7"])
+        np.testing.assert_array_equal(wire.column(payload, "plain"), [1.5, 2.0])
+        cases = (
+            ("bad", {}),
+            ("missing", {}),
+            ("lats", {"kinds": "u"}),
+            ("lats", {"max_items": 3}),
+            ("plain", {"kinds": "u"}),
+        )
+        for name, kwargs in cases:
+            with self.assertRaises(DigiPinValidationError):
+                wire.column(payload, name, **kwargs)
+
+    def test_unsigned_lists_are_not_truncated(self):
+        payload = wire.unpackb(wire.packb({"codes": [1, 2**40], "floats": [1.5], "negative": [-1], "whole": [2.0]}))
+        np.testing.assert_array_equal(wire.column(payload, "codes", "u"), np.array([1, 2**40], dtype=np.uint64))
+        for name in ("floats", "negative", "whole"):
+            with self.assertRaises(DigiPinValidationError):
+                wire.column(payload, name, "u")
+
+    def test_media_types(self):
+        self.assertTrue(wire.is_msgpack("application/msgpack"))
+        self.assertTrue(wire.is_msgpack("application/json, application/x-msgpack;q=0.9"))
+        self.assertFalse(wire.is_msgpack("application/json"))
+        self.assertFalse(wire.is_msgpack(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
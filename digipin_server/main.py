@@ -7,16 +7,27 @@ and deterministic geo endpoints that the React app can consume.
 
 from __future__ import annotations
 
+import asyncio
+import io
+import json
 import logging
 import os
 import sys
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional
 
+import numpy as np
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, field_validator
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+from starlette.concurrency import run_in_threadpool
 
 # Ensure package path is available (repo root / digipin_agent/src)
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -26,20 +37,44 @@ if str(AGENT_SRC) not in sys.path:
 
 try:
     from digipin_agent import (
+        DIGIPIN_BOUNDS,
         DigiPinValidationError,
+        FastPathRouter,
         GeminiDigipinAgent,
-        decode_digipin,
+        decode_many,
+        decode_prefix,
+        distance_matrix,
         encode_coordinates,
-        get_distance_summary,
-        nearest_pin,
+        encode_many,
+        pairwise_distances,
     )
+    from digipin_agent.aggregate import MAX_ZOOM, level_for_zoom
+    from digipin_agent.bulk import iter_csv, iter_ndjson
+    from digipin_agent.cache import GeoCache
+    from digipin_agent.cover import CoverageCache, CoverageRaster
+    from digipin_agent.geo import validate_many, validation_messages
+    from digipin_agent.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+    from digipin_agent.packed import INVALID_PACKED, decode_packed, encode_packed, unpack_many
+    from digipin_agent.response_cache import MemoryResponseBackend, RedisResponseBackend, ResponseCache
+    from digipin_agent.store import CollectionStore
+    from digipin_agent import wire
 
     AGENT_IMPORT_ERROR: Optional[Exception] = None
 except Exception as exc:  # pragma: no cover - defensive
     AGENT_IMPORT_ERROR = exc
     DigiPinValidationError = Exception  # type: ignore
-    GeminiDigipinAgent = None  # type: ignore
-    decode_digipin = encode_coordinates = get_distance_summary = nearest_pin = None  # type: ignore
+    GeminiDigipinAgent = FastPathRouter = None  # type: ignore
+    DIGIPIN_BOUNDS = {}  # type: ignore
+    decode_many = encode_many = validate_many = validation_messages = None  # type: ignore
+    decode_prefix = encode_coordinates = None  # type: ignore
+    distance_matrix = pairwise_distances = None  # type: ignore
+    iter_csv = iter_ndjson = CollectionStore = CoverageCache = GeoCache = level_for_zoom = None  # type: ignore
+    CoverageRaster = wire = None  # type: ignore
+    INVALID_PACKED = decode_packed = encode_packed = unpack_many = None  # type: ignore
+    MAX_ZOOM = 22
+    MemoryResponseBackend = RedisResponseBackend = ResponseCache = None  # type: ignore
+    REGISTRY = None  # type: ignore
+    METRICS_CONTENT_TYPE = "text/plain"
 
 load_dotenv()
 
@@ -49,7 +84,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger("digipin-server")
 
+MAX_BATCH_ITEMS = int(os.getenv("DIGIPIN_MAX_BATCH_ITEMS", "500000"))
+MAX_MATRIX_CELLS = int(os.getenv("DIGIPIN_MAX_MATRIX_CELLS", "1000000"))
+GEO_CACHE_SIZE = int(os.getenv("DIGIPIN_CACHE_SIZE", "10000"))
+GEO_CACHE_POLICY = os.getenv("DIGIPIN_CACHE_POLICY", "lru")
+COVERAGE_CACHE_SIZE = int(os.getenv("DIGIPIN_COVERAGE_CACHE_SIZE", "256"))
+# GeoJSON boundary (e.g. public/india.geojson) that encodes must fall inside; unset disables the check.
+COVERAGE_BOUNDARY = os.getenv("DIGIPIN_COVERAGE_BOUNDARY")
+COVERAGE_LEVEL = int(os.getenv("DIGIPIN_COVERAGE_LEVEL", "5"))
+STREAM_CHUNK_ROWS = int(os.getenv("DIGIPIN_STREAM_CHUNK_ROWS", "10000"))
+COLLECTIONS_DIR = Path(os.getenv("DIGIPIN_COLLECTIONS_DIR", str(Path(__file__).resolve().parent / "collections")))
+AGENT_WARMUP = os.getenv("DIGIPIN_AGENT_WARMUP", "false").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("GEMINI_RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("GEMINI_RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_URL = os.getenv("GEMINI_RESPONSE_CACHE_URL")
+MAX_AGGREGATE_CELLS = int(os.getenv("DIGIPIN_MAX_AGGREGATE_CELLS", "20000"))
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # The agent (and the Gemini SDK import behind it) is built on first use.
+    # With DIGIPIN_AGENT_WARMUP it is built in the background instead, while
+    # the geo endpoints already serve traffic; /ready reports when it is done.
+    warmup = asyncio.ensure_future(run_in_threadpool(get_agent)) if AGENT_WARMUP else None
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="DIGIPIN AI API",
     description="AI-assisted geo utilities built with Gemini function calling",
     version="0.1.0",
@@ -64,21 +129,153 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if REGISTRY is not None:
+    HTTP_REQUESTS = REGISTRY.counter(
+        "digipin_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+    )
+    HTTP_SECONDS = REGISTRY.histogram(
+        "digipin_http_request_seconds", "HTTP request latency, including streamed bodies", ("method", "route")
+    )
+    HTTP_IN_FLIGHT = REGISTRY.gauge("digipin_http_requests_in_flight", "HTTP requests currently being served")
+    # Geo work only; request latency minus this is validation and serialisation.
+    GEO_SECONDS = REGISTRY.histogram("digipin_geo_seconds", "Time spent in geo computations", ("operation",))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed to their last byte."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Label by route template, never the raw path, to bound cardinality.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status["code"]))
+
+
+if REGISTRY is not None:
+    app.add_middleware(MetricsMiddleware)
+
+
+@contextmanager
+def _geo_timer(operation: str) -> Iterator[None]:
+    if REGISTRY is None:
+        yield
+        return
+    with GEO_SECONDS.time(operation=operation):
+        yield
+
+
+def _timed(operation: str, func, *args):
+    with _geo_timer(operation):
+        return func(*args)
+
+
+def _binary_body(model) -> Dict[str, Any]:
+    """OpenAPI for endpoints that read their body themselves: JSON ``model`` or MessagePack."""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    media_type = wire.MEDIA_TYPE if wire is not None else "application/msgpack"
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}, media_type: binary},
+        },
+        "responses": {"200": {"content": {media_type: binary}}},
+    }
+
+
+def _wants_binary(request: Request) -> bool:
+    if wire is None or not wire.is_msgpack(request.headers.get("accept")):
+        return False
+    if not wire.AVAILABLE:
+        raise HTTPException(status_code=406, detail="MessagePack responses need the msgpack package")
+    return True
+
+
+async def _read_payload(request: Request, model, from_binary):
+    """Validate a JSON body with ``model``, or build one from a MessagePack body.
+
+    MessagePack bodies bypass Pydantic: ``from_binary`` checks the unpacked map
+    and returns a constructed ``model`` whose list fields hold the NumPy
+    columns as received.
+    """
+    body = await request.body()
+    if wire is not None and wire.is_msgpack(request.headers.get("content-type")):
+        if not wire.AVAILABLE:
+            raise HTTPException(status_code=415, detail="MessagePack bodies need the msgpack package")
+        try:
+            return from_binary(wire.unpackb(body))
+        except DigiPinValidationError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)]
+        ) from exc
+
+
+async def _negotiated(request: Request, operation: str, func, payload) -> Any:
+    """Run ``func(payload, binary)`` in the threadpool and answer in the format the client accepts."""
+    binary = _wants_binary(request)
+    result = await run_in_threadpool(_timed, operation, func, payload, binary)
+    if not binary:
+        return result
+    return Response(await run_in_threadpool(wire.packb, result), media_type=wire.MEDIA_TYPE)
+
 
 class EncodeRequest(BaseModel):
     latitude: float = Field(..., ge=-90.0, le=90.0)
     longitude: float = Field(..., ge=-180.0, le=180.0)
+    level: int = Field(10, ge=1, le=10, description="Below 10, return the prefix of the level-`level` cell")
 
 
 class DecodeRequest(BaseModel):
     pin: str = Field(..., min_length=6)
 
 
+class PrefixDecodeRequest(BaseModel):
+    prefix: str = Field(..., min_length=1, description="Partial DIGIPIN of 1-10 symbols, e.g. 39J-4")
+
+
 class DistanceRequest(BaseModel):
     start_pin: str
     end_pin: str
 
 
+class DistanceMatrixRequest(BaseModel):
+    origins: List[str] = Field(..., min_length=1)
+    destinations: Optional[List[str]] = Field(
+        None, description="Defaults to the origins, giving a symmetric pairwise matrix"
+    )
+    dtype: Literal["float64", "float32"] = "float64"
+
+    @model_validator(mode="after")
+    def ensure_matrix_size(self) -> "DistanceMatrixRequest":
+        columns = len(self.destinations) if self.destinations is not None else len(self.origins)
+        if len(self.origins) * columns > MAX_MATRIX_CELLS:
+            raise ValueError(f"Distance matrix is limited to {MAX_MATRIX_CELLS} cells")
+        return self
+
+
 class NearestRequest(BaseModel):
     reference_pin: str
     candidates: List[str]
@@ -91,6 +288,96 @@ class NearestRequest(BaseModel):
         return value
 
 
+class BatchEncodeRequest(BaseModel):
+    latitudes: List[float] = Field(..., max_length=MAX_BATCH_ITEMS)
+    longitudes: List[float] = Field(..., max_length=MAX_BATCH_ITEMS)
+    level: int = Field(10, ge=1, le=10, description="Below 10, encode to level-`level` cell prefixes")
+
+    @model_validator(mode="after")
+    def ensure_same_length(self) -> "BatchEncodeRequest":
+        if len(self.latitudes) != len(self.longitudes):
+            raise ValueError("latitudes and longitudes must have the same length")
+        return self
+
+
+class BatchPinsRequest(BaseModel):
+    pins: List[str] = Field(..., max_length=MAX_BATCH_ITEMS)
+    level: int = Field(10, ge=1, le=10, description="Below 10, pins are level-`level` prefixes such as 39J-4")
+
+
+def _binary_level(data: Dict[str, Any]) -> int:
+    level = data.get("level", 10)
+    if not isinstance(level, int) or isinstance(level, bool) or not 1 <= level <= 10:
+        raise DigiPinValidationError("level must be between 1 and 10")
+    return level
+
+
+def _binary_coordinates(data: Dict[str, Any]) -> BatchEncodeRequest:
+    latitudes = wire.column(data, "latitudes", "f", MAX_BATCH_ITEMS)
+    longitudes = wire.column(data, "longitudes", "f", MAX_BATCH_ITEMS)
+    if len(latitudes) != len(longitudes):
+        raise DigiPinValidationError("latitudes and longitudes must have the same length")
+    return BatchEncodeRequest.model_construct(latitudes=latitudes, longitudes=longitudes, level=_binary_level(data))
+
+
+def _binary_pins(data: Dict[str, Any]) -> BatchPinsRequest:
+    """``pins`` as strings or, for decode, a packed ``<u8`` column."""
+    pins = wire.column(data, "pins", "u", MAX_BATCH_ITEMS, strings=True)
+    return BatchPinsRequest.model_construct(pins=pins, level=_binary_level(data))
+
+
+def _binary_matrix(data: Dict[str, Any]) -> DistanceMatrixRequest:
+    # Packed pins are unpacked up front: the matrix itself dwarfs that cost.
+    def pins(name: str) -> Any:
+        values = wire.column(data, name, "u", strings=True)
+        return unpack_many(values) if isinstance(values, np.ndarray) else values
+
+    origins = pins("origins")
+    destinations = pins("destinations") if data.get("destinations") is not None else None
+    dtype = data.get("dtype", "float64")
+    if dtype not in ("float64", "float32"):
+        raise DigiPinValidationError("dtype must be float64 or float32")
+    if not len(origins):
+        raise DigiPinValidationError("origins must not be empty")
+    if len(origins) * len(destinations if destinations is not None else origins) > MAX_MATRIX_CELLS:
+        raise DigiPinValidationError(f"Distance matrix is limited to {MAX_MATRIX_CELLS} cells")
+    return DistanceMatrixRequest.model_construct(origins=origins, destinations=destinations, dtype=dtype)
+
+
+class CoverRequest(BaseModel):
+    level: int = Field(..., ge=1, le=10)
+    bbox: Optional[List[float]] = Field(
+        None, min_length=4, max_length=4, description="[min_lat, min_lon, max_lat, max_lon]"
+    )
+    geojson: Optional[Dict[str, Any]] = Field(None, description="Polygon, MultiPolygon, Feature or FeatureCollection")
+
+    @model_validator(mode="after")
+    def ensure_one_region(self) -> "CoverRequest":
+        if (self.bbox is None) == (self.geojson is None):
+            raise ValueError("Provide exactly one of bbox or geojson")
+        return self
+
+
+class CollectionRequest(BaseModel):
+    pins: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    weights: Optional[List[float]] = Field(None, description="One weight per pin, summed per cell by /aggregate")
+
+    @model_validator(mode="after")
+    def ensure_weights_length(self) -> "CollectionRequest":
+        if self.weights is not None and len(self.weights) != len(self.pins):
+            raise ValueError("weights must have one value per pin")
+        return self
+
+
+class CollectionNearestRequest(BaseModel):
+    reference_pin: str
+    k: int = Field(1, ge=1, le=1000)
+
+
+class CollectionRadiusRequest(BaseModel):
+    reference_pin: str
+    radius_meters: float = Field(..., ge=0.0)
+
 
 class EncodeResponse(BaseModel):
     pin: str
@@ -101,28 +388,159 @@ class DecodeResponse(BaseModel):
     longitude: float
 
 
+class PrefixDecodeResponse(BaseModel):
+    level: int
+    latitude: float
+    longitude: float
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+
 class DistanceResponse(BaseModel):
     distance_meters: float
     start_pin: str
     end_pin: str
 
 
+class DistanceMatrixResponse(BaseModel):
+    rows: int
+    columns: int
+    distances_meters: List[List[float]]
+
+
 class NearestResponse(BaseModel):
     nearest: str
 
 
+class BatchEncodeResponse(BaseModel):
+    pins: List[Optional[str]]
+    errors: List[Optional[str]]
+    invalid_count: int
+
+
+class BatchDecodeResponse(BaseModel):
+    latitudes: List[Optional[float]]
+    longitudes: List[Optional[float]]
+    errors: List[Optional[str]]
+    invalid_count: int
+
+
+class BatchValidateResponse(BaseModel):
+    valid: List[bool]
+    reason_codes: List[int] = Field(
+        ..., description="0 valid, 1 not a string, 2 wrong length, 3 invalid character"
+    )
+    errors: List[Optional[str]]
+    invalid_count: int
+
+
+class CoverResponse(BaseModel):
+    level: int
+    cell_count: int
+    cells: List[str]
+
+
+class CoverageCheckResponse(BaseModel):
+    inside: List[bool]
+    outside_count: int
+
+
+class CollectionInfo(BaseModel):
+    name: str
+    size: int
+
+
+class CollectionListResponse(BaseModel):
+    collections: List[CollectionInfo]
+
+
+class CollectionMatch(BaseModel):
+    pin: str
+    distance_meters: float
+
+
+class CollectionQueryResponse(BaseModel):
+    collection: str
+    matches: List[CollectionMatch]
+
+
+class AggregateCell(BaseModel):
+    prefix: str
+    count: int
+    weight: float
+    latitude: float
+    longitude: float
+    bounds: List[float] = Field(..., description="[min_lat, min_lon, max_lat, max_lon]")
+
+
+class AggregateResponse(BaseModel):
+    collection: str
+    level: int
+    cell_count: int
+    point_count: int
+    weight: float
+    truncated: bool
+    cells: List[AggregateCell]
+
+
 class AgentPrompt(BaseModel):
     message: str = Field(..., min_length=1)
     context: Optional[Dict[str, Any]] = None
 
 
+def _initialise_geo_cache() -> Optional[GeoCache]:
+    if GeoCache is None:
+        return None
+    return GeoCache(decode_size=GEO_CACHE_SIZE, encode_size=GEO_CACHE_SIZE, policy=GEO_CACHE_POLICY)
+
+
+geo_cache = _initialise_geo_cache()
+coverage_cache = CoverageCache(maxsize=COVERAGE_CACHE_SIZE) if CoverageCache is not None else None
+
+
+def _initialise_coverage_raster() -> Optional[CoverageRaster]:
+    if CoverageRaster is None or not COVERAGE_BOUNDARY:
+        return None
+    try:
+        return CoverageRaster.from_file(COVERAGE_BOUNDARY, level=COVERAGE_LEVEL)
+    except (OSError, ValueError) as exc:
+        logger.warning("Coverage boundary %s not loaded: %s", COVERAGE_BOUNDARY, exc)
+        return None
+
+
+coverage_raster = _initialise_coverage_raster()
+OUTSIDE_COVERAGE = "Coordinates are outside the coverage area"
+# Shared by the agent and the no-agent fallback so fast-path stats cover both.
+fast_path_router = FastPathRouter(geo_cache) if FastPathRouter is not None and geo_cache is not None else None
+
+
+def _initialise_response_cache() -> Optional[ResponseCache]:
+    if ResponseCache is None or RESPONSE_CACHE_TTL <= 0:
+        return None
+    try:
+        if RESPONSE_CACHE_URL:
+            backend = RedisResponseBackend(url=RESPONSE_CACHE_URL)
+        else:
+            backend = MemoryResponseBackend(maxsize=RESPONSE_CACHE_SIZE)
+        return ResponseCache(backend, ttl=RESPONSE_CACHE_TTL)
+    except Exception as exc:
+        logger.warning("Agent response cache disabled: %s", exc)
+        return None
+
+
+response_cache = _initialise_response_cache()
+
+
 def _initialise_agent() -> Optional[GeminiDigipinAgent]:
     if GeminiDigipinAgent is None:
         logger.warning("GeminiDigipinAgent import failed: %s", AGENT_IMPORT_ERROR)
         return None
     try:
-        return GeminiDigipinAgent()
-    except ValueError as exc:
+        # Routing happens in the endpoints, before the agent is even built.
+        return GeminiDigipinAgent(geo_cache=geo_cache, fast_path=False, response_cache=response_cache)
+    except (ImportError, ValueError) as exc:
         logger.warning("GeminiDigipinAgent not configured: %s", exc)
         return None
     except Exception as exc:  # pragma: no cover - defensive
@@ -130,7 +548,43 @@ def _initialise_agent() -> Optional[GeminiDigipinAgent]:
         return None
 
 
-agent_instance = _initialise_agent()
+def _initialise_collections() -> Optional[CollectionStore]:
+    if CollectionStore is None:
+        return None
+    try:
+        return CollectionStore(COLLECTIONS_DIR)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.exception("Unexpected error loading collections from %s: %s", COLLECTIONS_DIR, exc)
+        return None
+
+
+agent_instance: Optional[GeminiDigipinAgent] = None
+agent_status = "not_started"  # -> "starting" -> "ready" | "unavailable"
+_agent_lock = threading.Lock()
+
+
+def get_agent() -> Optional[GeminiDigipinAgent]:
+    """Build the agent on first call; later calls return the same outcome.
+
+    Blocking (the SDK import alone takes a while), so async callers go through
+    :func:`_get_agent_async`.
+    """
+    global agent_instance, agent_status
+    with _agent_lock:
+        if agent_status in ("not_started", "starting"):
+            agent_status = "starting"
+            agent_instance = _initialise_agent()
+            agent_status = "ready" if agent_instance is not None else "unavailable"
+        return agent_instance
+
+
+async def _get_agent_async() -> Optional[GeminiDigipinAgent]:
+    if agent_status in ("ready", "unavailable"):
+        return agent_instance
+    return await run_in_threadpool(get_agent)
+
+
+collection_store = _initialise_collections()
 
 
 @app.get("/health")
@@ -138,14 +592,37 @@ async def health() -> Dict[str, Any]:
     """Simple health check."""
     return {
         "status": "ok",
-        "agent_ready": agent_instance is not None,
+        "agent_ready": agent_status == "ready",
+        "agent_status": agent_status,
     }
 
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 while a background agent warm-up is still running."""
+    starting = agent_status == "starting"
+    return JSONResponse(
+        {"ready": not starting, "agent_status": agent_status},
+        status_code=503 if starting else 200,
+    )
+
+
+@app.get("/api/digipin/cache/stats")
+async def api_cache_stats() -> Dict[str, Any]:
+    """Hit, miss and eviction counters of the decode/encode/coverage caches."""
+    return _cache_stats()
+
+
 @app.post("/api/digipin/encode", response_model=EncodeResponse)
 async def api_encode(payload: EncodeRequest) -> EncodeResponse:
     try:
-        pin = encode_coordinates(payload.latitude, payload.longitude)
+        with _geo_timer("encode"):
+            if payload.level == 10:
+                pin = geo_cache.encode_coordinates(payload.latitude, payload.longitude)
+            else:
+                pin = encode_coordinates(payload.latitude, payload.longitude, payload.level)
+            if coverage_raster is not None and not coverage_raster.contains_point(payload.latitude, payload.longitude):
+                raise DigiPinValidationError(OUTSIDE_COVERAGE)
         return EncodeResponse(pin=pin)
     except DigiPinValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -154,41 +631,527 @@ async def api_encode(payload: EncodeRequest) -> EncodeResponse:
 @app.post("/api/digipin/decode", response_model=DecodeResponse)
 async def api_decode(payload: DecodeRequest) -> DecodeResponse:
     try:
-        decoded = decode_digipin(payload.pin)
+        with _geo_timer("decode"):
+            decoded = geo_cache.decode_digipin(payload.pin)
         return DecodeResponse(**decoded.model_dump())
     except DigiPinValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+@app.post("/api/digipin/decode/prefix", response_model=PrefixDecodeResponse)
+async def api_decode_prefix(payload: PrefixDecodeRequest) -> Dict[str, Any]:
+    """Centre and bounding box of the cell named by a partial DIGIPIN."""
+    try:
+        with _geo_timer("decode_prefix"):
+            decoded = decode_prefix(payload.prefix)
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    (min_lat, min_lon), (max_lat, max_lon) = decoded.bounds
+    return {
+        "level": len(payload.prefix.strip().replace("-", "")),
+        "latitude": decoded.latitude,
+        "longitude": decoded.longitude,
+        "min_lat": min_lat,
+        "min_lon": min_lon,
+        "max_lat": max_lat,
+        "max_lon": max_lon,
+    }
+
+
 @app.post("/api/digipin/distance", response_model=DistanceResponse)
 async def api_distance(payload: DistanceRequest) -> Dict[str, Any]:
     try:
         # get_distance_summary returns a dict, we can let Pydantic validate it or wrap it
-        result = get_distance_summary(payload.start_pin, payload.end_pin)
+        with _geo_timer("distance"):
+            result = geo_cache.get_distance_summary(payload.start_pin, payload.end_pin)
         return result
     except DigiPinValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+def _first_invalid_pin(field: str, pins: List[str]) -> Optional[str]:
+    valid, reasons = validate_many(pins)
+    if valid.all():
+        return None
+    index = int(np.argmin(valid))
+    return f"{field}[{index}]: {validation_messages([pins[index]], reasons[index:index + 1])[0]}"
+
+
+def _distance_matrix(payload: DistanceMatrixRequest, binary: bool = False) -> Dict[str, Any]:
+    destinations = payload.destinations if payload.destinations is not None else []
+    for field, pins in (("origins", payload.origins), ("destinations", destinations)):
+        error = _first_invalid_pin(field, pins)
+        if error:
+            raise DigiPinValidationError(error)
+    dtype = np.float32 if payload.dtype == "float32" else np.float64
+    if payload.destinations is None:
+        matrix = pairwise_distances(payload.origins, dtype=dtype)
+    else:
+        matrix = distance_matrix(payload.origins, payload.destinations, dtype=dtype)
+    distances = matrix if binary else matrix.tolist()
+    return {"rows": matrix.shape[0], "columns": matrix.shape[1], "distances_meters": distances}
+
+
+@app.post(
+    "/api/digipin/distance/matrix",
+    response_model=DistanceMatrixResponse,
+    openapi_extra=_binary_body(DistanceMatrixRequest),
+)
+async def api_distance_matrix(request: Request) -> Any:
+    payload = await _read_payload(request, DistanceMatrixRequest, _binary_matrix)
+    try:
+        return await _negotiated(request, "distance_matrix", _distance_matrix, payload)
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @app.post("/api/digipin/nearest", response_model=NearestResponse)
 async def api_nearest(payload: NearestRequest) -> NearestResponse:
     try:
-        closest = nearest_pin(payload.reference_pin, payload.candidates)
+        with _geo_timer("nearest"):
+            closest = geo_cache.nearest_pin(payload.reference_pin, payload.candidates)
         return NearestResponse(nearest=closest)
     except DigiPinValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+def _cover(payload: CoverRequest) -> Dict[str, Any]:
+    if payload.bbox is not None:
+        cells = coverage_cache.cover_bbox(payload.bbox, payload.level)
+    else:
+        cells = coverage_cache.cover_polygon(payload.geojson, payload.level)
+    return {"level": payload.level, "cell_count": len(cells), "cells": cells}
+
+
+@app.post("/api/digipin/cover", response_model=CoverResponse)
+async def api_cover(payload: CoverRequest) -> Dict[str, Any]:
+    """Mixed-level DIGIPIN prefixes covering a bbox or GeoJSON polygon down to ``level``."""
+    if coverage_cache is None:
+        raise HTTPException(status_code=503, detail="Coverage not available")
+    try:
+        return await run_in_threadpool(_timed, "cover", _cover, payload)
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _batch_encode(payload: BatchEncodeRequest, binary: bool = False) -> Dict[str, Any]:
+    lats = np.asarray(payload.latitudes, dtype=np.float64)
+    lons = np.asarray(payload.longitudes, dtype=np.float64)
+    if binary:
+        codes = encode_packed(lats, lons, payload.level)
+        if coverage_raster is not None:
+            codes[~coverage_raster.contains(lats, lons)] = INVALID_PACKED
+        return {"pins": codes, "invalid_count": int((codes == INVALID_PACKED).sum())}
+    pins = encode_many(lats, lons, payload.level)
+    valid = pins != ""
+
+    errors: List[Optional[str]] = [None] * len(pins)
+    lat_ok = (lats >= DIGIPIN_BOUNDS["min_lat"]) & (lats <= DIGIPIN_BOUNDS["max_lat"])
+    for index in np.flatnonzero(~valid).tolist():
+        errors[index] = (
+            "Longitude out of range for DIGIPIN grid" if lat_ok[index] else "Latitude out of range for DIGIPIN grid"
+        )
+    if coverage_raster is not None:
+        outside = valid & ~coverage_raster.contains(lats, lons)
+        for index in np.flatnonzero(outside).tolist():
+            errors[index] = OUTSIDE_COVERAGE
+        valid &= ~outside
+    return {
+        "pins": np.where(valid, pins, None).tolist(),
+        "errors": errors,
+        "invalid_count": int((~valid).sum()),
+    }
+
+
+def _batch_decode(payload: BatchPinsRequest, binary: bool = False) -> Dict[str, Any]:
+    packed = isinstance(payload.pins, np.ndarray)
+    if packed:
+        decoded = decode_packed(payload.pins, payload.level)
+    else:
+        decoded = decode_many(payload.pins, payload.level)
+    if binary:
+        return {
+            "latitudes": decoded.latitude,
+            "longitudes": decoded.longitude,
+            "valid": decoded.valid,
+            "invalid_count": int((~decoded.valid).sum()),
+        }
+    if packed:
+        bits = 4 * payload.level
+        errors = np.where(decoded.valid, None, f"Packed DIGIPIN must be a {bits}-bit unsigned integer").tolist()
+    else:
+        errors = validation_messages(payload.pins, ~decoded.valid, payload.level)
+    return {
+        "latitudes": np.where(decoded.valid, decoded.latitude, None).tolist(),
+        "longitudes": np.where(decoded.valid, decoded.longitude, None).tolist(),
+        "errors": errors,
+        "invalid_count": int((~decoded.valid).sum()),
+    }
+
+
+def _batch_validate(payload: BatchPinsRequest, binary: bool = False) -> Dict[str, Any]:
+    if isinstance(payload.pins, np.ndarray):
+        raise DigiPinValidationError("validate expects pins as strings")
+    valid, reasons = validate_many(payload.pins, payload.level)
+    if binary:
+        return {"valid": valid, "reason_codes": reasons, "invalid_count": int((~valid).sum())}
+    return {
+        "valid": valid.tolist(),
+        "reason_codes": reasons.tolist(),
+        "errors": validation_messages(payload.pins, reasons, payload.level),
+        "invalid_count": int((~valid).sum()),
+    }
+
+
+def _coverage_check(payload: BatchEncodeRequest, binary: bool = False) -> Dict[str, Any]:
+    inside = coverage_raster.contains(payload.latitudes, payload.longitudes)
+    return {"inside": inside if binary else inside.tolist(), "outside_count": int((~inside).sum())}
+
+
+@app.post(
+    "/api/digipin/coverage/check",
+    response_model=CoverageCheckResponse,
+    openapi_extra=_binary_body(BatchEncodeRequest),
+)
+async def api_coverage_check(request: Request) -> Any:
+    """Which coordinates fall inside the configured coverage boundary."""
+    if coverage_raster is None:
+        raise HTTPException(status_code=503, detail="No coverage boundary configured")
+    payload = await _read_payload(request, BatchEncodeRequest, _binary_coordinates)
+    return await _negotiated(request, "coverage_check", _coverage_check, payload)
+
+
+# The batch endpoints read their own body so that MessagePack requests
+# (Content-Type: application/msgpack) skip Pydantic entirely; an Accept of
+# application/msgpack returns column buffers instead of JSON lists.
+@app.post(
+    "/api/digipin/batch/encode",
+    response_model=BatchEncodeResponse,
+    openapi_extra=_binary_body(BatchEncodeRequest),
+)
+async def api_batch_encode(request: Request) -> Any:
+    payload = await _read_payload(request, BatchEncodeRequest, _binary_coordinates)
+    return await _negotiated(request, "batch_encode", _batch_encode, payload)
+
+
+@app.post(
+    "/api/digipin/batch/decode",
+    response_model=BatchDecodeResponse,
+    openapi_extra=_binary_body(BatchPinsRequest),
+)
+async def api_batch_decode(request: Request) -> Any:
+    payload = await _read_payload(request, BatchPinsRequest, _binary_pins)
+    return await _negotiated(request, "batch_decode", _batch_decode, payload)
+
+
+@app.post(
+    "/api/digipin/batch/validate",
+    response_model=BatchValidateResponse,
+    openapi_extra=_binary_body(BatchPinsRequest),
+)
+async def api_batch_validate(request: Request) -> Any:
+    payload = await _read_payload(request, BatchPinsRequest, _binary_pins)
+    try:
+        return await _negotiated(request, "batch_validate", _batch_validate, payload)
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _stream_results(upload, operation: str, ndjson: bool) -> Iterator[str]:
+    """Yield result blocks for the spooled upload, closing it when done."""
+    text = io.TextIOWrapper(upload, encoding="utf-8", errors="replace", newline="")
+    try:
+        if ndjson:
+            yield from iter_ndjson(text, operation, STREAM_CHUNK_ROWS)
+        else:
+            yield from iter_csv(text, operation, STREAM_CHUNK_ROWS)
+    finally:
+        text.close()
+
+
+@app.post("/api/digipin/stream/{operation}")
+async def api_stream(operation: str, request: Request) -> StreamingResponse:
+    """Bulk encode/decode a CSV or NDJSON upload, streaming results back as chunks finish.
+
+    The body is spooled to a temporary file first so the response does not
+    compete with the request body for the ASGI receive channel; results are then
+    produced one chunk at a time, only when the client has accepted the previous
+    one, which keeps memory flat and applies backpressure to slow readers.
+    """
+    if operation not in ("encode", "decode"):
+        raise HTTPException(status_code=404, detail=f"Unsupported operation: {operation}")
+
+    content_type = request.headers.get("content-type", "text/csv").split(";")[0].strip().lower()
+    ndjson = content_type in NDJSON_MEDIA_TYPES
+
+    upload = tempfile.TemporaryFile()
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(upload.write, chunk)
+        upload.seek(0)
+        results = _stream_results(upload, operation, ndjson)
+        # Pull the first block eagerly so header problems become a 400, not a broken stream.
+        first = await run_in_threadpool(next, results, "")
+    except DigiPinValidationError as exc:
+        upload.close()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except BaseException:
+        upload.close()
+        raise
+
+    def body() -> Iterator[str]:
+        yield first
+        yield from results
+
+    return StreamingResponse(body(), media_type="application/x-ndjson" if ndjson else "text/csv")
+
+
+def _collection(name: str):
+    if collection_store is None:
+        raise HTTPException(status_code=503, detail="Collection store not available")
+    try:
+        return collection_store.get(name)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {name}") from exc
+
+
+def _matches(name: str, results) -> Dict[str, Any]:
+    return {
+        "collection": name,
+        "matches": [{"pin": pin, "distance_meters": meters} for pin, meters in results],
+    }
+
+
+@app.get("/api/collections", response_model=CollectionListResponse)
+async def api_list_collections() -> Dict[str, Any]:
+    sizes = collection_store.sizes() if collection_store is not None else {}
+    return {"collections": [{"name": name, "size": size} for name, size in sizes.items()]}
+
+
+@app.put("/api/collections/{name}", response_model=CollectionInfo)
+async def api_register_collection(name: str, payload: CollectionRequest) -> Dict[str, Any]:
+    if collection_store is None:
+        raise HTTPException(status_code=503, detail="Collection store not available")
+    try:
+        index = await run_in_threadpool(collection_store.register, name, payload.pins, payload.weights)
+    except (DigiPinValidationError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"name": name, "size": len(index)}
+
+
+@app.delete("/api/collections/{name}")
+async def api_delete_collection(name: str) -> Dict[str, Any]:
+    _collection(name)
+    await run_in_threadpool(collection_store.delete, name)
+    return {"deleted": name}
+
+
+@app.post("/api/collections/{name}/nearest", response_model=CollectionQueryResponse)
+async def api_collection_nearest(name: str, payload: CollectionNearestRequest) -> Dict[str, Any]:
+    index = _collection(name)
+    try:
+        with _geo_timer("collection_nearest"):
+            results = index.k_nearest(payload.reference_pin, min(payload.k, len(index)))
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _matches(name, results)
+
+
+@app.post("/api/collections/{name}/within", response_model=CollectionQueryResponse)
+async def api_collection_within(name: str, payload: CollectionRadiusRequest) -> Dict[str, Any]:
+    index = _collection(name)
+    try:
+        with _geo_timer("collection_within"):
+            results = index.within_radius(payload.reference_pin, payload.radius_meters)
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _matches(name, results)
+
+
+def _aggregate_cells(name: str, level: int, bbox, limit: int) -> Dict[str, Any]:
+    table = collection_store.aggregate(name).query(level, bbox)
+    # Heaviest cells first, so a truncated response still shows the hot spots.
+    order = np.argsort(-table.counts, kind="stable")[:limit]
+    cells = table.take(order)
+    min_lat, min_lon, max_lat, max_lon = cells.bounds()
+    return {
+        "collection": name,
+        "level": level,
+        "cell_count": len(table),
+        "point_count": int(table.counts.sum()),
+        "weight": float(table.weights.sum()),
+        "truncated": len(table) > len(cells),
+        "cells": [
+            {
+                "prefix": prefix,
+                "count": count,
+                "weight": weight,
+                "latitude": (south + north) / 2.0,
+                "longitude": (west + east) / 2.0,
+                "bounds": [south, west, north, east],
+            }
+            for prefix, count, weight, south, west, north, east in zip(
+                cells.labels().tolist(),
+                cells.counts.tolist(),
+                cells.weights.tolist(),
+                min_lat.tolist(),
+                min_lon.tolist(),
+                max_lat.tolist(),
+                max_lon.tolist(),
+            )
+        ],
+    }
+
+
+@app.get("/api/collections/{name}/aggregate", response_model=AggregateResponse)
+async def api_collection_aggregate(
+    name: str,
+    min_lat: float = Query(..., ge=-90.0, le=90.0),
+    min_lon: float = Query(..., ge=-180.0, le=180.0),
+    max_lat: float = Query(..., ge=-90.0, le=90.0),
+    max_lon: float = Query(..., ge=-180.0, le=180.0),
+    zoom: Optional[float] = Query(None, ge=0.0, le=MAX_ZOOM, description="Web map zoom; picks the level"),
+    level: Optional[int] = Query(None, ge=1, le=10, description="Explicit DIGIPIN level, overrides zoom"),
+    limit: int = Query(MAX_AGGREGATE_CELLS, ge=1, le=MAX_AGGREGATE_CELLS),
+) -> Dict[str, Any]:
+    """Point counts and weight sums per DIGIPIN cell inside a map viewport."""
+    _collection(name)
+    if level is None:
+        if zoom is None:
+            raise HTTPException(status_code=400, detail="Provide zoom or level")
+        level = level_for_zoom(zoom)
+    try:
+        return await run_in_threadpool(
+            _timed, "collection_aggregate", _aggregate_cells, name, level, (min_lat, min_lon, max_lat, max_lon), limit
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {name}") from exc
+    except DigiPinValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _cache_stats() -> Dict[str, Any]:
+    stats = geo_cache.stats() if geo_cache is not None else {}
+    if coverage_cache is not None:
+        stats["coverage"] = coverage_cache.stats()
+    return stats
+
+
+def _cache_families():
+    """Scrape-time view of counters the caches and router already keep."""
+    families = []
+    stats = _cache_stats()
+    if stats:
+        for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+            name = f"digipin_geo_cache_{field}" + ("_total" if kind == "counter" else "")
+            samples = [(name, {"cache": cache}, stats[cache][field]) for cache in sorted(stats)]
+            families.append((name, kind, f"Geo cache {field}", samples))
+    if fast_path_router is not None:
+        stats = fast_path_router.stats()
+        samples = [
+            ("digipin_agent_prompts_total", {"path": "fast", "intent": intent}, count)
+            for intent, count in sorted(stats["intents"].items())
+        ]
+        samples.append(("digipin_agent_prompts_total", {"path": "model", "intent": "none"}, stats["fallback"]))
+        families.append(("digipin_agent_prompts_total", "counter", "Agent prompts by path taken", samples))
+    if response_cache is not None:
+        stats = response_cache.stats()
+        samples = [
+            ("digipin_agent_response_cache_total", {"result": result}, stats[result])
+            for result in ("hits", "misses", "coalesced")
+        ]
+        families.append(
+            ("digipin_agent_response_cache_total", "counter", "Agent response cache lookups by result", samples)
+        )
+    return families
+
+
+if REGISTRY is not None:
+    REGISTRY.register_collector("digipin_server_caches", _cache_families)
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of every server and agent metric."""
+    if REGISTRY is None:
+        raise HTTPException(status_code=503, detail="Metrics not available")
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/agent/stats")
+async def api_agent_stats() -> Dict[str, Any]:
+    """Fast-path share and response cache counters for agent prompts."""
+    return {
+        "fast_path": fast_path_router.stats() if fast_path_router is not None else {},
+        "response_cache": response_cache.stats() if response_cache is not None else {},
+    }
+
+
 @app.post("/api/agent/respond")
 async def api_agent_respond(prompt: AgentPrompt) -> Dict[str, Any]:
-    if agent_instance is None:
+    # Simple prompts are answered without building (or configuring) the agent.
+    routed = _route(prompt)
+    if routed is not None:
+        return routed
+    agent = await _require_agent()
+
+    try:
+        result = await agent.respond(prompt.message, prompt.context)
+    except asyncio.TimeoutError as exc:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Gemini model") from exc
+    return result
+
+
+def _route(prompt: AgentPrompt) -> Optional[Dict[str, Any]]:
+    if fast_path_router is None or prompt.context is not None:
+        return None
+    return fast_path_router.route(prompt.message)
+
+
+async def _require_agent() -> GeminiDigipinAgent:
+    agent = await _get_agent_async()
+    if agent is None:
         raise HTTPException(
             status_code=503,
             detail="GeminiDigipinAgent not initialised. Set GEMINI_API_KEY to enable AI responses.",
         )
+    return agent
 
-    result = await agent_instance.respond(prompt.message, prompt.context)
-    return result
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _agent_events(agent: GeminiDigipinAgent, prompt: AgentPrompt) -> AsyncIterator[str]:
+    try:
+        async for event in agent.respond_stream(prompt.message, prompt.context):
+            yield _sse(event)
+    except asyncio.TimeoutError:
+        yield _sse({"type": "error", "detail": "Timed out waiting for the Gemini model"})
+    except Exception as exc:
+        logger.exception("Agent stream failed: %s", exc)
+        yield _sse({"type": "error", "detail": "Agent request failed"})
+
+
+async def _routed_events(routed: Dict[str, Any]) -> AsyncIterator[str]:
+    yield _sse({"type": "text", "delta": routed["response"]})
+    yield _sse({"type": "done", **routed})
+
+
+@app.post("/api/agent/stream")
+async def api_agent_stream(prompt: AgentPrompt) -> StreamingResponse:
+    """Server-sent events version of ``/api/agent/respond``.
+
+    Emits ``tool_call``, ``tool_result`` and ``text`` events as the agent works
+    and a final ``done`` event with the same payload as the non-streaming
+    endpoint, or an ``error`` event if the agent fails mid-stream.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    routed = _route(prompt)
+    if routed is not None:
+        return StreamingResponse(_routed_events(routed), media_type="text/event-stream", headers=headers)
+    agent = await _require_agent()
+    return StreamingResponse(_agent_events(agent, prompt), media_type="text/event-stream", headers=headers)
 
 
 def main() -> None:  # pragma: no cover - manual entrypoint
@@ -0,0 +1,416 @@
+import json
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+try:
+    from fastapi.testclient import TestClient
+
+    import main
+except ImportError as exc:  # pragma: no cover - server requirements not installed
+    main = None
+    IMPORT_ERROR = str(exc)
+else:
+    IMPORT_ERROR = ""
+    from digipin_agent import wire
+    from digipin_agent.aggregate import level_for_zoom
+    from digipin_agent.geo import decode_digipin, encode_coordinates, encode_many, get_distance_meters
+    from digipin_agent.packed import INVALID_PACKED, decode_packed, encode_packed, pack_many
+    from digipin_agent.router import FastPathRouter
+    from digipin_agent.store import CollectionStore
+
+
+@unittest.skipIf(main is None, f"server requirements not installed: {IMPORT_ERROR}")
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(main.app)
+
+    def patch(self, name, value):
+        patcher = mock.patch.object(main, name, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, path, body=None, **kwargs):
+        return self.client.post(path, json=body, **kwargs)
+
+
+class StubAgent:
+    async def respond(self, message, context=None):
+        return {"message": message, "response": "from the model"}
+
+
+class TestBatchEndpoints(ServerTestCase):
+    def test_encode_keeps_input_order_and_reports_each_row(self):
+        response = self.post(
+            "/api/digipin/batch/encode",
+            {"latitudes": [28.6139, 60.0, 12.9716, 20.0], "longitudes": [77.209, 77.0, 77.5946, 120.0]},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            body["pins"], [encode_coordinates(28.6139, 77.209), None, encode_coordinates(12.9716, 77.5946), None]
+        )
+        self.assertEqual(
+            body["errors"],
+            [None, "Latitude out of range for DIGIPIN grid", None, "Longitude out of range for DIGIPIN grid"],
+        )
+        self.assertEqual(body["invalid_count"], 2)
+
+    def test_encode_at_a_coarser_level(self):
+        response = self.post("/api/digipin/batch/encode", {"latitudes": [28.6139], "longitudes": [77.209], "level": 4})
+        self.assertEqual(response.json()["pins"], [encode_coordinates(28.6139, 77.209, 4)])
+
+    def test_encode_rejects_malformed_requests(self):
+        for body in (
+            {"latitudes": [28.6], "longitudes": []},
+            {"latitudes": ["x"], "longitudes": [77.2]},
+            {"latitudes": [28.6], "longitudes": [77.2], "level": 11},
+            {"latitudes": [28.6]},
+        ):
+            self.assertEqual(self.post("/api/digipin/batch/encode", body).status_code, 422, body)
+        response = self.client.post(
+            "/api/digipin/batch/encode", content=b"{", headers={"content-type": "application/json"}
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_decode(self):
+        pins = ["39J-438-TJC7", "bad", " 4fk5958823 ", "39J-438-TJCA"]
+        body = self.post("/api/digipin/batch/decode", {"pins": pins}).json()
+        self.assertEqual(body["latitudes"][0], decode_digipin(pins[0]).latitude)
+        self.assertEqual(body["longitudes"][2], decode_digipin("4FK-595-8823").longitude)
+        self.assertEqual((body["latitudes"][1], body["longitudes"][3]), (None, None))
+        self.assertEqual(
+            body["errors"], [None, "DIGIPIN must have 10 characters", None, "Invalid DIGIPIN character: A"]
+        )
+        self.assertEqual(body["invalid_count"], 2)
+
+    def test_validate(self):
+        body = self.post("/api/digipin/batch/validate", {"pins": ["39J-438-TJC7", "39J-438-TJCA", "39J"]}).json()
+        self.assertEqual(body["valid"], [True, False, False])
+        self.assertEqual(body["reason_codes"], [0, 3, 2])
+        self.assertEqual(body["errors"], [None, "Invalid DIGIPIN character: A", "DIGIPIN must have 10 characters"])
+        self.assertEqual(body["invalid_count"], 2)
+        body = self.post("/api/digipin/batch/validate", {"pins": ["39J-4", "39J-438-TJC7"], "level": 4}).json()
+        self.assertEqual(body["valid"], [True, False])
+        self.assertEqual(self.post("/api/digipin/batch/validate", {"pins": "39J-438-TJC7"}).status_code, 422)
+
+
+class TestStreamEndpoint(ServerTestCase):
+    def stream(self, operation, body, content_type):
+        headers = {"content-type": content_type}
+        return self.client.post(f"/api/digipin/stream/{operation}", content=body, headers=headers)
+
+    def test_csv_encode_across_chunks(self):
+        self.patch("STREAM_CHUNK_ROWS", 2)
+        rows = [(28.6139, 77.209), (60.0, 77.0), (12.9716, 77.5946), (19.076, 72.8777), (13.0827, 80.2707)]
+        body = "id,lat,lon\n" + "".join(f"{i},{lat},{lon}\n" for i, (lat, lon) in enumerate(rows)) + "5,x,1\n"
+        response = self.stream("encode", body, "text/csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        lines = response.text.splitlines()
+        self.assertEqual(lines[0], "id,lat,lon,digipin,error")
+        self.assertEqual([line.split(",")[0] for line in lines[1:]], ["0", "1", "2", "3", "4", "5"])
+        self.assertEqual(lines[1].split(",")[3], encode_coordinates(28.6139, 77.209))
+        self.assertEqual(lines[5].split(",")[3], encode_coordinates(13.0827, 80.2707))
+        self.assertEqual(lines[2].split(",")[3:], ["", "Latitude out of range for DIGIPIN grid"])
+        self.assertEqual(lines[6].split(",")[3:], ["", "Latitude and longitude must be numbers"])
+
+    def test_ndjson_decode(self):
+        body = '{"pin": "39J-438-TJC7"}\n{"pin": "bad"}\n{"pin": 7}\n'
+        response = self.stream("decode", body, "application/x-ndjson")
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        records = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["latitude"], decode_digipin("39J-438-TJC7").latitude)
+        self.assertIsNone(records[0]["error"])
+        self.assertEqual((records[1]["latitude"], records[1]["error"]), (None, "DIGIPIN must have 10 characters"))
+        self.assertIsNotNone(records[2]["error"])
+
+    def test_errors(self):
+        response = self.stream("encode", "foo,bar\n1,2\n", "text/csv")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("latitude and longitude", response.json()["detail"])
+        self.assertEqual(self.stream("geocode", "lat,lon\n", "text/csv").status_code, 404)
+
+
+class CollectionTestCase(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.patch("collection_store", CollectionStore(self.root))
+        rng = np.random.default_rng(6)
+        self.pins = encode_many(rng.uniform(8.0, 35.0, 300), rng.uniform(68.0, 97.0, 300)).tolist()
+
+
+class TestCollectionEndpoints(CollectionTestCase):
+    def test_register_list_and_delete(self):
+        response = self.client.put("/api/collections/hubs", json={"pins": self.pins})
+        self.assertEqual((response.status_code, response.json()), (200, {"name": "hubs", "size": 300}))
+        self.client.put("/api/collections/depots", json={"pins": self.pins[:5]})
+        self.assertEqual(
+            self.client.get("/api/collections").json()["collections"],
+            [{"name": "depots", "size": 5}, {"name": "hubs", "size": 300}],
+        )
+        self.assertEqual(self.client.delete("/api/collections/depots").json(), {"deleted": "depots"})
+        self.assertEqual(self.client.delete("/api/collections/depots").status_code, 404)
+        self.assertEqual([item["name"] for item in self.client.get("/api/collections").json()["collections"]], ["hubs"])
+
+    def test_register_errors(self):
+        for name, body, status in (
+            ("hubs", {"pins": ["39J-438-TJC7", "bad"]}, 400),
+            ("bad name!", {"pins": self.pins}, 400),
+            ("hubs", {"pins": []}, 422),
+            ("hubs", {"pins": self.pins[:2], "weights": [1.0]}, 422),
+        ):
+            self.assertEqual(self.client.put(f"/api/collections/{name}", json=body).status_code, status, body)
+        self.assertEqual(self.client.get("/api/collections").json(), {"collections": []})
+
+    def test_nearest_and_within(self):
+        self.client.put("/api/collections/hubs", json={"pins": self.pins})
+        reference = self.pins[0]
+        matches = self.post("/api/collections/hubs/nearest", {"reference_pin": reference, "k": 3}).json()["matches"]
+        expected = sorted(self.pins, key=lambda pin: get_distance_meters(reference, pin))[:3]
+        self.assertEqual([match["pin"] for match in matches], expected)
+        self.assertEqual(matches[0]["distance_meters"], 0.0)
+
+        radius = 250000.0
+        matches = self.post(
+            "/api/collections/hubs/within", {"reference_pin": reference, "radius_meters": radius}
+        ).json()["matches"]
+        expected = {pin for pin in self.pins if get_distance_meters(reference, pin) <= radius}
+        self.assertEqual({match["pin"] for match in matches}, expected)
+        distances = [match["distance_meters"] for match in matches]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_query_errors(self):
+        self.client.put("/api/collections/hubs", json={"pins": self.pins})
+        self.assertEqual(self.post("/api/collections/ports/nearest", {"reference_pin": self.pins[0]}).status_code, 404)
+        self.assertEqual(self.post("/api/collections/hubs/nearest", {"reference_pin": "bad"}).status_code, 400)
+        self.assertEqual(
+            self.post("/api/collections/hubs/nearest", {"reference_pin": self.pins[0], "k": 0}).status_code, 422
+        )
+        self.assertEqual(
+            self.post("/api/collections/hubs/within", {"reference_pin": self.pins[0], "radius_meters": -1}).status_code,
+            422,
+        )
+
+    def test_collections_are_shared_between_workers(self):
+        other_worker = CollectionStore(self.root)
+        self.client.put("/api/collections/hubs", json={"pins": self.pins})
+        with mock.patch.object(main, "collection_store", other_worker):
+            response = self.post("/api/collections/hubs/nearest", {"reference_pin": self.pins[0]})
+            self.assertEqual(response.json()["matches"][0]["pin"], self.pins[0])
+        self.client.put("/api/collections/hubs", json={"pins": self.pins[:1]})
+        with mock.patch.object(main, "collection_store", other_worker):
+            self.assertEqual(self.client.get("/api/collections").json()["collections"], [{"name": "hubs", "size": 1}])
+
+
+class TestDistanceMatrixEndpoint(ServerTestCase):
+    PINS = ["39J-438-TJC7", "4FK-595-8823", "4P3-JK8-52C9"]
+
+    def test_matrix_and_pairwise(self):
+        body = self.post("/api/digipin/distance/matrix", {"origins": self.PINS[:2], "destinations": self.PINS}).json()
+        self.assertEqual((body["rows"], body["columns"]), (2, 3))
+        for row, origin in zip(body["distances_meters"], self.PINS[:2]):
+            for meters, destination in zip(row, self.PINS):
+                self.assertAlmostEqual(meters, get_distance_meters(origin, destination), places=3)
+        body = self.post("/api/digipin/distance/matrix", {"origins": self.PINS, "dtype": "float32"}).json()
+        self.assertEqual((body["rows"], body["columns"]), (3, 3))
+        matrix = np.array(body["distances_meters"])
+        np.testing.assert_array_equal(np.diag(matrix), 0.0)
+        np.testing.assert_allclose(matrix, matrix.T)
+
+    def test_errors(self):
+        body = {"origins": self.PINS, "destinations": ["39J-438-TJC7", "bad"]}
+        response = self.post("/api/digipin/distance/matrix", body)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "destinations[1]: DIGIPIN must have 10 characters")
+        for body in ({"origins": []}, {"origins": self.PINS, "dtype": "int8"}, {"destinations": self.PINS}):
+            self.assertEqual(self.post("/api/digipin/distance/matrix", body).status_code, 422, body)
+        self.patch("MAX_MATRIX_CELLS", 4)
+        self.assertEqual(self.post("/api/digipin/distance/matrix", {"origins": self.PINS}).status_code, 422)
+
+
+class TestAggregateEndpoint(CollectionTestCase):
+    INDIA = {"min_lat": 2.5, "min_lon": 63.5, "max_lat": 38.5, "max_lon": 99.5}
+
+    def setUp(self):
+        super().setUp()
+        self.weights = np.arange(1.0, len(self.pins) + 1.0)
+        self.client.put("/api/collections/hubs", json={"pins": self.pins, "weights": self.weights.tolist()})
+
+    def aggregate(self, **params):
+        return self.client.get("/api/collections/hubs/aggregate", params=params)
+
+    def test_counts_and_weights_per_cell(self):
+        body = self.aggregate(level=2, **self.INDIA).json()
+        counts, weights = Counter(), Counter()
+        for pin, weight in zip(self.pins, self.weights):
+            counts[pin[:2]] += 1
+            weights[pin[:2]] += weight
+        self.assertEqual((body["level"], body["point_count"], body["cell_count"]), (2, 300, len(counts)))
+        self.assertEqual(body["weight"], self.weights.sum())
+        self.assertFalse(body["truncated"])
+        self.assertEqual({cell["prefix"]: cell["count"] for cell in body["cells"]}, dict(counts))
+        for cell in body["cells"]:
+            self.assertAlmostEqual(cell["weight"], weights[cell["prefix"]])
+            south, west, north, east = cell["bounds"]
+            self.assertEqual((cell["latitude"], cell["longitude"]), ((south + north) / 2, (west + east) / 2))
+        cell_counts = [cell["count"] for cell in body["cells"]]
+        self.assertEqual(cell_counts, sorted(cell_counts, reverse=True))
+
+    def test_viewport_zoom_and_limit(self):
+        viewport = {"min_lat": 20.0, "min_lon": 75.0, "max_lat": 30.0, "max_lon": 85.0}
+        body = self.aggregate(zoom=5, **viewport).json()
+        self.assertEqual(body["level"], level_for_zoom(5))
+        for cell in body["cells"]:
+            south, west, north, east = cell["bounds"]
+            self.assertTrue(south <= 30.0 and north >= 20.0 and west <= 85.0 and east >= 75.0, cell)
+        truncated = self.aggregate(level=3, limit=2, **self.INDIA).json()
+        self.assertEqual(len(truncated["cells"]), 2)
+        self.assertTrue(truncated["truncated"])
+        self.assertEqual(truncated["point_count"], 300)
+
+    def test_errors(self):
+        self.assertEqual(self.aggregate(**self.INDIA).status_code, 400)
+        self.assertEqual(self.aggregate(level=2, **{**self.INDIA, "min_lat": 39.0}).status_code, 400)
+        self.assertEqual(self.aggregate(level=11, **self.INDIA).status_code, 422)
+        self.assertEqual(self.aggregate(level=2, min_lat=2.5).status_code, 422)
+        response = self.client.get("/api/collections/ports/aggregate", params={"level": 2, **self.INDIA})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCoverEndpoint(ServerTestCase):
+    def test_bbox_and_geojson(self):
+        body = self.post("/api/digipin/cover", {"level": 5, "bbox": [28.5, 77.0, 28.7, 77.3]}).json()
+        self.assertEqual(body["level"], 5)
+        self.assertEqual(body["cell_count"], len(body["cells"]))
+        # Coverings are compacted, so the point's cell may be listed as one of its ancestors.
+        pin = encode_coordinates(28.6139, 77.209)
+        self.assertEqual(sum(pin.startswith(cell) for cell in body["cells"]), 1)
+        polygon = {
+            "type": "Polygon",
+            "coordinates": [[[77.0, 28.5], [77.3, 28.5], [77.3, 28.7], [77.0, 28.7], [77.0, 28.5]]],
+        }
+        cells = self.post("/api/digipin/cover", {"level": 5, "geojson": polygon}).json()["cells"]
+        self.assertEqual(sum(pin.startswith(cell) for cell in cells), 1)
+        self.assertTrue(all(len(cell.replace("-", "")) <= 5 for cell in cells))
+
+    def test_errors(self):
+        self.assertEqual(self.post("/api/digipin/cover", {"level": 3, "bbox": [50, 77, 28, 78]}).status_code, 400)
+        point = {"type": "Point", "coordinates": [77, 28]}
+        self.assertEqual(self.post("/api/digipin/cover", {"level": 3, "geojson": point}).status_code, 400)
+        for body in ({"level": 3}, {"level": 11, "bbox": [28, 77, 29, 78]}, {"level": 3, "bbox": [28, 77, 29]}):
+            self.assertEqual(self.post("/api/digipin/cover", body).status_code, 422, body)
+
+
+class TestMessagePackNegotiation(ServerTestCase):
+    HEADERS = {"content-type": "application/msgpack", "accept": "application/msgpack"}
+
+    def setUp(self):
+        super().setUp()
+        if not wire.AVAILABLE:
+            self.skipTest("msgpack is not installed")
+        rng = np.random.default_rng(24)
+        self.lats = rng.uniform(2.0, 39.0, 200)
+        self.lons = rng.uniform(63.0, 100.0, 200)
+
+    def binary(self, path, payload, headers=None):
+        return self.client.post(path, content=wire.packb(payload), headers=headers or self.HEADERS)
+
+    def test_batch_round_trip(self):
+        response = self.binary("/api/digipin/batch/encode", {"latitudes": self.lats, "longitudes": self.lons})
+        self.assertEqual(response.headers["content-type"], wire.MEDIA_TYPE)
+        body = wire.unpackb(response.content)
+        expected = encode_packed(self.lats, self.lons)
+        np.testing.assert_array_equal(body["pins"], expected)
+        self.assertEqual(body["invalid_count"], int((expected == INVALID_PACKED).sum()))
+
+        decoded = wire.unpackb(self.binary("/api/digipin/batch/decode", {"pins": body["pins"]}).content)
+        reference = decode_packed(expected)
+        np.testing.assert_array_equal(decoded["valid"], reference.valid)
+        np.testing.assert_array_equal(decoded["latitudes"], reference.latitude)
+
+        pins = ["39J-438-TJC7", "bad"]
+        validated = wire.unpackb(self.binary("/api/digipin/batch/validate", {"pins": pins}).content)
+        self.assertEqual(validated["valid"].tolist(), [True, False])
+        self.assertEqual(validated["invalid_count"], 1)
+
+    def test_binary_request_json_response_and_back(self):
+        headers = {"content-type": "application/msgpack"}
+        response = self.binary("/api/digipin/batch/encode", {"latitudes": self.lats, "longitudes": self.lons}, headers)
+        expected = [pin or None for pin in encode_many(self.lats, self.lons).tolist()]
+        self.assertEqual(response.json()["pins"], expected)
+        response = self.client.post(
+            "/api/digipin/batch/encode",
+            json={"latitudes": [28.6139], "longitudes": [77.209], "level": 4},
+            headers={"accept": "application/msgpack"},
+        )
+        codes = wire.unpackb(response.content)["pins"]
+        np.testing.assert_array_equal(codes, encode_packed([28.6139], [77.209], 4))
+
+    def test_matrix_with_packed_pins(self):
+        pins = ["39J-438-TJC7", "4FK-595-8823", "4P3-JK8-52C9"]
+        codes = pack_many(pins)
+        response = self.binary("/api/digipin/distance/matrix", {"origins": codes[:2], "destinations": codes})
+        matrix = wire.unpackb(response.content)["distances_meters"]
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertAlmostEqual(matrix[0, 1], get_distance_meters(pins[0], pins[1]), places=3)
+
+    def test_bad_binary_bodies_are_rejected(self):
+        for path, payload in (
+            ("/api/digipin/distance/matrix", {"origins": ["39J-438-TJC7"], "destinations": [1.5]}),
+            ("/api/digipin/distance/matrix", {"origins": [-1]}),
+            ("/api/digipin/batch/decode", {"pins": [2.5]}),
+            ("/api/digipin/batch/encode", {"latitudes": self.lats, "longitudes": self.lons[:3]}),
+            ("/api/digipin/batch/encode", {"latitudes": self.lats, "longitudes": self.lons, "level": 0}),
+            ("/api/digipin/batch/validate", {"pins": pack_many(["39J-438-TJC7"])}),
+        ):
+            response = self.binary(path, payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertEqual(response.headers["content-type"], "application/json")
+        response = self.client.post("/api/digipin/batch/decode", content=b"\xc1", headers=self.HEADERS)
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_msgpack_package(self):
+        with mock.patch.object(wire, "AVAILABLE", False):
+            response = self.client.post(
+                "/api/digipin/batch/decode", json={"pins": ["39J-438-TJC7"]}, headers={"accept": "application/msgpack"}
+            )
+            self.assertEqual(response.status_code, 406)
+            response = self.client.post(
+                "/api/digipin/batch/decode", content=b"\x80", headers={"content-type": "application/msgpack"}
+            )
+            self.assertEqual(response.status_code, 415)
+
+
+class TestAgentFastPath(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patch("agent_instance", StubAgent())
+        self.patch("agent_status", "ready")
+        self.patch("fast_path_router", FastPathRouter(main.geo_cache))
+
+    def test_simple_prompts_skip_the_model(self):
+        response = self.post("/api/agent/respond", {"message": "decode 39J-438-TJC7"}).json()
+        self.assertIn(f"{decode_digipin('39J-438-TJC7').latitude:.6f}", response["response"])
+
+    def test_place_names_reach_the_model(self):
+        for message in ("Where is Chandigarh?", "locate Puducherry", "Is Darjeeling valid?"):
+            response = self.post("/api/agent/respond", {"message": message}).json()
+            self.assertEqual(response["response"], "from the model", message)
+        stats = self.client.get("/api/agent/stats").json()["fast_path"]
+        self.assertEqual((stats["total"], stats["fast_path"], stats["fallback"]), (3, 0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -75,3 +75,37 @@ export async function nearestViaBackend(referencePin: string, candidates: string
     body: JSON.stringify({ reference_pin: referencePin, candidates }),
   });
 }
+
+export async function batchEncodeViaBackend(latitudes: number[], longitudes: number[]) {
+  return requestJson<{
+    pins: (string | null)[];
+    errors: (string | null)[];
+    invalid_count: number;
+  }>("/api/digipin/batch/encode", {
+    method: "POST",
+    body: JSON.stringify({ latitudes, longitudes }),
+  });
+}
+
+export async function batchDecodeViaBackend(pins: string[]) {
+  return requestJson<{
+    latitudes: (number | null)[];
+    longitudes: (number | null)[];
+    errors: (string | null)[];
+    invalid_count: number;
+  }>("/api/digipin/batch/decode", {
+    method: "POST",
+    body: JSON.stringify({ pins }),
+  });
+}
+
+export async function batchValidateViaBackend(pins: string[]) {
+  return requestJson<{
+    valid: boolean[];
+    errors: (string | null)[];
+    invalid_count: number;
+  }>("/api/digipin/batch/validate", {
+    method: "POST",
+    body: JSON.stringify({ pins }),
+  });
+}